@@ -13,12 +13,12 @@ from core.events import (
     register_default_handlers
 )
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 import time
-from core.recursion import flatten_categories, sum_expenses_recursive
-from core.transforms import load_seed, account_balance
+from itertools import islice
+from core.recursion import flatten_categories
+from core.transforms import load_seed, add_transaction
 from core.domain import Transaction
 from uuid import uuid4
 from core.transforms import (
@@ -26,8 +26,17 @@ from core.transforms import (
     expense_transactions,
     transaction_amounts,
 )
-from core.memo import forecast_expenses
+from core.memo import all_caches, cached, forecast_expenses, get_cache
 from core.services import BudgetService, ReportService
+from core.sqlite_ledger import SqliteLedger
+from core.pvector import PVector
+from core.indexes import BalanceIndex, MonthlyAggregates
+from core.tree import CategoryTree
+from core.budgets import evaluate_budgets, get_budget_tracker
+from core.eventlog import get_event_log
+from core.lazy import lazy_top_categories
+from core.precompute import get_precomputer
+from core.store import TransactionStore
 
 st.set_page_config(page_title="Finance Manager", layout="wide", initial_sidebar_state="expanded")
 
@@ -43,11 +52,87 @@ st.markdown("""
     </div>
 </div>
 """, unsafe_allow_html=True)
-accounts, categories, transactions, budgets = load_seed("data/seed.json")
+@st.cache_resource
+def _load_seed(path, mtime_ns):
+    # one store per seed file version, so ledger-keyed caches (category_rollup)
+    # see the same fingerprint on every rerun
+    return load_seed(path, save_snapshot=True)
 
 
+SEED_PATH = "data/seed.json"
+accounts, categories, transactions, budgets = _load_seed(SEED_PATH, os.stat(SEED_PATH).st_mtime_ns)
+category_tree = CategoryTree(categories)
+
+ledger = SqliteLedger("data/ledger.db")
+if len(ledger) == 0:
+    ledger.add_transactions(transactions)
+
+# every published event is persisted; derived state is replayed on startup
+event_log = get_event_log("data/events.log", "data/events.snap")
+event_bus.attach_log(event_log)
+
 if "tx_transactions" not in st.session_state:
-    st.session_state.tx_transactions = transactions
+    st.session_state.tx_transactions = PVector(ledger)
+
+# budget spend comes from the ledger-initialized tracker, not from event payloads
+budget_tracker = get_budget_tracker(budgets, st.session_state.tx_transactions).attach(event_bus)
+
+if "tx_balance_index" not in st.session_state:
+    st.session_state.tx_balance_index = BalanceIndex.from_ledger(
+        st.session_state.tx_transactions, (a.id for a in accounts)
+    )
+balances_by_account = st.session_state.tx_balance_index.snapshot()
+
+if "tx_monthly" not in st.session_state:
+    st.session_state.tx_monthly = MonthlyAggregates(st.session_state.tx_transactions)
+
+report_cache = get_cache(
+    "reports", policy="lru", max_bytes=32 << 20, disk_dir="data/.cache", disk_max_bytes=128 << 20
+)
+HANDLER_TIMEOUT = 2.0  # seconds each event handler may take on submit
+
+
+@cached(report_cache, tags=("rollup",))
+def category_rollup(trans):
+    return category_tree.expense_rollup(trans)
+
+
+# dashboard aggregates, refreshed in the background when the ledger changes
+precompute = get_precomputer(
+    "dashboard", ledger, load=TransactionStore, interval=300,
+    cache=get_cache("precompute", policy="lru", max_bytes=64 << 20),
+)
+
+
+def _income_expense_12m(store):
+    monthly = MonthlyAggregates(store)
+    months = pd.date_range(end=pd.Timestamp.today().normalize(), periods=12, freq="M")
+    return {m.strftime("%Y-%m"): monthly.month_totals(m.strftime("%Y-%m")) for m in months}
+
+
+def _expense_matrix(store):
+    from core.forecast import expense_matrix
+
+    return expense_matrix(MonthlyAggregates(store))
+
+
+precompute.register("income_expense_12m", _income_expense_12m)
+precompute.register("budget_progress", lambda store: evaluate_budgets(budgets, store))
+precompute.register("expense_matrix", _expense_matrix)
+precompute.register("top_categories", lambda store: list(lazy_top_categories(store, categories, 20)))
+
+
+def show_refreshed(name):
+    entry = precompute.get(name)
+    if entry is None:
+        st.caption("🕒 Computing in the background…")
+        return
+    when = time.strftime("%H:%M:%S", time.localtime(entry.refreshed_at))
+    note = " · refreshing…" if precompute.stale(name) else ""
+    if entry.error:
+        note += f" · last refresh failed: {entry.error}"
+    st.caption(f"🕒 Last refreshed {when} ({entry.age:.0f}s ago){note}")
+
 
 st.sidebar.markdown("### 👤 Profile")
 nickname = st.sidebar.text_input("Nickname", value=st.session_state.get("nickname", ""))
@@ -90,7 +175,7 @@ if "manual_df" not in st.session_state:
 
 if "tx_account_balances" not in st.session_state:
     st.session_state.tx_account_balances = {
-        a.id: account_balance(st.session_state.tx_transactions, a.id) for a in accounts
+        a.id: balances_by_account.get(a.id, 0) for a in accounts
     }
 
 if "tx_account_thresholds" not in st.session_state:
@@ -99,6 +184,21 @@ if "tx_account_thresholds" not in st.session_state:
 if "tx_balance" not in st.session_state:
     st.session_state.tx_balance = sum(st.session_state.tx_account_balances.values())
 
+with st.sidebar.expander("⚙️ Cache statistics"):
+    for cache_name, cache in all_caches().items():
+        stats = cache.stats()
+        st.markdown(f"**{cache_name}** · {cache.policy.__class__.__name__}")
+        st.caption(
+            f"Hits {stats.hits:,} ({stats.disk_hits:,} from disk) · Misses {stats.misses:,} · "
+            f"Hit rate {stats.hit_rate:.0%}"
+        )
+        st.caption(
+            f"Entries {stats.entries:,} · {stats.bytes / 1024:,.1f} / {stats.max_bytes / 1024:,.0f} KiB · "
+            f"Evictions {stats.evictions:,} · Invalidations {stats.invalidations:,}"
+        )
+        if cache.latency.count:
+            st.bar_chart(pd.DataFrame(cache.latency.buckets(), columns=["latency", "calls"]).set_index("latency"))
+
 menu = st.sidebar.radio(
     "Menu",
     ["🏠 Overview", "📂 Data", "🧾 Transactions", "✅ Validation", "⚡ Async/FRP · Reports", "📑 Reports", "📊 Analytics"]
@@ -106,7 +206,8 @@ menu = st.sidebar.radio(
 
 if menu == "🏠 Overview":
     st.header("Dashboard")
-    total_balance = sum(account_balance(st.session_state.tx_transactions, acc.id) for acc in accounts)
+    # balances come only from the session index, which every submit updates
+    total_balance = sum(balances_by_account.get(acc.id, 0) for acc in accounts)
 
     # Key Metrics in styled columns
     col1, col2, col3, col4 = st.columns(4)
@@ -127,7 +228,7 @@ if menu == "🏠 Overview":
     with chart_col1:
         st.subheader("Account Balances")
         accounts_names = [a.name for a in accounts]
-        balances = [account_balance(st.session_state.tx_transactions, a.id) for a in accounts]
+        balances = [balances_by_account.get(a.id, 0) for a in accounts]
         fig_bal = px.bar(
             x=accounts_names,
             y=balances,
@@ -143,21 +244,21 @@ if menu == "🏠 Overview":
         end = pd.Timestamp.today().normalize()
         months = pd.date_range(end=end, periods=12, freq="M")
 
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-        if not df.empty and df["date"].notna().any():
-            inc_m = df[df["amount"] > 0].set_index("date").resample("M")["amount"].sum().reindex(months, fill_value=0)
-            exp_m = (-df[df["amount"] < 0].set_index("date").resample("M")["amount"].sum()).reindex(months, fill_value=0)
-        else:
-            inc_m = pd.Series(np.zeros(len(months)), index=months)
-            exp_m = pd.Series(np.zeros(len(months)), index=months)
+        precomputed_totals = precompute.value("income_expense_12m", {})
+        month_totals = [
+            precomputed_totals.get(m.strftime("%Y-%m"))
+            or st.session_state.tx_monthly.month_totals(m.strftime("%Y-%m"))
+            for m in months
+        ]
+        inc_m = pd.Series([inc for inc, _ in month_totals], index=months)
+        exp_m = pd.Series([exp for _, exp in month_totals], index=months)
 
         fig_ts = go.Figure()
         fig_ts.add_trace(go.Scatter(x=[m.strftime("%b %y") for m in months], y=inc_m.values, mode="lines+markers", name="Income", line=dict(color="green")))
         fig_ts.add_trace(go.Scatter(x=[m.strftime("%b %y") for m in months], y=exp_m.values, mode="lines+markers", name="Expense", line=dict(color="red")))
         fig_ts.update_layout(template="plotly_dark", margin=dict(t=30, b=10, l=10, r=10))
         st.plotly_chart(fig_ts, use_container_width=True)
+        show_refreshed("income_expense_12m")
 
     st.markdown("---")
 
@@ -183,7 +284,7 @@ elif menu == "📂 Data":
             with col:
                 st.metric(
                     acc.name,
-                    f"{account_balance(st.session_state.tx_transactions, acc.id):,.0f} KZT",
+                    f"{balances_by_account.get(acc.id, 0):,.0f} KZT",
                     delta=None
                 )
 
@@ -196,15 +297,16 @@ elif menu == "📂 Data":
                 index=0
             )
             selected_cat_id = next(c.id for c in categories if c.name == selected_cat)
-            subcats = flatten_categories(categories, selected_cat_id)
+            subcats = flatten_categories(category_tree, selected_cat_id)
             if subcats:
                 st.markdown("**Subcategories:**")
                 for sub in subcats:
                     st.markdown(f"- {sub.name}")
         with cat_cols[1]:
             cat_expenses = []
+            rollup = category_rollup(transactions)
             for cat in categories:
-                total = sum_expenses_recursive(categories, transactions, cat.id)
+                total = rollup.get(cat.id, 0)
                 if total != 0:
                     cat_expenses.append({"Category": cat.name, "Total": abs(total)})
             if cat_expenses:
@@ -292,26 +394,31 @@ elif menu == "📂 Data":
     with st.expander("💰 Budgets", expanded=True):
         if budgets:
             budget_data = []
+            budget_statuses = precompute.value("budget_progress") or evaluate_budgets(
+                budgets, st.session_state.tx_transactions
+            )
             for budget in budgets:
                 cat_name = next((c.name for c in categories if c.id == budget.cat_id), "Unknown")
-                spent = sum(t.amount for t in transactions if t.cat_id == budget.cat_id and t.amount < 0)
-                remaining = budget.limit + spent
-                progress = min(100, max(0, (abs(spent) / budget.limit) * 100))
+                periods = budget_statuses[budget.id]
+                # latest period with spending
+                status = periods[-1] if periods else None
                 budget_data.append({
                     "Category": cat_name,
+                    "Period": status.bucket if status else budget.period,
                     "Limit": budget.limit,
-                    "Spent": abs(spent),
-                    "Remaining": remaining,
-                    "Progress": progress
+                    "Spent": status.spent if status else 0,
+                    "Remaining": status.remaining if status else budget.limit,
+                    "Progress": min(100, status.percent) if status else 0
                 })
             budget_df = pd.DataFrame(budget_data)
             for _, row in budget_df.iterrows():
                 st.metric(
-                    f"Budget: {row['Category']}",
+                    f"Budget: {row['Category']} ({row['Period']})",
                     f"{row['Spent']:,.0f} / {row['Limit']:,.0f} KZT",
                     f"{row['Remaining']:,.0f} KZT remaining"
                 )
                 st.progress(row['Progress'] / 100)
+            show_refreshed("budget_progress")
         else:
             st.info("No budgets defined")
 
@@ -320,14 +427,13 @@ elif menu == "🧾 Transactions":
     
     if "tx_balance" not in st.session_state:
         initial_balance_from_accounts = sum(acc.balance for acc in accounts)
-        initial_balance_from_transactions = sum(account_balance(st.session_state.tx_transactions, acc.id) for acc in accounts)
+        initial_balance_from_transactions = sum(balances_by_account.get(acc.id, 0) for acc in accounts)
         st.session_state.tx_balance = initial_balance_from_accounts if initial_balance_from_accounts > 0 else max(initial_balance_from_transactions, 5000)
+    # start from the state replayed out of the event log
     if "tx_alerts" not in st.session_state:
-        st.session_state.tx_alerts = []
+        st.session_state.tx_alerts = list(event_log.state.alerts)
     if "tx_event_history" not in st.session_state:
-        st.session_state.tx_event_history = []
-    if "tx_budget_spent" not in st.session_state:
-        st.session_state.tx_budget_spent = {}
+        st.session_state.tx_event_history = list(event_log.state.history)
     
     st.title("🧾 Transactions")
     
@@ -354,7 +460,6 @@ elif menu == "🧾 Transactions":
         
         if st.button("🔧 Reset Balance", key="btn_reset_balance"):
             st.session_state.tx_balance = initial_balance_input
-            st.session_state.tx_budget_spent = {}
             st.rerun()
         
         st.caption(f"**Current Balance:** {st.session_state.tx_balance:,} KZT")
@@ -376,11 +481,10 @@ elif menu == "🧾 Transactions":
             )
 
         if st.button("🔄 Update Balances from Transactions", key="btn_update_balances"):
-            recomputed = {a.id: 0 for a in accounts}
-            for t in st.session_state.tx_transactions:
-                tid = t.account_id if hasattr(t, "account_id") else t.get("account_id")
-                tamt = t.amount if hasattr(t, "amount") else t.get("amount", 0)
-                recomputed[tid] = recomputed.get(tid, 0) + int(tamt)
+            st.session_state.tx_balance_index = BalanceIndex.from_ledger(
+                st.session_state.tx_transactions, (a.id for a in accounts)
+            )
+            recomputed = dict(st.session_state.tx_balance_index.snapshot())
             st.session_state.tx_account_balances = recomputed
             st.session_state.tx_balance = sum(recomputed.values())
             st.success("Per-account balances updated from transactions")
@@ -419,7 +523,6 @@ elif menu == "🧾 Transactions":
         if submitted:
             acc_id = next(a.id for a in accounts if a.name == account)
             cat_id = next(c.id for c in categories if c.name == category)
-            budget = next((b for b in budgets if b.cat_id == cat_id), None)
             
             cat_type = next((c.type for c in categories if c.id == cat_id), None)
             signed_amount = int(amount)
@@ -443,22 +546,26 @@ elif menu == "🧾 Transactions":
                 note=description or ""
             )
             
-            budget_limit = budget.limit if budget else 10000
-            current_spent = st.session_state.tx_budget_spent.get(cat_id, 0)
-            
             payload = {
                 "amount": signed_amount,
                 "account_id": acc_id,
                 "category_id": cat_id,
                 "cat_id": cat_id,
-                "budget_limit": budget_limit,
-                "current_spent": current_spent
+                "ts": new_tx.ts
             }
             
-            handlers_results = event_bus.publish(TRANSACTION_ADDED, payload)
+            # handlers run concurrently; a slow or failing one cannot block the submit
+            handlers_results = asyncio.run(
+                event_bus.publish_async(TRANSACTION_ADDED, payload, timeout=HANDLER_TIMEOUT)
+            )
 
+            ledger.add_transaction(new_tx)
 
-            st.session_state.tx_transactions = tuple(list(st.session_state.tx_transactions) + [new_tx])
+            st.session_state.tx_transactions = add_transaction(st.session_state.tx_transactions, new_tx)
+            st.session_state.tx_balance_index.apply(new_tx)
+            st.session_state.tx_monthly.add(new_tx)
+            report_cache.invalidate_tags(f"account:{acc_id}", f"category:{cat_id}", "rollup")
+            precompute.poke()
 
             st.session_state.tx_account_balances[acc_id] = st.session_state.tx_account_balances.get(acc_id, 0) + signed_amount
 
@@ -466,23 +573,26 @@ elif menu == "🧾 Transactions":
 
             alerts_triggered = []
             for result in handlers_results:
+                if "error" in result:
+                    st.warning(f"Event handler {result['handler']} failed: {result['error']}")
+                    continue
                 if "balance_delta" in result:
                     pass
-                if "alert" in result:
-                    alert_msg = result["alert"]
+                for alert in result.get("alerts", ()):
+                    alert_msg = alert["alert"]
                     st.session_state.tx_alerts.append({
                         "type": "Budget",
                         "message": alert_msg,
                         "timestamp": pd.Timestamp.now().strftime("%H:%M:%S")
                     })
                     alerts_triggered.append(alert_msg)
-                if "spent" in result:
-                    st.session_state.tx_budget_spent[cat_id] = result["spent"]
 
             acc_balance = st.session_state.tx_account_balances.get(acc_id, 0)
             acc_threshold = st.session_state.tx_account_thresholds.get(acc_id, 0)
             acc_balance_payload = {"balance": acc_balance, "threshold": acc_threshold}
-            acc_balance_results = event_bus.publish(BALANCE_ALERT, acc_balance_payload)
+            acc_balance_results = asyncio.run(
+                event_bus.publish_async(BALANCE_ALERT, acc_balance_payload, timeout=HANDLER_TIMEOUT)
+            )
             for result in acc_balance_results:
                 if "alert" in result:
                     alert_msg = result["alert"]
@@ -495,7 +605,7 @@ elif menu == "🧾 Transactions":
             
             st.session_state.tx_event_history.append({
                 "event": TRANSACTION_ADDED,
-                "payload": {k: v for k, v in payload.items() if k != "current_spent"},
+                "payload": dict(payload),
                 "timestamp": pd.Timestamp.now().strftime("%H:%M:%S")
             })
             
@@ -531,12 +641,13 @@ elif menu == "🧾 Transactions":
             budget_status_lines = []
             for budget in budgets[:3]:
                 cat_name = next((c.name for c in categories if c.id == budget.cat_id), budget.cat_id)
-                current_spent = st.session_state.tx_budget_spent.get(budget.cat_id, 0)
+                status = budget_tracker.status(budget.id)
+                current_spent = status.spent
                 remaining = budget.limit - current_spent
-                if current_spent > budget.limit:
-                    budget_status_lines.append(f"🔴 {cat_name}: **EXCEEDED** ({current_spent:,} / {budget.limit:,} KZT)")
+                if status.exceeded:
+                    budget_status_lines.append(f"🔴 {cat_name}: **EXCEEDED** ({current_spent:,} / {budget.limit:,} KZT, {status.bucket})")
                 else:
-                    budget_status_lines.append(f"✅ {cat_name}: {current_spent:,} / {budget.limit:,} KZT (need {remaining + 1:,} more)")
+                    budget_status_lines.append(f"✅ {cat_name}: {current_spent:,} / {budget.limit:,} KZT in {status.bucket} (need {remaining + 1:,} more)")
             st.info("\n".join(budget_status_lines) if budget_status_lines else "No spending tracked")
         else:
             st.info("No budgets defined")
@@ -552,49 +663,67 @@ elif menu == "Async/FRP · Reports" or menu == "⚡ Async/FRP · Reports":
 
     run = st.button("▶️ Run Reports (async)", key="btn_run_reports_simple")
 
-    if run:
-        st.info("Running reports...")
-        from concurrent.futures import ThreadPoolExecutor
-
-        # take a safe snapshot of transactions to pass to the background worker
-        tx_snapshot = list(st.session_state.get("tx_transactions", []))
-
-        def worker(selected_months, txs):
-            # run asyncio coroutines in a background thread to avoid blocking Streamlit
-            # Create and set a dedicated event loop for this thread to avoid "no current event loop" errors
-            import asyncio as _asyncio
-
-            loop = _asyncio.new_event_loop()
-            try:
-                _asyncio.set_event_loop(loop)
-                from core.async_reports import expenses_by_month, balance_forecast
+    from core.jobs import get_manager
 
-                coro = _asyncio.gather(
-                    expenses_by_month(txs, selected_months),
-                    balance_forecast(accounts, txs),
-                )
-                return loop.run_until_complete(coro)
-            finally:
-                try:
-                    loop.close()
-                except Exception:
-                    pass
+    job_manager = get_manager()
+    tx_snapshot = st.session_state.get("tx_transactions", [])
 
-        with ThreadPoolExecutor(max_workers=1) as ex:
-            fut = ex.submit(worker, sel_months, tx_snapshot)
+    if run:
+        # identical in-flight requests come back as the same jobs
+        st.session_state.report_jobs = [
+            job_manager.submit("expenses_by_month", tx_snapshot, sel_months, deadline=60).id,
+            job_manager.submit("balance_forecast", accounts, tx_snapshot, deadline=60).id,
+        ]
+        st.session_state.report_budget_totals = None
+        if sel_months:
+            from core.mapreduce import get_engine
+
+            engine = get_engine()
             try:
-                exp_res, bal_res = fut.result(timeout=10)
-                st.success("Reports finished")
-                st.write("Expenses by month:")
-                st.table(pd.DataFrame([{"month": k, "expense": v} for k, v in exp_res.items()]))
-                st.write("Forecast balances:")
-                st.table(pd.DataFrame([{"account_id": k, "forecast": v} for k, v in bal_res.items()]))
+                start_t = time.time()
+                budget_res = engine.budget_totals(budgets, tx_snapshot, months=sel_months)
+                elapsed_ms = (time.time() - start_t) * 1000
+                st.session_state.report_budget_totals = (budget_res, elapsed_ms, engine.workers)
             except Exception as e:
                 st.error(f"Failed to run reports: {e}")
 
+    if st.session_state.get("report_budget_totals"):
+        budget_res, elapsed_ms, workers = st.session_state.report_budget_totals
+        st.write(f"Budget spend in selected months ({elapsed_ms:.1f} ms, {workers} worker processes):")
+        st.table(pd.DataFrame([
+            {"budget": b.id, "category": b.cat_id, "spent": budget_res.get(b.id, 0), "limit": b.limit}
+            for b in budgets
+        ]))
+
+    report_jobs = [job_manager.get(j) for j in st.session_state.get("report_jobs", [])]
+    report_jobs = [j for j in report_jobs if j is not None]
+    if report_jobs:
+        exp_job, bal_job = (report_jobs + [None, None])[:2]
+        for job in report_jobs:
+            st.progress(job.progress, text=f"{job.name}: {job.status} ({job.processed:,} / {job.total:,} rows)")
+            if job.error:
+                st.error(f"Failed to run {job.name}: {job.error}")
+        if exp_job is not None and exp_job.partial is not None:
+            st.write("Expenses by month:")
+            st.table(pd.DataFrame([{"month": k, "expense": v} for k, v in exp_job.partial.items()]))
+        if bal_job is not None and bal_job.partial is not None:
+            st.write("Forecast balances:")
+            st.table(pd.DataFrame([{"account_id": k, "forecast": v} for k, v in bal_job.partial.items()]))
+
+        running = [j for j in report_jobs if not j.done]
+        if running:
+            if st.button("⏹ Cancel reports", key="btn_cancel_reports"):
+                for job in running:
+                    job_manager.cancel(job.id)
+            # poll instead of blocking the script thread on the result
+            time.sleep(0.3)
+            st.rerun()
+        elif all(j.status == "done" for j in report_jobs):
+            st.success("Reports finished")
+
 elif menu == "✅ Validation":
     from core.recursion import by_category, by_date_range, by_amount_range
-    from core.functional import safe_category, validate_transaction, check_budget
+    from core.functional import safe_category, validate_transaction, validate_transactions
     from core.domain import Transaction
     
     st.title("✅ Validation & Budgets")
@@ -654,7 +783,7 @@ elif menu == "✅ Validation":
             b_names = [f"{b.id} ({b.cat_id})" for b in budgets]
             b_choice = st.selectbox("Select budget to check", b_names, key="budget_choice")
             b_idx = b_names.index(b_choice)
-            budget_result = check_budget(budgets[b_idx], transactions)
+            budget_result = ledger.check_budget(budgets[b_idx])
             if budget_result.is_right():
                 st.success(f"✅ Budget not exceeded for category {budgets[b_idx].cat_id}")
             else:
@@ -666,6 +795,17 @@ elif menu == "✅ Validation":
         else:
             st.info("No budgets to check")
     
+    st.write("**Ledger Validation**")
+    report = validate_transactions(st.session_state.tx_transactions, accounts, categories)
+    if report.ok:
+        st.success(f"✅ All {len(report):,} transactions are valid")
+    else:
+        st.error(f"❌ {len(report.error_rows):,} of {len(report):,} transactions failed validation")
+        st.table(pd.DataFrame([{"error": k, "count": v} for k, v in report.counts().items()]))
+        with st.expander("First errors"):
+            for row, err in islice(report.errors(), 20):
+                st.write(f"Row {row}: {err.get_error()['message']}")
+    
     st.divider()
     
     st.subheader("Filters and Statistics")
@@ -679,9 +819,9 @@ elif menu == "✅ Validation":
         end_date = st.text_input("End Date (YYYY-MM-DD)", value="2024-12-31")
 
     from core.recursion import by_category, by_date_range, by_amount_range
-    food_trans = list(filter(by_category(food_id), transactions))
+    food_trans = ledger.by_category(food_id)
     st.write(f"Transactions in category {cat_name_fc}: {len(food_trans)}")
-    date_trans = list(filter(by_date_range(start_date, end_date), transactions))
+    date_trans = ledger.by_date_range(start_date, end_date)
     st.write(f"Transactions in period: {len(date_trans)}")
     amount_trans = list(filter(by_amount_range(-5000, -1000), transactions))
     st.write(f"Expenses between -5000 and -1000: {len(amount_trans)}")
@@ -690,7 +830,7 @@ elif menu == "✅ Validation":
     st.write(f"First 5 amounts: {transaction_amounts(transactions)[:5]}")
     acc = st.selectbox("Select account for balance", [a.name for a in accounts], key="acc_balance")
     acc_id = next(a.id for a in accounts if a.name == acc)
-    st.write(f"Selected account balance ({acc}): {account_balance(st.session_state.tx_transactions, acc_id):,} KZT")
+    st.write(f"Selected account balance ({acc}): {balances_by_account.get(acc_id, 0):,} KZT")
 
 elif menu == "📑 Reports":
     st.title("📑 Reports")
@@ -749,7 +889,19 @@ elif menu == "📑 Reports":
             return {"budget_totals": totals}
 
         svc = BudgetService(validators=[validator_has_budgets], calculators=[calc_budget_totals])
-        rpt = svc.monthly_report(month, st.session_state.tx_transactions, budgets, categories)
+        # computed from the shared ledger the key names, never from this
+        # session's (possibly stale) copy; the revision is read first, so a
+        # racing insert can only make the value newer than its key
+        rpt = report_cache.get_or_compute(
+            (
+                "budget_report", month, ledger.path, ledger.revision(),
+                tuple((b.id, b.cat_id, b.limit, b.period) for b in budgets),
+            ),
+            lambda: svc.monthly_report(
+                month, ledger.by_date_range(month, month + "\uffff"), budgets, categories
+            ),
+            tags=["budgets"] + [f"category:{b.cat_id}" for b in budgets],
+        )
 
         # Top-level summary metrics (styled)
         totals = rpt['result'].get('budget_totals', {})
@@ -816,7 +968,11 @@ elif menu == "📑 Reports":
             return {"count": count, "total_expense": total}
 
         rsvc = ReportService(aggregators=[agg_category_summary])
-        cr = rsvc.category_report(sel_id, st.session_state.tx_transactions, categories)
+        cr = report_cache.get_or_compute(
+            ("category_report", sel_id, ledger.path, ledger.revision()),
+            lambda: rsvc.category_report(sel_id, ledger.by_category(sel_id), categories),
+            tags=[f"category:{sel_id}"],
+        )
 
         # show metrics and a monthly breakdown
         st.header(sel)
@@ -824,14 +980,13 @@ elif menu == "📑 Reports":
         col_a.metric("Transactions", cr['result'].get('count', 0))
         col_b.metric("Total Expense", f"{cr['result'].get('total_expense', 0):,.0f} KZT")
         # monthly breakdown
-        cat_trans = [t for t in st.session_state.tx_transactions if _get_catid(t) == sel_id]
-        if cat_trans:
-            dates = pd.to_datetime([str(_get_date(t)) for t in cat_trans], errors='coerce')
-            dfc = pd.DataFrame({"date": dates, "amount": [_get_amount(t) for t in cat_trans]})
-            dfc = dfc.dropna(subset=['date'])
-            if not dfc.empty:
-                monthly = dfc.set_index('date').resample('M')['amount'].sum().abs()
-                df_month = pd.DataFrame({"month": [d.strftime('%Y-%m') for d in monthly.index], "amount": monthly.values})
+        cat_months = st.session_state.tx_monthly.category_months(sel_id)
+        if cat_months:
+            net = dict(cat_months)
+            month_index = pd.period_range(cat_months[0][0], cat_months[-1][0], freq='M')
+            if len(month_index):
+                monthly = [abs(net.get(str(p), 0)) for p in month_index]
+                df_month = pd.DataFrame({"month": [str(p) for p in month_index], "amount": monthly})
                 figm = px.bar(df_month, x='month', y='amount', title=f"Monthly spending for {sel}", template='plotly_dark')
                 st.plotly_chart(figm, use_container_width=True)
                 st.table(df_month)
@@ -845,7 +1000,7 @@ elif menu == "📑 Reports":
                 st.write(cr['result'])
 
 elif menu == "📊 Analytics":
-    from core.lazy import iter_transactions, lazy_top_categories
+    from core.lazy import iter_transactions
 
     st.title("📊 Analytics")
 
@@ -854,8 +1009,9 @@ elif menu == "📊 Analytics":
     cat_names = {c.name: c.id for c in categories}
     selected_name = st.selectbox("Category", list(cat_names.keys()))
     selected_id = cat_names[selected_name]
-    subs = flatten_categories(categories, selected_id)
-    total = sum_expenses_recursive(categories, st.session_state.tx_transactions, selected_id)
+    subs = flatten_categories(category_tree, selected_id)
+    rollup = category_rollup(st.session_state.tx_transactions)
+    total = rollup.get(selected_id, 0)
     col_left, col_right = st.columns([2, 3])
     with col_left:
         st.write("Subcategories:")
@@ -866,7 +1022,7 @@ elif menu == "📊 Analytics":
         # small pie of subcategory totals
         pie_data = []
         for c in subs:
-            amt = sum_expenses_recursive(categories, st.session_state.tx_transactions, c.id)
+            amt = rollup.get(c.id, 0)
             if amt != 0:
                 pie_data.append({"name": c.name, "value": abs(amt)})
         if pie_data:
@@ -881,26 +1037,63 @@ elif menu == "📊 Analytics":
     # Forecast
     st.subheader("Expense forecast (6 months)")
     start_t = time.time()
-    _ = forecast_expenses(selected_id, tuple(st.session_state.tx_transactions), 6)
+    _ = forecast_expenses(selected_id, st.session_state.tx_transactions, 6)
     uncached_time = (time.time() - start_t) * 1000
     start_t = time.time()
-    forecast_value = forecast_expenses(selected_id, tuple(st.session_state.tx_transactions), 6)
+    forecast_value = forecast_expenses(selected_id, st.session_state.tx_transactions, 6)
     cached_time = (time.time() - start_t) * 1000
     st.metric("Forecasted Expenses", f"{forecast_value:,.0f} KZT")
     st.caption(f"⏱ Without cache: {uncached_time:.3f} ms | With cache: {cached_time:.3f} ms")
+    trailing_avg = st.session_state.tx_monthly.forecast(selected_id, 6)
+    st.metric("Average monthly expense (last 6 months)", f"{abs(trailing_avg):,.0f} KZT")
+
+    st.subheader("Portfolio forecast (all categories)")
+    from core.forecast import expense_matrix, forecast_all
+
+    fc_cols = st.columns(3)
+    with fc_cols[0]:
+        fc_model = st.selectbox("Model", ["mean", "ewma", "trend", "seasonal"], key="fc_model")
+    with fc_cols[1]:
+        fc_horizon = st.slider("Months ahead", 1, 6, 1, key="fc_horizon")
+    with fc_cols[2]:
+        fc_level = st.slider("Interval level", 0.5, 0.99, 0.8, key="fc_level")
+    try:
+        start_t = time.time()
+        fc_matrix = precompute.value("expense_matrix") or expense_matrix(st.session_state.tx_monthly)
+        fc = forecast_all(fc_matrix, fc_model, horizon=fc_horizon, level=fc_level)
+        fc_ms = (time.time() - start_t) * 1000
+    except ValueError as e:
+        st.warning(f"Cannot forecast: {e}")
+    else:
+        cat_label = {c.id: c.name for c in categories}
+        st.dataframe(pd.DataFrame([
+            {
+                "Category": cat_label.get(cat_id, cat_id),
+                "Month": fc.months[-1],
+                "Forecast": round(fc.point[i, -1]),
+                "Low": round(fc.lower[i, -1]),
+                "High": round(fc.upper[i, -1]),
+            }
+            for i, cat_id in enumerate(fc.categories)
+        ]), use_container_width=True)
+        st.caption(f"⏱ {len(fc.categories)} categories forecast in {fc_ms:.2f} ms")
+        show_refreshed("expense_matrix")
 
     st.divider()
 
     # Top-k categories
     st.subheader("Top expense categories")
     k = st.number_input("Show top-K categories:", min_value=1, max_value=20, value=5, key="top_k_analytics")
-    if st.button("Calculate Top Categories", key="btn_top_k_analytics"):
+    top_cats = precompute.value("top_categories")
+    if top_cats is None:
         expense_gen = iter_transactions(st.session_state.tx_transactions, lambda t: getattr(t, 'amount', t.get('amount') if isinstance(t, dict) else 0) < 0)
-        top_cats = list(lazy_top_categories(expense_gen, categories, k))
-        if top_cats:
-            df_top = pd.DataFrame([{"Category": n, "Amount": v} for n, v in top_cats])
-            fig_top = px.bar(df_top, x='Category', y='Amount', title='Top expense categories', template='plotly_dark')
-            st.plotly_chart(fig_top, use_container_width=True)
-            st.table(df_top)
-        else:
-            st.info("No data to analyze")
+        top_cats = list(lazy_top_categories(expense_gen, categories, 20))
+    top_cats = top_cats[:k]
+    if top_cats:
+        df_top = pd.DataFrame([{"Category": n, "Amount": v} for n, v in top_cats])
+        fig_top = px.bar(df_top, x='Category', y='Amount', title='Top expense categories', template='plotly_dark')
+        st.plotly_chart(fig_top, use_container_width=True)
+        st.table(df_top)
+        show_refreshed("top_categories")
+    else:
+        st.info("No data to analyze")
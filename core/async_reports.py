@@ -1,49 +1,124 @@
 import asyncio
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Tuple
 from core.domain import Transaction, Account
-from collections import defaultdict
+from core.store import TransactionStore
+
+# rows scanned between yields to the event loop
+YIELD_EVERY = 50_000
+
+
+def _chunks(n: int, size: int):
+    for start in range(0, n, size):
+        yield start, min(start + size, n)
+
+
+async def iter_expenses_by_month(
+    trans: List[Transaction], months: List[str], chunk_rows: int = 0
+) -> AsyncIterator[Tuple[int, Dict[str, int]]]:
+    """Scan once, yielding ``(rows_done, totals_so_far)`` after every chunk."""
+    chunk_rows = chunk_rows or YIELD_EVERY
+    wanted = set(months)
+    lengths = sorted({len(m) for m in wanted})
+    totals = dict.fromkeys(wanted, 0)
+
+    def add(ts, amount) -> None:
+        try:
+            # allow ts like '2025-01-03' or pandas Timestamp string
+            if ts and amount < 0:
+                ts = str(ts)
+                for n in lengths:
+                    key = ts[:n]
+                    if key in wanted:
+                        totals[key] += abs(int(amount))
+        except Exception:
+            pass
+
+    def snapshot() -> Dict[str, int]:
+        return {m: totals[m] for m in months}
+
+    if isinstance(trans, TransactionStore):
+        ts_codes, amounts, decode = trans.ts_codes, trans.amounts, trans.timestamps.decode
+        if not len(trans):
+            yield 0, snapshot()
+        for start, stop in _chunks(len(trans), chunk_rows):
+            # bucket by timestamp code, then resolve each distinct ts once
+            by_ts: Dict[int, int] = {}
+            for ts, amount in zip(ts_codes[start:stop], amounts[start:stop]):
+                if amount < 0:
+                    by_ts[ts] = by_ts.get(ts, 0) + amount
+            for ts, total in by_ts.items():
+                add(decode(ts), total)
+            yield stop, snapshot()
+            await asyncio.sleep(0)  # cooperate
+        return
+
+    done = 0
+    for t in trans:
+        add(getattr(t, "ts", None), getattr(t, "amount", 0))
+        done += 1
+        if done % chunk_rows == 0:
+            yield done, snapshot()
+            await asyncio.sleep(0)  # cooperate
+    if done % chunk_rows or not done:
+        yield done, snapshot()
 
 
 async def expenses_by_month(trans: List[Transaction], months: List[str]) -> Dict[str, int]:
-    """Compute total expenses per month in parallel for given months.
+    """Compute total expenses per month for given months in one pass.
 
-    months: list of YYYY-MM strings (e.g., '2025-01')
+    months: list of YYYY-MM strings (e.g., '2025-01'); any ts prefix works
     Returns mapping month->total_expense (positive int representing absolute expense)
     """
-    async def month_total(month: str) -> tuple[str, int]:
-        # simulate async work
-        total = 0
-        ym = month
-        for t in trans:
-            ts = getattr(t, "ts", None)
-            try:
-                # allow ts like '2025-01-03' or pandas Timestamp string
-                if ts and str(ts).startswith(ym) and getattr(t, "amount", 0) < 0:
-                    total += abs(int(t.amount))
-            except Exception:
-                continue
-        await asyncio.sleep(0)  # cooperate
-        return month, total
-
-    results = await asyncio.gather(*(month_total(m) for m in months))
-    return {k: v for k, v in results}
+    result: Dict[str, int] = {m: 0 for m in months}
+    async for _, result in iter_expenses_by_month(trans, months):
+        pass
+    return result
+
+
+async def iter_balance_forecast(
+    accounts: List[Account], trans: List[Transaction], chunk_rows: int = 0
+) -> AsyncIterator[Tuple[int, Dict[str, int]]]:
+    """Scan once, yielding ``(rows_done, forecast_so_far)`` after every chunk."""
+    chunk_rows = chunk_rows or YIELD_EVERY
+    sums: Dict[str, int] = {}
+
+    def snapshot() -> Dict[str, int]:
+        return {a.id: a.balance + sums.get(a.id, 0) for a in accounts}
+
+    if isinstance(trans, TransactionStore):
+        codes, amounts, decode = trans.account_codes, trans.amounts, trans.accounts.decode
+        if not len(trans):
+            yield 0, snapshot()
+        for start, stop in _chunks(len(trans), chunk_rows):
+            by_code: Dict[int, int] = {}
+            for code, amount in zip(codes[start:stop], amounts[start:stop]):
+                by_code[code] = by_code.get(code, 0) + amount
+            for code, total in by_code.items():
+                acct_id = decode(code)
+                sums[acct_id] = sums.get(acct_id, 0) + total
+            yield stop, snapshot()
+            await asyncio.sleep(0)
+        return
+
+    done = 0
+    for t in trans:
+        acct_id = getattr(t, "account_id", None)
+        sums[acct_id] = sums.get(acct_id, 0) + int(getattr(t, "amount", 0))
+        done += 1
+        if done % chunk_rows == 0:
+            yield done, snapshot()
+            await asyncio.sleep(0)
+    if done % chunk_rows or not done:
+        yield done, snapshot()
 
 
 async def balance_forecast(accounts: List[Account], trans: List[Transaction]) -> Dict[str, int]:
-    """Produce a simple balance forecast per account in parallel.
+    """Produce a simple balance forecast per account in one pass.
 
     For each account, sum transactions for that account and add to the account.balance
     to produce a forecasted balance.
     """
-    async def acc_forecast(a: Account) -> tuple[str, int]:
-        acct_id = a.id
-        acc_balance = a.balance
-        tx_sum = 0
-        for t in trans:
-            if getattr(t, "account_id", None) == acct_id:
-                tx_sum += int(getattr(t, "amount", 0))
-        await asyncio.sleep(0)
-        return acct_id, acc_balance + tx_sum
-
-    results = await asyncio.gather(*(acc_forecast(a) for a in accounts))
-    return {k: v for k, v in results}
+    result: Dict[str, int] = {a.id: a.balance for a in accounts}
+    async for _, result in iter_balance_forecast(accounts, trans):
+        pass
+    return result
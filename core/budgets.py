@@ -0,0 +1,347 @@
+import functools
+import threading
+from bisect import bisect_left
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence
+
+from core.domain import Budget, Transaction
+from core.events import BUDGET_ALERT, TRANSACTION_ADDED, Event, EventBus, batch_handler
+from core.store import TransactionStore
+
+THRESHOLDS = (0.8, 1.0, 1.2)
+
+
+@lru_cache(maxsize=None)
+def _iso_week(day: str) -> str:
+    year, week, _ = date.fromisoformat(day).isocalendar()
+    return f"{year:04d}-W{week:02d}"
+
+
+def _month(ts: str) -> str:
+    return ts[:7]
+
+
+def _week(ts: str) -> str:
+    return _iso_week(ts[:10])
+
+
+def _year(ts: str) -> str:
+    return ts[:4]
+
+
+PERIODS: dict[str, Callable[[str], str]] = {
+    "monthly": _month,
+    "month": _month,
+    "weekly": _week,
+    "week": _week,
+    "yearly": _year,
+    "year": _year,
+}
+
+
+def period_key(ts: str, period: str) -> str:
+    """Calendar bucket of ``ts``: ``YYYY-MM``, ISO ``YYYY-Www`` or ``YYYY``."""
+    try:
+        return PERIODS[period](ts)
+    except KeyError:
+        raise ValueError(f"Unknown budget period: {period}") from None
+
+
+class BudgetStatus(NamedTuple):
+    budget_id: str
+    cat_id: str
+    period: str
+    bucket: str
+    limit: int
+    spent: int
+    remaining: int
+    overage: int
+    percent: float
+
+    @property
+    def exceeded(self) -> bool:
+        return self.overage > 0
+
+
+def _status(b: Budget, bucket: str, spent: int) -> BudgetStatus:
+    if b.limit > 0:
+        percent = spent * 100 / b.limit
+    else:
+        percent = 0.0 if spent == 0 else float("inf")
+    return BudgetStatus(
+        budget_id=b.id,
+        cat_id=b.cat_id,
+        period=b.period,
+        bucket=bucket,
+        limit=b.limit,
+        spent=spent,
+        remaining=max(b.limit - spent, 0),
+        overage=max(spent - b.limit, 0),
+        percent=percent,
+    )
+
+
+def _daily_expenses(trans: Iterable[Transaction], cat_ids: set[str]) -> dict[tuple[str, str], int]:
+    """``{(cat_id, ts): spent}`` for expense rows of the budgeted categories."""
+    daily: dict[tuple[str, str], int] = {}
+    if isinstance(trans, TransactionStore):
+        codes = {c for c in map(trans.categories.code, cat_ids) if c is not None}
+        by_code: dict[tuple[int, int], int] = {}
+        for cat, ts, amount in zip(trans.category_codes, trans.ts_codes, trans.amounts):
+            if amount < 0 and cat in codes:
+                key = (cat, ts)
+                by_code[key] = by_code.get(key, 0) - amount
+        decode_cat, decode_ts = trans.categories.decode, trans.timestamps.decode
+        for (cat, ts), spent in by_code.items():
+            daily[decode_cat(cat), decode_ts(ts)] = spent
+        return daily
+
+    for t in trans:
+        if t.amount < 0 and t.cat_id in cat_ids:
+            key = (t.cat_id, t.ts)
+            daily[key] = daily.get(key, 0) - t.amount
+    return daily
+
+
+def evaluate_budgets(
+    budgets: Iterable[Budget],
+    trans: Iterable[Transaction],
+    at: Optional[str] = None,
+) -> dict[str, list[BudgetStatus]]:
+    """Spending against every budget, per calendar period, in one grouped pass.
+
+    Expenses are matched on the exact ``cat_id`` like ``check_budget``. The
+    result maps each budget id to its statuses ordered by period; with
+    ``at`` only the period containing that date is reported (with zero
+    spent if nothing was spent in it).
+    """
+    budgets = tuple(budgets)
+    for b in budgets:
+        if b.period not in PERIODS:
+            raise ValueError(f"Unknown budget period: {b.period}")
+    daily = _daily_expenses(trans, {b.cat_id for b in budgets})
+
+    # fold the (cat, ts) totals into buckets once per distinct period kind
+    spent_by: dict[Callable[[str], str], dict[tuple[str, str], int]] = {}
+    for bucket_of in {PERIODS[b.period] for b in budgets}:
+        totals: dict[tuple[str, str], int] = {}
+        for (cat_id, ts), spent in daily.items():
+            key = (cat_id, bucket_of(ts))
+            totals[key] = totals.get(key, 0) + spent
+        spent_by[bucket_of] = totals
+
+    per_cat: dict[Callable[[str], str], dict[str, list[tuple[str, int]]]] = {}
+    for bucket_of, totals in spent_by.items():
+        grouped: dict[str, list[tuple[str, int]]] = {}
+        for (cat_id, bucket), spent in sorted(totals.items()):
+            grouped.setdefault(cat_id, []).append((bucket, spent))
+        per_cat[bucket_of] = grouped
+
+    result: dict[str, list[BudgetStatus]] = {}
+    for b in budgets:
+        bucket_of = PERIODS[b.period]
+        if at is not None:
+            bucket = bucket_of(at)
+            spent = spent_by[bucket_of].get((b.cat_id, bucket), 0)
+            result[b.id] = [_status(b, bucket, spent)]
+        else:
+            result[b.id] = [
+                _status(b, bucket, spent) for bucket, spent in per_cat[bucket_of].get(b.cat_id, ())
+            ]
+    return result
+
+
+class BudgetTracker:
+    """Running spend per (budget, period), kept current by ``TRANSACTION_ADDED``.
+
+    The ledger is folded once at construction; after that each event
+    updates the buckets of its category's budgets in O(1). A bucket's
+    level is the number of ``thresholds`` (fractions of the limit) its
+    spend exceeds, and ``BUDGET_ALERT`` is published only when an event
+    raises that level, once per threshold crossed. Changing thresholds
+    recomputes levels from the running totals, not from transactions.
+    ``publish_many`` uses ``handle_batch``, which sums a batch per
+    (budget, period) before levels are checked.
+    """
+
+    def __init__(
+        self,
+        budgets: Iterable[Budget],
+        trans: Iterable[Transaction] = (),
+        thresholds: Sequence[float] = THRESHOLDS,
+    ):
+        self.budgets: dict[str, Budget] = {}
+        self._by_cat: dict[str, list[Budget]] = {}
+        for b in budgets:
+            if b.period not in PERIODS:
+                raise ValueError(f"Unknown budget period: {b.period}")
+            self.budgets[b.id] = b
+            self._by_cat.setdefault(b.cat_id, []).append(b)
+        self._spent: dict[tuple[str, str], int] = {}
+        self._levels: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.bus: Optional[EventBus] = None
+        # what gets subscribed: ``handle`` carrying ``handle_batch`` for publish_many
+        self._subscriber = batch_handler(self.handle_batch)(functools.partial(BudgetTracker.handle, self))
+
+        for (cat_id, ts), spent in _daily_expenses(trans, set(self._by_cat)).items():
+            for b in self._by_cat[cat_id]:
+                key = (b.id, PERIODS[b.period](ts))
+                self._spent[key] = self._spent.get(key, 0) + spent
+        self.set_thresholds(thresholds)
+
+    @property
+    def thresholds(self) -> tuple[float, ...]:
+        return self._thresholds
+
+    def set_thresholds(self, thresholds: Sequence[float]) -> None:
+        """Replace the thresholds; current spend is not re-alerted."""
+        thresholds = tuple(sorted(set(thresholds)))
+        if any(t <= 0 for t in thresholds):
+            raise ValueError("Budget thresholds must be positive")
+        with self._lock:
+            self._thresholds = thresholds
+            self._levels = {
+                key: self._level(self.budgets[key[0]], spent) for key, spent in self._spent.items()
+            }
+
+    def _level(self, b: Budget, spent: int) -> int:
+        """How many thresholds ``spent`` exceeds."""
+        if b.limit <= 0:
+            return len(self._thresholds) if spent > 0 else 0
+        return bisect_left(self._thresholds, spent / b.limit)
+
+    def attach(self, bus: EventBus) -> "BudgetTracker":
+        """Subscribe to ``bus`` and publish alerts on it (once per bus)."""
+        if self.bus is not bus:
+            if self.bus is not None:
+                self.bus.unsubscribe(TRANSACTION_ADDED, self._subscriber)
+            bus.subscribe(TRANSACTION_ADDED, self._subscriber)
+            self.bus = bus
+        return self
+
+    def detach(self) -> None:
+        if self.bus is not None:
+            self.bus.unsubscribe(TRANSACTION_ADDED, self._subscriber)
+            self.bus = None
+
+    def add(self, cat_id: str, amount: int, ts: str) -> list[dict]:
+        """Record one transaction; returns the alerts for thresholds it crossed."""
+        if amount >= 0:
+            return []
+        alerts: list[dict] = []
+        with self._lock:
+            for b in self._by_cat.get(cat_id, ()):
+                self._spend_locked(b, PERIODS[b.period](ts), -amount, alerts)
+        return alerts
+
+    def _spend_locked(self, b: Budget, bucket: str, amount: int, alerts: list[dict]) -> int:
+        key = (b.id, bucket)
+        spent = self._spent[key] = self._spent.get(key, 0) + amount
+        before = self._levels.get(key, 0)
+        level = self._levels[key] = self._level(b, spent)
+        for t in self._thresholds[before:level]:
+            alerts.append(_alert(b, bucket, spent, t))
+        return spent
+
+    def add_many(self, rows: Iterable[tuple[str, int, str]]) -> tuple[dict[tuple[str, str], int], list[dict]]:
+        """Record ``(cat_id, amount, ts)`` rows at once.
+
+        Spend is summed per (budget, period) first, so levels are checked
+        and alerts raised once per key. Returns the new spend of every
+        touched key and the alerts.
+        """
+        by_day: dict[tuple[str, str], int] = {}
+        for cat_id, amount, ts in rows:
+            if amount < 0 and cat_id in self._by_cat:
+                key = (cat_id, ts)
+                by_day[key] = by_day.get(key, 0) - amount
+        deltas: dict[tuple[Budget, str], int] = {}
+        for (cat_id, ts), amount in by_day.items():
+            for b in self._by_cat[cat_id]:
+                key = (b, PERIODS[b.period](ts))
+                deltas[key] = deltas.get(key, 0) + amount
+        spent: dict[tuple[str, str], int] = {}
+        alerts: list[dict] = []
+        with self._lock:
+            for (b, bucket), amount in deltas.items():
+                spent[(b.id, bucket)] = self._spend_locked(b, bucket, amount, alerts)
+        return spent, alerts
+
+    def handle(self, event: Event, payload: dict) -> dict:
+        """``TRANSACTION_ADDED`` handler; publishes a ``BUDGET_ALERT`` per crossing."""
+        cat_id = payload.get("category_id") or payload.get("cat_id", "")
+        ts = payload.get("ts") or event.ts[:10]
+        alerts = self.add(cat_id, payload.get("amount", 0), ts)
+        if self.bus is not None:
+            for alert in alerts:
+                self.bus.publish(BUDGET_ALERT, alert)
+        return {
+            "budgets": {b.id: self.spent(b.id, ts) for b in self._by_cat.get(cat_id, ())},
+            "alerts": alerts,
+        }
+
+    def handle_batch(self, event: Event, payloads: List[dict]) -> dict:
+        """Batch form of ``handle``; ``budgets`` maps budget id to ``{period: spent}``."""
+        day = event.ts[:10]
+        spent, alerts = self.add_many(
+            (p.get("category_id") or p.get("cat_id", ""), p.get("amount", 0), p.get("ts") or day)
+            for p in payloads
+        )
+        if self.bus is not None:
+            for alert in alerts:
+                self.bus.publish(BUDGET_ALERT, alert)
+        budgets: dict[str, dict[str, int]] = {}
+        for (budget_id, bucket), total in spent.items():
+            budgets.setdefault(budget_id, {})[bucket] = total
+        return {"budgets": budgets, "alerts": alerts}
+
+    def spent(self, budget_id: str, at: Optional[str] = None) -> int:
+        """Spend of the period containing ``at`` (default: today)."""
+        b = self.budgets[budget_id]
+        return self._spent.get((b.id, PERIODS[b.period](at or date.today().isoformat())), 0)
+
+    def status(self, budget_id: str, at: Optional[str] = None) -> BudgetStatus:
+        b = self.budgets[budget_id]
+        bucket = PERIODS[b.period](at or date.today().isoformat())
+        return _status(b, bucket, self._spent.get((b.id, bucket), 0))
+
+    def statuses(self, at: Optional[str] = None) -> dict[str, BudgetStatus]:
+        return {budget_id: self.status(budget_id, at) for budget_id in self.budgets}
+
+
+def _alert(b: Budget, bucket: str, spent: int, threshold: float) -> dict:
+    percent = threshold * 100
+    return {
+        "alert": f"Budget for category {b.cat_id} passed {percent:.0f}% in {bucket}: {spent} / {b.limit} KZT",
+        "budget_id": b.id,
+        "category_id": b.cat_id,
+        "period": bucket,
+        "threshold": threshold,
+        "spent": spent,
+        "limit": b.limit,
+    }
+
+
+_tracker: Optional[BudgetTracker] = None
+_tracker_budgets: frozenset = frozenset()
+_tracker_lock = threading.Lock()
+
+
+def get_budget_tracker(budgets: Iterable[Budget], trans: Iterable[Transaction]) -> BudgetTracker:
+    """The process-wide tracker for ``budgets``.
+
+    It is folded from ``trans`` on first use and whenever the budget set
+    changes; the replaced tracker is detached from its bus.
+    """
+    global _tracker, _tracker_budgets
+    budgets = tuple(budgets)
+    key = frozenset(budgets)
+    with _tracker_lock:
+        if _tracker is None or key != _tracker_budgets:
+            if _tracker is not None:
+                _tracker.detach()
+            _tracker = BudgetTracker(budgets, trans)
+            _tracker_budgets = key
+        return _tracker
@@ -1,44 +1,98 @@
-from dataclasses import dataclass
-from typing import Optional
+import sys
+from dataclasses import dataclass, fields
+from typing import Optional, Union
+from uuid import UUID
 
 
-@dataclass(frozen=True)
-class Account:
+def intern_id(value):
+    """Return the pooled copy of an id string so equal ids share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def compact_id(value: Union[str, int]) -> Union[str, int]:
+    """Store a uuid-formatted id as its 128-bit integer, leave other ids as is."""
+    if isinstance(value, str) and len(value) == 36:
+        try:
+            return UUID(value).int
+        except ValueError:
+            pass
+    return value
+
+
+class _Slotted:
+    """Base for slotted models: keeps ``obj.__dict__`` / ``vars(obj)`` working."""
+
+    __slots__ = ()
+
+    @property
+    def __dict__(self) -> dict:
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    def _intern(self, *names: str) -> None:
+        for name in names:
+            object.__setattr__(self, name, intern_id(getattr(self, name)))
+
+
+@dataclass(frozen=True, slots=True)
+class Account(_Slotted):
     id: str
     name: str
     balance: int
     currency: str
 
+    def __post_init__(self):
+        self._intern("id", "currency")
 
-@dataclass(frozen=True)
-class Category:
+
+@dataclass(frozen=True, slots=True)
+class Category(_Slotted):
     id: str
     name: str
     parent_id: Optional[str]
     type: str
 
+    def __post_init__(self):
+        self._intern("id", "parent_id", "type")
 
-@dataclass(frozen=True)
-class Transaction:
-    id: str
+
+@dataclass(frozen=True, slots=True)
+class Transaction(_Slotted):
+    id: Union[str, int]
     account_id: str
     cat_id: str
     amount: int
     ts: str
     note: str = ""
 
+    def __post_init__(self):
+        self._intern("account_id", "cat_id", "ts")
+
 
-@dataclass(frozen=True)
-class Budget:
+@dataclass(frozen=True, slots=True)
+class Budget(_Slotted):
     id: str
     cat_id: str
     limit: int
     period: str
 
+    def __post_init__(self):
+        self._intern("id", "cat_id", "period")
 
-@dataclass(frozen=True)
-class Event:
+
+@dataclass(frozen=True, slots=True)
+class Event(_Slotted):
     id: str
     ts: str
     name: str
     payload: dict
+
+    def __post_init__(self):
+        self._intern("name")
+
+
+def compact_transaction(t: Transaction) -> Transaction:
+    """Return ``t`` with its id stored as a 128-bit int when it is a uuid."""
+    tx_id = compact_id(t.id)
+    if tx_id is t.id:
+        return t
+    return Transaction(tx_id, t.account_id, t.cat_id, t.amount, t.ts, t.note)
@@ -0,0 +1,297 @@
+import argparse
+from collections import deque
+import glob
+import json
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from core.events import (
+    BALANCE_ALERT,
+    BUDGET_ALERT,
+    TRANSACTION_ADDED,
+    Event,
+    check_balance_handler,
+)
+from core.journal import AppendLog, JournalError, _read_file_header, encode_record, read_records
+
+SNAPSHOT_MAGIC = b"FMEVSNAP"
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_HEADER = struct.Struct("<8sH")
+SNAPSHOT_EVERY = 1000
+KEEP_ALERTS = 200
+KEEP_HISTORY = 200
+READ_BUFFER = 1 << 20
+
+
+def encode_event(seq: int, event: Event) -> bytes:
+    return json.dumps(
+        [seq, event.name, event.ts, event.payload], separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+_decode = json.JSONDecoder().decode
+
+
+def decode_event(payload: bytes) -> Tuple[int, Event]:
+    seq, name, ts, data = _decode(payload.decode("utf-8"))
+    return seq, Event(name, ts, data)
+
+
+class EventState:
+    """State folded from events.
+
+    Budget alerts come from ``BUDGET_ALERT`` events, which the budget
+    tracker publishes once per threshold crossing; balance alerts are
+    decided by the pure ``check_balance_handler``.
+    """
+
+    def __init__(self, keep_alerts: int = KEEP_ALERTS, keep_history: int = KEEP_HISTORY):
+        self.seq = 0
+        self.balances: Dict[str, int] = {}
+        self._alerts: deque = deque(maxlen=keep_alerts)
+        # (name, ts, payload); turned into dicts only when read
+        self._history: deque = deque(maxlen=keep_history)
+
+    @property
+    def alerts(self) -> List[dict]:
+        return list(self._alerts)
+
+    @property
+    def history(self) -> List[dict]:
+        return [
+            {"event": name, "payload": payload, "timestamp": ts}
+            for name, ts, payload in self._history
+        ]
+
+    def apply(self, seq: int, event: Event) -> None:
+        if seq <= self.seq:
+            return  # already contained in the snapshot
+        self.seq = seq
+        payload = event.payload
+        if event.name == TRANSACTION_ADDED:
+            acc = payload.get("account_id")
+            self.balances[acc] = self.balances.get(acc, 0) + payload.get("amount", 0)
+            self._history.append((event.name, event.ts, payload))
+        elif event.name == BUDGET_ALERT:
+            self._alert("Budget", payload.get("alert", ""), event.ts)
+        elif event.name == BALANCE_ALERT:
+            result = check_balance_handler(event, payload)
+            if "alert" in result:
+                self._alert("Balance", result["alert"], event.ts)
+
+    def _alert(self, kind: str, message: str, ts: str) -> None:
+        self._alerts.append({"type": kind, "message": message, "timestamp": ts})
+
+    def to_dict(self) -> dict:
+        return {
+            "seq": self.seq,
+            "balances": self.balances,
+            "alerts": self.alerts,
+            "history": self.history,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EventState":
+        state = cls()
+        state.seq = data["seq"]
+        state.balances = dict(data["balances"])  # older snapshots also carry an unused "budget_spent"
+        state._alerts.extend(data["alerts"])
+        state._history.extend((h["event"], h["timestamp"], h["payload"]) for h in data["history"])
+        return state
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, EventState) and self.to_dict() == other.to_dict()
+
+
+def write_state(path: str, state: EventState, generation: int) -> None:
+    """Atomically replace the snapshot at ``path``."""
+    body = json.dumps({"generation": generation, "state": state.to_dict()}).encode("utf-8")
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION))
+        f.write(encode_record(body))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_state(path: str) -> Tuple[EventState, int]:
+    """``(state, generation)`` of a snapshot, or an empty state if there is none."""
+    if not os.path.exists(path):
+        return EventState(), 0
+    with open(path, "rb") as f:
+        head = f.read(_SNAPSHOT_HEADER.size)
+        if len(head) < _SNAPSHOT_HEADER.size or _SNAPSHOT_HEADER.unpack(head) != (SNAPSHOT_MAGIC, SNAPSHOT_VERSION):
+            raise JournalError("Not an event state snapshot")
+        for _, body in read_records(f):
+            data = json.loads(body)
+            return EventState.from_dict(data["state"]), data["generation"]
+    raise JournalError("Event state snapshot is corrupt")
+
+
+def _segment_generation(path: str, log_path: str) -> int:
+    return int(path[len(log_path) + 1:])
+
+
+def segments(log_path: str) -> List[str]:
+    """Archived segments oldest first, then the live log."""
+    pattern = re.compile(re.escape(log_path) + r"\.\d+$")
+    archived = [p for p in glob.glob(glob.escape(log_path) + ".*") if pattern.match(p)]
+    archived.sort(key=lambda p: _segment_generation(p, log_path))
+    return archived + ([log_path] if os.path.exists(log_path) else [])
+
+
+def iter_events(path: str, min_generation: int = 0) -> Iterator[Tuple[int, Event]]:
+    """Events of one log file, unless it is older than ``min_generation``."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    with open(path, "rb", buffering=READ_BUFFER) as f:
+        if _read_file_header(f) < min_generation:
+            return
+        for _, payload in read_records(f):
+            yield decode_event(payload)
+
+
+def replay(log_path: str, snapshot_path: Optional[str] = None) -> EventState:
+    """Latest snapshot plus the live log tail; what the app does at startup."""
+    state, generation = read_state(snapshot_path) if snapshot_path else (EventState(), 0)
+    for seq, event in iter_events(log_path, generation):
+        state.apply(seq, event)
+    return state
+
+
+def rebuild(log_path: str) -> EventState:
+    """Fold every archived segment and the live log, ignoring snapshots."""
+    state = EventState()
+    for path in segments(log_path):
+        for seq, event in iter_events(path):
+            state.apply(seq, event)
+    return state
+
+
+class EventLog(AppendLog):
+    """Append-only event log that keeps an ``EventState`` current.
+
+    ``record`` appends and applies one event (``record_many`` a batch).
+    Every ``snapshot_every`` events the state is written to
+    ``snapshot_path`` tagged with the next generation. The live log is
+    then archived as ``<path>.<generation>`` and restarted, so a crash
+    between the two steps only replays events the snapshot already has.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        snapshot_path: Optional[str] = None,
+        snapshot_every: int = SNAPSHOT_EVERY,
+        **kwargs,
+    ):
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        state, generation = read_state(snapshot_path) if snapshot_path else (EventState(), 0)
+        super().__init__(path, generation=generation, **kwargs)
+        if self.generation >= generation:
+            for seq, event in iter_events(path, generation):
+                state.apply(seq, event)
+        else:
+            # the snapshot already holds everything in this older log
+            self._archive(generation)
+        self.state = state
+        self._since_snapshot = 0
+        self._state_lock = threading.RLock()
+
+    def record(self, event: Event) -> int:
+        return self.record_many((event,))
+
+    def record_many(self, events: Iterable[Event]) -> int:
+        """Append and apply ``events``; returns the last sequence number."""
+        with self._state_lock:
+            seq = self.state.seq
+            records = []
+            for event in events:
+                seq += 1
+                records.append(encode_event(seq, event))
+                self.state.apply(seq, event)
+            self.append_many(records)
+            self._since_snapshot += len(records)
+            if self.snapshot_path and self._since_snapshot >= self.snapshot_every:
+                self.snapshot()
+            return seq
+
+    def snapshot(self) -> None:
+        if not self.snapshot_path:
+            raise JournalError("Event log has no snapshot path")
+        with self._state_lock:
+            self.commit()
+            generation = self.generation + 1
+            write_state(self.snapshot_path, self.state, generation)
+            self._archive(generation)
+            self._since_snapshot = 0
+
+    def _archive(self, generation: int) -> None:
+        """Keep the live log as ``<path>.<generation>`` and start ``generation``."""
+        with self._lock:
+            self._commit_locked()
+            self._f.close()
+            os.replace(self.path, f"{self.path}.{self.generation}")
+            self._f = open(self.path, "ab+")
+            self._reset(generation)
+
+
+_logs: Dict[str, EventLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_event_log(path: str, snapshot_path: Optional[str] = None, **options) -> EventLog:
+    """The process-wide event log at ``path``, replayed on first use."""
+    key = os.path.abspath(path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = _logs[key] = EventLog(path, snapshot_path, **options)
+        return log
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m core.eventlog",
+        description="Rebuild derived state from every archived segment and the live log.",
+    )
+    parser.add_argument("log", help="live event log, e.g. data/events.log")
+    parser.add_argument("--snapshot", help="write the rebuilt state to this snapshot")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    paths = segments(args.log)
+    state = rebuild(args.log)
+    elapsed = time.perf_counter() - start
+    size = sum(os.path.getsize(p) for p in paths)
+    if args.snapshot:
+        generation = _read_generation(args.log)
+        write_state(args.snapshot, state, generation)
+    rate = state.seq / elapsed if elapsed else 0.0
+    print(
+        f"{state.seq:,} events from {len(paths)} segment(s), {size / 1e6:,.1f} MB "
+        f"in {elapsed:.2f}s ({rate:,.0f} events/s)"
+    )
+    print(json.dumps({
+        "balances": state.balances,
+        "alerts": len(state.alerts),
+    }, indent=2, sort_keys=True))
+    return 0
+
+
+def _read_generation(log_path: str) -> int:
+    """Generation a snapshot of the whole log must carry to skip the live log."""
+    if not os.path.exists(log_path) or os.path.getsize(log_path) == 0:
+        return 0
+    with open(log_path, "rb") as f:
+        return _read_file_header(f) + 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
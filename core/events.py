@@ -1,32 +1,80 @@
-from typing import Callable, Dict, List, NamedTuple
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
 from datetime import datetime
 from core.domain import Transaction, Budget, Account
 
-__all__ = ['event_bus', 'TRANSACTION_ADDED', 'BUDGET_ALERT', 'BALANCE_ALERT', 'Event', 'EventBus']
+__all__ = ['event_bus', 'TRANSACTION_ADDED', 'BUDGET_ALERT', 'BALANCE_ALERT', 'Event', 'EventBus', 'batch_handler']
 
 class Event(NamedTuple):
     name: str
     ts: str
     payload: dict
 
+def batch_handler(batch: Callable[[Event, List[dict]], Any]) -> Callable:
+    """Give a per-event handler a batch form used by ``publish_many``.
+
+    ``batch(event, payloads)`` receives one shared ``Event`` (its payload is
+    ``{"count": n}``) and all payloads, and returns one aggregated result.
+    """
+    def wrap(handler: Callable[[Event, dict], dict]) -> Callable[[Event, dict], dict]:
+        handler.batch = batch
+        return handler
+
+    return wrap
+
+
+def _handler_name(handler: Callable) -> str:
+    return getattr(handler, "__qualname__", None) or repr(handler)
+
+
+def _failure(handler: Callable, error: BaseException, timed_out: bool = False) -> dict:
+    """Result recorded in place of a handler that raised or timed out."""
+    message = "timed out" if timed_out else f"{type(error).__name__}: {error}"
+    return {"error": message, "handler": _handler_name(handler), "timed_out": timed_out}
+
+
 class EventBus:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None):
         self._subscribers: Dict[str, List[Callable[[Event, dict], dict]]] = {}
+        self._timeouts: Dict[Tuple[str, Callable], float] = {}
+        self._max_workers = max_workers
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._background: Set[concurrent.futures.Future] = set()
+        self.log = None
 
-    def subscribe(self, name: str, handler: Callable[[Event, dict], dict]) -> None:
+    def attach_log(self, log) -> None:
+        """Persist every published event via ``log.record_many(events)`` first."""
+        self.log = log
+
+    def subscribe(
+        self, name: str, handler: Callable[[Event, dict], dict], timeout: Optional[float] = None
+    ) -> None:
+        """Add a handler; ``timeout`` (seconds) applies to ``publish_async``."""
         if name not in self._subscribers:
             self._subscribers[name] = []
         self._subscribers[name].append(handler)
+        if timeout is not None:
+            self._timeouts[(name, handler)] = timeout
 
-    def publish(self, name: str, payload: dict) -> List[dict]:
-        if name not in self._subscribers:
-            return []
-        
-        event = Event(
+    def _event(self, name: str, payload: dict) -> Event:
+        return Event(
             name=name,
             ts=datetime.now().isoformat(),
             payload=payload
         )
+
+    def publish(self, name: str, payload: dict) -> List[dict]:
+        event = self._event(name, payload)
+        if self.log is not None:
+            self.log.record_many((event,))
+        if name not in self._subscribers:
+            return []
         
         results = []
         for handler in self._subscribers[name]:
@@ -34,10 +82,134 @@ class EventBus:
             results.append(result)
         return results
 
+    def publish_many(self, name: str, payloads: Iterable[dict]) -> List[Any]:
+        """Publish a batch of events, one result per handler in subscription order.
+
+        Handlers declared with ``batch_handler`` are called once with every
+        payload and contribute their aggregated result. Other handlers are
+        called per payload and contribute the list of their results. All
+        events of the batch share one timestamp.
+        """
+        handlers = self._subscribers.get(name)
+        if not handlers and self.log is None:
+            return []
+        payloads = payloads if isinstance(payloads, list) else list(payloads)
+        ts = datetime.now().isoformat()
+        events = None
+        if self.log is not None:
+            events = [Event(name, ts, p) for p in payloads]
+            self.log.record_many(events)
+        if not handlers:
+            return []
+        batch_event = Event(name, ts, {"count": len(payloads)})
+        results: List[Any] = []
+        for handler in list(handlers):
+            batch = getattr(handler, "batch", None)
+            if batch is not None:
+                results.append(batch(batch_event, payloads))
+                continue
+            if events is None:
+                events = [Event(name, ts, p) for p in payloads]
+            results.append(list(map(handler, events, payloads)))
+        return results
+
+    def _pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    self._max_workers, thread_name_prefix="event-handler"
+                )
+            return self._executor
+
+    def _retire(self, pool: concurrent.futures.ThreadPoolExecutor) -> None:
+        """Stop handing work to ``pool``; its threads exit once their calls return.
+
+        A sync handler cannot be interrupted, so one that timed out keeps
+        its thread. Later calls get a fresh pool instead of queueing behind it.
+        """
+        with self._lock:
+            if self._executor is pool:
+                self._executor = None
+        pool.shutdown(wait=False)
+
+    async def _call(self, handler: Callable, event: Event, payload: dict, timeout: Optional[float]) -> dict:
+        loop = asyncio.get_running_loop()
+        pool = None
+        try:
+            if inspect.iscoroutinefunction(handler):
+                call = handler(event, payload)  # may raise (e.g. wrong signature)
+            else:
+                # sync handlers must not block the loop (or each other)
+                pool = self._pool()
+                call = loop.run_in_executor(pool, functools.partial(handler, event, payload))
+            result = await asyncio.wait_for(call, timeout) if timeout is not None else await call
+            pool = None  # the thread is free again
+            if inspect.isawaitable(result):
+                result = await (asyncio.wait_for(result, timeout) if timeout is not None else result)
+            return result
+        except asyncio.TimeoutError as e:
+            if pool is not None:
+                self._retire(pool)
+            return _failure(handler, e, timed_out=True)
+        except Exception as e:
+            return _failure(handler, e)
+
+    async def _dispatch(
+        self, name: str, handlers: List[Callable], event: Event, payload: dict, timeout: Optional[float]
+    ) -> List[dict]:
+        calls = [
+            self._call(h, event, payload, self._timeouts.get((name, h), timeout)) for h in handlers
+        ]
+        return list(await asyncio.gather(*calls))
+
+    async def publish_async(
+        self, name: str, payload: dict, timeout: Optional[float] = None, wait: bool = True
+    ) -> List[dict]:
+        """Run every handler concurrently and return results in subscription order.
+
+        Coroutine handlers run on the current loop, sync ones on a thread
+        pool. A handler that raises or exceeds its timeout (its own from
+        ``subscribe``, else ``timeout``) yields an ``{"error": ...}`` dict
+        instead of failing the publish. With ``wait=False`` the handlers are
+        started on the bus's own background loop, so they outlive the
+        caller's loop, and ``[]`` is returned immediately.
+        """
+        handlers = list(self._subscribers.get(name, ()))
+        event = self._event(name, payload)
+        if self.log is not None:
+            self.log.record_many((event,))
+        if not handlers:
+            return []
+        if not wait:
+            future = asyncio.run_coroutine_threadsafe(
+                self._dispatch(name, handlers, event, payload, timeout), self._background_loop()
+            )
+            self._background.add(future)
+            future.add_done_callback(self._background.discard)
+            return []
+        return await self._dispatch(name, handlers, event, payload, timeout)
+
+    def _background_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="event-bus", daemon=True).start()
+            return self._loop
+
+    def publish_nowait(
+        self, name: str, payload: dict, timeout: Optional[float] = None
+    ) -> concurrent.futures.Future:
+        """Fire-and-forget from synchronous code; the returned future may be ignored."""
+        return asyncio.run_coroutine_threadsafe(
+            self.publish_async(name, payload, timeout), self._background_loop()
+        )
+
     def unsubscribe(self, name: str, handler: Callable[[Event, dict], dict]) -> None:
         if name in self._subscribers:
             if handler in self._subscribers[name]:
                 self._subscribers[name].remove(handler)
+                if handler not in self._subscribers[name]:
+                    self._timeouts.pop((name, handler), None)
 
 TRANSACTION_ADDED = "TRANSACTION_ADDED"
 BUDGET_ALERT = "BUDGET_ALERT"
@@ -45,10 +217,56 @@ BALANCE_ALERT = "BALANCE_ALERT"
 
 event_bus = EventBus()
 
+def update_balances_batch(event: Event, payloads: List[dict]) -> dict:
+    by_account: Dict[str, int] = {}
+    total = 0
+    for p in payloads:
+        amount = p.get("amount", 0)
+        acc = p.get("account_id")
+        by_account[acc] = by_account.get(acc, 0) + amount
+        total += amount
+    return {"balance_delta": total, "balance_deltas": by_account}
+
+@batch_handler(update_balances_batch)
 def update_balance_handler(event: Event, payload: dict) -> dict:
     amount = payload.get("amount", 0)
     return {"balance_delta": amount}
 
+def check_budgets_batch(event: Event, payloads: List[dict]) -> dict:
+    """Aggregate expenses per category; alert once per category over its limit.
+
+    Each category starts from the ``current_spent`` of its first payload,
+    and its limit is the last positive ``budget_limit`` seen.
+    """
+    deltas: Dict[str, int] = {}
+    base: Dict[str, int] = {}
+    limits: Dict[str, int] = {}
+    for p in payloads:
+        amount = p.get("amount", 0)
+        if amount >= 0:
+            continue
+        cat = p.get("category_id") or p.get("cat_id", "")
+        if cat not in deltas:
+            deltas[cat] = 0
+            base[cat] = p.get("current_spent", 0)
+        deltas[cat] -= amount
+        limit = p.get("budget_limit", 0)
+        if limit > 0:
+            limits[cat] = limit
+
+    spent = {cat: base[cat] + delta for cat, delta in deltas.items()}
+    alerts = [
+        {
+            "alert": f"Budget exceeded for category {cat}: {spent[cat]} / {limits[cat]} KZT",
+            "category_id": cat,
+            "spent": spent[cat],
+            "limit": limits[cat],
+        }
+        for cat in spent if cat in limits and spent[cat] > limits[cat]
+    ]
+    return {"spent_deltas": deltas, "spent": spent, "alerts": alerts}
+
+@batch_handler(check_budgets_batch)
 def check_budget_handler(event: Event, payload: dict) -> dict:
     amount = payload.get("amount", 0)
     category_id = payload.get("category_id") or payload.get("cat_id", "")
@@ -81,8 +299,8 @@ def check_balance_handler(event: Event, payload: dict) -> dict:
     return {}
 
 def register_default_handlers():
+    # budgets are checked by core.budgets.BudgetTracker.attach(event_bus)
     event_bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
-    event_bus.subscribe(TRANSACTION_ADDED, check_budget_handler)
     event_bus.subscribe(BALANCE_ALERT, check_balance_handler)
 
 register_default_handlers()
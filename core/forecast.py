@@ -0,0 +1,196 @@
+from statistics import NormalDist
+from typing import Iterable, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from core.domain import Transaction
+from core.indexes import MonthlyAggregates
+from core.store import TransactionStore
+
+
+class ExpenseMatrix(NamedTuple):
+    """Monthly expenses (positive) with one row per category, one column per month."""
+
+    categories: tuple[str, ...]
+    months: tuple[str, ...]
+    values: np.ndarray
+
+
+class Forecast(NamedTuple):
+    """Point forecasts and prediction intervals, shape ``(categories, horizon)``."""
+
+    categories: tuple[str, ...]
+    months: tuple[str, ...]
+    model: str
+    point: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+
+
+def month_range(first: str, last: str) -> list[str]:
+    """Every ``YYYY-MM`` from ``first`` to ``last`` inclusive."""
+    y, m = int(first[:4]), int(first[5:7])
+    out = []
+    while f"{y:04d}-{m:02d}" <= last:
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+
+def _next_months(last: str, horizon: int) -> tuple[str, ...]:
+    y, m = int(last[:4]), int(last[5:7])
+    out = []
+    for _ in range(horizon):
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+        out.append(f"{y:04d}-{m:02d}")
+    return tuple(out)
+
+
+def expense_matrix(
+    source: Union[MonthlyAggregates, Iterable[Transaction]],
+    categories: Optional[Sequence[str]] = None,
+    months: Optional[Sequence[str]] = None,
+) -> ExpenseMatrix:
+    """Build the category x month matrix over a gap-free calendar of months.
+
+    ``source`` is a ``MonthlyAggregates`` (read cell by cell) or any
+    transactions (one pass). Only rows with ``amount < 0`` count.
+    """
+    if isinstance(source, MonthlyAggregates):
+        cats = list(categories) if categories is not None else source.expense_categories()
+        if months is None:
+            # months with expenses, as on the transaction path
+            seen = [m for m in source.months() if source.month_totals(m)[1]]
+            months = month_range(seen[0], seen[-1]) if seen else []
+        values = np.array(
+            [[-source.expenses(c, m) for m in months] for c in cats], dtype=np.float64
+        ).reshape(len(cats), len(months))
+        return ExpenseMatrix(tuple(cats), tuple(months), values)
+
+    sums: dict[tuple[str, str], int] = {}
+    if isinstance(source, TransactionStore):
+        ts_months = [ts[:7] for ts in source.timestamps.values]
+        cat_ids = source.categories.values
+        rows = (
+            (cat_ids[c], ts_months[ts], a)
+            for c, ts, a in zip(source.category_codes, source.ts_codes, source.amounts)
+        )
+    else:
+        rows = ((t.cat_id, t.ts[:7], t.amount) for t in source)
+    for cat_id, month, amount in rows:
+        if amount < 0:
+            sums[cat_id, month] = sums.get((cat_id, month), 0) - amount
+
+    if categories is None:
+        categories = sorted({c for c, _ in sums})
+    if months is None:
+        seen = sorted({m for _, m in sums})
+        months = month_range(seen[0], seen[-1]) if seen else []
+    row_of = {c: i for i, c in enumerate(categories)}
+    col_of = {m: j for j, m in enumerate(months)}
+    values = np.zeros((len(categories), len(months)), dtype=np.float64)
+    for (cat_id, month), total in sums.items():
+        i, j = row_of.get(cat_id), col_of.get(month)
+        if i is not None and j is not None:
+            values[i, j] = total
+    return ExpenseMatrix(tuple(categories), tuple(months), values)
+
+
+def _window(values: np.ndarray, window: Optional[int]) -> np.ndarray:
+    if values.shape[1] == 0:
+        raise ValueError("Cannot forecast from an empty history")
+    return values if window is None else values[:, -window:]
+
+
+def _trailing_mean(values, horizon, window=6):
+    y = _window(values, window)
+    n = y.shape[1]
+    point = y.mean(axis=1)
+    sigma = y.std(axis=1, ddof=1) if n > 1 else np.zeros(len(y))
+    spread = sigma * np.sqrt(1 + 1 / n)
+    return np.repeat(point[:, None], horizon, axis=1), np.repeat(spread[:, None], horizon, axis=1)
+
+
+def _ewma(values, horizon, alpha=0.5):
+    if not 0 < alpha <= 1:
+        raise ValueError("alpha must be in (0, 1]")
+    y = _window(values, None)
+    n = y.shape[1]
+    weights = (1 - alpha) ** np.arange(n - 1, -1, -1)
+    weights /= weights.sum()
+    point = y @ weights
+    sigma = np.sqrt(((y - point[:, None]) ** 2) @ weights)
+    # the level is carried forward; uncertainty grows with the horizon
+    steps = np.sqrt(1 + alpha ** 2 * np.arange(horizon))
+    return np.repeat(point[:, None], horizon, axis=1), sigma[:, None] * steps[None, :]
+
+
+def _linear_trend(values, horizon, window=12):
+    y = _window(values, window)
+    n = y.shape[1]
+    if n < 3:
+        raise ValueError("Linear trend needs at least 3 months")
+    t = np.arange(n, dtype=np.float64)
+    t_mean = t.mean()
+    sxx = ((t - t_mean) ** 2).sum()
+    y_mean = y.mean(axis=1)
+    slope = (y - y_mean[:, None]) @ (t - t_mean) / sxx
+    intercept = y_mean - slope * t_mean
+    resid = y - (intercept[:, None] + slope[:, None] * t[None, :])
+    sigma = np.sqrt((resid ** 2).sum(axis=1) / (n - 2))
+    future = np.arange(n, n + horizon, dtype=np.float64)
+    point = intercept[:, None] + slope[:, None] * future[None, :]
+    factor = np.sqrt(1 + 1 / n + (future - t_mean) ** 2 / sxx)
+    return point, sigma[:, None] * factor[None, :]
+
+
+def _seasonal_naive(values, horizon, season=12):
+    y = _window(values, None)
+    n = y.shape[1]
+    if n < season:
+        raise ValueError(f"Seasonal-naive needs at least {season} months")
+    lags = (np.arange(horizon) % season) - season
+    point = y[:, lags]
+    if n > season:
+        diffs = y[:, season:] - y[:, :-season]
+        sigma = np.sqrt((diffs ** 2).mean(axis=1))
+    else:
+        sigma = np.zeros(len(y))
+    cycles = np.sqrt(np.arange(horizon) // season + 1)
+    return point, sigma[:, None] * cycles[None, :]
+
+
+MODELS = {
+    "mean": _trailing_mean,
+    "ewma": _ewma,
+    "trend": _linear_trend,
+    "seasonal": _seasonal_naive,
+}
+
+
+def forecast_all(
+    matrix: ExpenseMatrix,
+    model: str = "mean",
+    horizon: int = 1,
+    level: float = 0.8,
+    **params,
+) -> Forecast:
+    """Forecast every category for the next ``horizon`` months in one call.
+
+    Models: ``mean`` (trailing ``window``), ``ewma`` (``alpha``), ``trend``
+    (least squares over ``window``) and ``seasonal`` (naive, ``season``).
+    Intervals are normal-approximation bands at ``level``, clipped at 0.
+    """
+    try:
+        fit = MODELS[model]
+    except KeyError:
+        raise ValueError(f"Unknown forecast model: {model}") from None
+    if horizon < 1:
+        raise ValueError("horizon must be at least 1")
+    point, spread = fit(matrix.values, horizon, **params)
+    z = NormalDist().inv_cdf((1 + level) / 2)
+    point = np.maximum(point, 0.0)
+    lower = np.maximum(point - z * spread, 0.0)
+    upper = point + z * spread
+    months = _next_months(matrix.months[-1], horizon)
+    return Forecast(matrix.categories, months, model, point, lower, upper)
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import TypeVar, Generic, Callable, Union
+from array import array
+from typing import TypeVar, Generic, Callable, Iterable, Iterator, Sequence, Union
 from core.domain import Category, Transaction, Account, Budget
+from core.store import TransactionStore
 
 T = TypeVar('T')
 U = TypeVar('U')
@@ -177,6 +179,58 @@ def safe_category(cats: tuple[Category, ...], cat_id: str) -> Maybe[Category]:
     return Nothing()
 
 
+ACCOUNT_NOT_FOUND = 1
+CATEGORY_NOT_FOUND = 2
+INCOME_NEGATIVE = 3
+EXPENSE_POSITIVE = 4
+
+ERROR_NAMES = {
+    ACCOUNT_NOT_FOUND: "account_not_found",
+    CATEGORY_NOT_FOUND: "category_not_found",
+    INCOME_NEGATIVE: "category_type_mismatch",
+    EXPENSE_POSITIVE: "category_type_mismatch",
+}
+
+
+def _category_lookup(cats: Iterable[Category]) -> dict[str, Category]:
+    # first match wins, like the linear scan in validate_transaction
+    lookup: dict[str, Category] = {}
+    for cat in cats:
+        lookup.setdefault(cat.id, cat)
+    return lookup
+
+
+def _error_code(amount: int, category: Category) -> int:
+    if category.type == "income" and amount < 0:
+        return INCOME_NEGATIVE
+    if category.type == "expense" and amount > 0:
+        return EXPENSE_POSITIVE
+    return 0
+
+
+def _validation_error(code: int, t: Transaction, category: Category | None) -> dict:
+    if code == ACCOUNT_NOT_FOUND:
+        return {
+            "error": "account_not_found",
+            "message": f"Account with ID {t.account_id} does not exist",
+            "account_id": t.account_id
+        }
+    if code == CATEGORY_NOT_FOUND:
+        return {
+            "error": "category_not_found",
+            "message": f"Category with ID {t.cat_id} does not exist",
+            "category_id": t.cat_id
+        }
+    kind = "Income" if code == INCOME_NEGATIVE else "Expense"
+    sign = "negative" if code == INCOME_NEGATIVE else "positive"
+    return {
+        "error": "category_type_mismatch",
+        "message": f"{kind} category {category.name} cannot have {sign} amount",
+        "category_type": category.type,
+        "amount": t.amount
+    }
+
+
 def validate_transaction(
     t: Transaction, 
     accs: tuple[Account, ...], 
@@ -185,39 +239,114 @@ def validate_transaction(
     
     account_exists = any(acc.id == t.account_id for acc in accs)
     if not account_exists:
-        return Left({
-            "error": "account_not_found",
-            "message": f"Account with ID {t.account_id} does not exist",
-            "account_id": t.account_id
-        })
+        return Left(_validation_error(ACCOUNT_NOT_FOUND, t, None))
     
-    category_exists = any(cat.id == t.cat_id for cat in cats)
-    if not category_exists:
-        return Left({
-            "error": "category_not_found", 
-            "message": f"Category with ID {t.cat_id} does not exist",
-            "category_id": t.cat_id
-        })
+    category = next((cat for cat in cats if cat.id == t.cat_id), None)
+    if category is None:
+        return Left(_validation_error(CATEGORY_NOT_FOUND, t, None))
     
-    category = next(cat for cat in cats if cat.id == t.cat_id)
-    if category.type == "income" and t.amount < 0:
-        return Left({
-            "error": "category_type_mismatch",
-            "message": f"Income category {category.name} cannot have negative amount",
-            "category_type": category.type,
-            "amount": t.amount
-        })
-    elif category.type == "expense" and t.amount > 0:
-        return Left({
-            "error": "category_type_mismatch", 
-            "message": f"Expense category {category.name} cannot have positive amount",
-            "category_type": category.type,
-            "amount": t.amount
-        })
+    code = _error_code(t.amount, category)
+    if code:
+        return Left(_validation_error(code, t, category))
     
     return Right(t)
 
 
+class ValidationReport:
+    """Outcome of ``validate_transactions`` for a batch of rows.
+
+    ``valid`` holds one byte per row (1 = valid); ``error_rows`` and
+    ``error_codes`` list the failing rows in order. The ``Left`` payloads
+    are only built when ``result``/``errors`` ask for them.
+    """
+
+    def __init__(
+        self,
+        trans: Sequence[Transaction],
+        categories: dict[str, Category],
+        valid: bytearray,
+        error_rows: array,
+        error_codes: array,
+    ):
+        self._trans = trans
+        self._categories = categories
+        self.valid = valid
+        self.error_rows = error_rows
+        self.error_codes = error_codes
+        self._code_at = dict(zip(error_rows, error_codes))
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @property
+    def ok(self) -> bool:
+        return not self.error_rows
+
+    def counts(self) -> dict[str, int]:
+        out: dict[str, int] = {}
+        for code in self.error_codes:
+            name = ERROR_NAMES[code]
+            out[name] = out.get(name, 0) + 1
+        return out
+
+    def _left(self, row: int, code: int) -> Left:
+        t = self._trans[row]
+        return Left(_validation_error(code, t, self._categories.get(t.cat_id)))
+
+    def result(self, row: int) -> Either[dict, Transaction]:
+        """Same value ``validate_transaction`` returns for ``row``."""
+        code = self._code_at.get(row)
+        if code is None:
+            return Right(self._trans[row])
+        return self._left(row, code)
+
+    def errors(self) -> Iterator[tuple[int, Left]]:
+        for row, code in zip(self.error_rows, self.error_codes):
+            yield row, self._left(row, code)
+
+
+def validate_transactions(
+    trans: Iterable[Transaction],
+    accs: Iterable[Account],
+    cats: Iterable[Category],
+) -> ValidationReport:
+    """Validate many transactions against lookup tables built once."""
+    if not isinstance(trans, Sequence):
+        trans = tuple(trans)
+    account_ids = {acc.id for acc in accs}
+    categories = _category_lookup(cats)
+
+    valid = bytearray(len(trans))
+    error_rows = array("I")
+    error_codes = array("B")
+
+    if isinstance(trans, TransactionStore):
+        # resolve each distinct code once, then work on the columns
+        acc_ok = [acc_id in account_ids for acc_id in trans.accounts.values]
+        cat_of = [categories.get(cat_id) for cat_id in trans.categories.values]
+        rows = zip(trans.account_codes, trans.category_codes, trans.amounts)
+        checks = ((acc_ok[a], cat_of[c], amount) for a, c, amount in rows)
+    else:
+        checks = (
+            (t.account_id in account_ids, categories.get(t.cat_id), t.amount) for t in trans
+        )
+
+    for row, (has_account, category, amount) in enumerate(checks):
+        if not has_account:
+            code = ACCOUNT_NOT_FOUND
+        elif category is None:
+            code = CATEGORY_NOT_FOUND
+        else:
+            code = _error_code(amount, category)
+        if code:
+            error_rows.append(row)
+            error_codes.append(code)
+        else:
+            valid[row] = 1
+
+    return ValidationReport(trans, categories, valid, error_rows, error_codes)
+
+
 def check_budget(
     b: Budget, 
     trans: tuple[Transaction, ...]
@@ -226,7 +355,10 @@ def check_budget(
         abs(t.amount) for t in trans 
         if t.cat_id == b.cat_id and t.amount < 0
     )
-    
+    return check_budget_spent(b, category_expenses)
+
+
+def check_budget_spent(b: Budget, category_expenses: int) -> Either[dict, Budget]:
     if category_expenses > b.limit:
         return Left({
             "error": "budget_exceeded",
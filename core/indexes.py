@@ -0,0 +1,281 @@
+import threading
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping
+
+from core.domain import Transaction
+from core.store import TransactionStore
+
+
+class BalanceIndex:
+    """Per-account running totals kept in step with a ledger.
+
+    ``apply``/``revert`` adjust one account in O(1); ``snapshot`` returns a
+    read-only copy of every balance taken under the index lock, so readers
+    never see a half-applied update.
+    """
+
+    def __init__(self, account_ids: Iterable[str] = ()):
+        self._totals: dict[str, int] = {acc_id: 0 for acc_id in account_ids}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    @classmethod
+    def from_ledger(
+        cls, trans: Iterable[Transaction], account_ids: Iterable[str] = ()
+    ) -> "BalanceIndex":
+        index = cls(account_ids)
+        totals = index._totals
+        if isinstance(trans, TransactionStore):
+            by_code: dict[int, int] = {}
+            for code, amount in zip(trans.account_codes, trans.amounts):
+                by_code[code] = by_code.get(code, 0) + amount
+            for code, total in by_code.items():
+                acc_id = trans.accounts.decode(code)
+                totals[acc_id] = totals.get(acc_id, 0) + total
+        else:
+            for t in trans:
+                totals[t.account_id] = totals.get(t.account_id, 0) + t.amount
+        return index
+
+    def apply(self, t: Transaction) -> None:
+        with self._lock:
+            self._totals[t.account_id] = self._totals.get(t.account_id, 0) + t.amount
+            self.version += 1
+
+    def revert(self, t: Transaction) -> None:
+        with self._lock:
+            self._totals[t.account_id] = self._totals.get(t.account_id, 0) - t.amount
+            self.version += 1
+
+    def balance(self, acc_id: str) -> int:
+        return self._totals.get(acc_id, 0)
+
+    def total(self) -> int:
+        with self._lock:
+            return sum(self._totals.values())
+
+    def snapshot(self) -> Mapping[str, int]:
+        with self._lock:
+            return MappingProxyType(dict(self._totals))
+
+
+_by_ts = attrgetter("ts")
+
+
+class _Partition:
+    __slots__ = ("keys", "rows")
+
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+        self.rows: list[Transaction] = []
+
+
+class TimeIndex:
+    """Transactions sorted by ``ts`` and partitioned by month (``ts[:7]``).
+
+    Range and month lookups bisect the sorted month list and then the
+    boundary partitions, so they only touch the rows they return. Rows
+    with equal ``ts`` keep their insertion order.
+    """
+
+    def __init__(self, trans: Iterable[Transaction] = ()):
+        self._months: list[str] = []
+        self._parts: dict[str, _Partition] = {}
+        self._count = 0
+        self.extend(trans)
+
+    def _partition(self, month: str) -> _Partition:
+        part = self._parts.get(month)
+        if part is None:
+            part = self._parts[month] = _Partition()
+            insort(self._months, month)
+        return part
+
+    def add(self, t: Transaction) -> None:
+        part = self._partition(t.ts[:7])
+        if not part.keys or t.ts >= part.keys[-1]:
+            part.keys.append(t.ts)
+            part.rows.append(t)
+        else:
+            i = bisect_right(part.keys, t.ts)
+            part.keys.insert(i, t.ts)
+            part.rows.insert(i, t)
+        self._count += 1
+
+    def extend(self, trans: Iterable[Transaction]) -> None:
+        batches: dict[str, list[Transaction]] = {}
+        for t in trans:
+            batches.setdefault(t.ts[:7], []).append(t)
+        for month, rows in batches.items():
+            part = self._partition(month)
+            self._count += len(rows)
+            rows.sort(key=_by_ts)
+            if part.keys and rows[0].ts < part.keys[-1]:
+                # two sorted runs: timsort merges them in linear time
+                rows = part.rows + rows
+                rows.sort(key=_by_ts)
+                part.rows = rows
+                part.keys = [t.ts for t in rows]
+            else:
+                part.rows.extend(rows)
+                part.keys.extend(t.ts for t in rows)
+
+    def remove(self, t: Transaction) -> None:
+        part = self._parts.get(t.ts[:7])
+        if part is not None:
+            lo, hi = bisect_left(part.keys, t.ts), bisect_right(part.keys, t.ts)
+            for i in range(lo, hi):
+                if part.rows[i] == t:
+                    del part.keys[i]
+                    del part.rows[i]
+                    self._count -= 1
+                    return
+        raise ValueError("transaction not in index")
+
+    def months(self) -> list[str]:
+        return [m for m in self._months if self._parts[m].rows]
+
+    def month(self, month: str) -> tuple[Transaction, ...]:
+        part = self._parts.get(month)
+        return tuple(part.rows) if part else ()
+
+    def between(self, start: str, end: str) -> tuple[Transaction, ...]:
+        """Rows with ``start <= ts <= end``, same bounds as ``by_date_range``."""
+        lo = bisect_left(self._months, start[:7])
+        hi = bisect_right(self._months, end[:7])
+        out: list[Transaction] = []
+        for month in self._months[lo:hi]:
+            part = self._parts[month]
+            out += part.rows[bisect_left(part.keys, start):bisect_right(part.keys, end)]
+        return tuple(out)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return chain.from_iterable(self._parts[m].rows for m in self._months)
+
+
+def _add_sorted(items: list[str], item: str) -> None:
+    if not items or items[-1] < item:
+        items.append(item)
+    else:
+        insort(items, item)
+
+
+def _remove_sorted(items: list[str], item: str) -> None:
+    del items[bisect_left(items, item)]
+
+
+class MonthlyAggregates:
+    """Per-``(cat_id, month)`` and per-month totals kept in step with a ledger.
+
+    Each cell holds the net amount, the expense sum and row counts, so
+    ``add``/``remove``/``edit`` touch two cells. Months with rows are kept
+    sorted per category, which makes ``forecast`` read only the trailing
+    ``period`` cells. ``forecast`` matches ``recursion.forecast_expenses``.
+    """
+
+    def __init__(self, trans: Iterable[Transaction] = ()):
+        # cell: [net, expense, expense_rows, rows]
+        self._cells: dict[tuple[str, str], list[int]] = {}
+        # month: [income, expense (positive), rows]
+        self._totals: dict[str, list[int]] = {}
+        self._cat_months: dict[str, list[str]] = {}
+        self._expense_months: dict[str, list[str]] = {}
+        self.version = 0
+        self.extend(trans)
+
+    def _apply(self, cat_id: str, month: str, amount: int, sign: int) -> None:
+        key = (cat_id, month)
+        cell = self._cells.get(key)
+        if cell is None:
+            if sign < 0:
+                raise ValueError("transaction not in aggregates")
+            cell = self._cells[key] = [0, 0, 0, 0]
+            _add_sorted(self._cat_months.setdefault(cat_id, []), month)
+        elif sign < 0 and (cell[2] == 0 if amount < 0 else cell[3] == cell[2]):
+            # no row of this kind (expense / other) left to remove
+            raise ValueError("transaction not in aggregates")
+        cell[0] += sign * amount
+        cell[3] += sign
+        if amount < 0:
+            if cell[2] == 0:
+                _add_sorted(self._expense_months.setdefault(cat_id, []), month)
+            cell[1] += sign * amount
+            cell[2] += sign
+            if cell[2] == 0:
+                _remove_sorted(self._expense_months[cat_id], month)
+        if cell[3] == 0:
+            del self._cells[key]
+            _remove_sorted(self._cat_months[cat_id], month)
+
+        total = self._totals.get(month)
+        if total is None:
+            total = self._totals[month] = [0, 0, 0]
+        if amount > 0:
+            total[0] += sign * amount
+        else:
+            total[1] -= sign * amount
+        total[2] += sign
+        if total[2] == 0:
+            del self._totals[month]
+        self.version += 1
+
+    def add(self, t: Transaction) -> None:
+        self._apply(t.cat_id, t.ts[:7], t.amount, 1)
+
+    def remove(self, t: Transaction) -> None:
+        self._apply(t.cat_id, t.ts[:7], t.amount, -1)
+
+    def edit(self, old: Transaction, new: Transaction) -> None:
+        self.remove(old)
+        self.add(new)
+
+    def extend(self, trans: Iterable[Transaction]) -> None:
+        if isinstance(trans, TransactionStore):
+            months = [ts[:7] for ts in trans.timestamps.values]
+            cats = trans.categories.values
+            for cat, ts, amount in zip(trans.category_codes, trans.ts_codes, trans.amounts):
+                self._apply(cats[cat], months[ts], amount, 1)
+        else:
+            for t in trans:
+                self.add(t)
+
+    def expenses(self, cat_id: str, month: str) -> int:
+        cell = self._cells.get((cat_id, month))
+        return cell[1] if cell else 0
+
+    def expense_months(self, cat_id: str) -> list[str]:
+        return list(self._expense_months.get(cat_id, ()))
+
+    def forecast(self, cat_id: str, period: int) -> int:
+        """Mean monthly expense over the last ``period`` months with expenses."""
+        months = self._expense_months.get(cat_id)
+        if not months:
+            return 0
+        values = [self._cells[(cat_id, m)][1] for m in months[-period:]]
+        return sum(values) // len(values)
+
+    def category_months(self, cat_id: str) -> list[tuple[str, int]]:
+        """``(month, net amount)`` for every month with rows in ``cat_id``."""
+        return [(m, self._cells[(cat_id, m)][0]) for m in self._cat_months.get(cat_id, ())]
+
+    def months(self) -> list[str]:
+        """Months with at least one row, oldest first."""
+        return sorted(self._totals)
+
+    def categories(self) -> list[str]:
+        return [c for c, months in self._cat_months.items() if months]
+
+    def expense_categories(self) -> list[str]:
+        """Categories with at least one expense row, sorted."""
+        return sorted(c for c, months in self._expense_months.items() if months)
+
+    def month_totals(self, month: str) -> tuple[int, int]:
+        """``(income, expense)`` for ``month``; expense is positive."""
+        total = self._totals.get(month)
+        return (total[0], total[1]) if total else (0, 0)
@@ -0,0 +1,158 @@
+import json
+import re
+from itertools import islice
+from typing import IO, Any, Iterable, Iterator, Optional, Tuple
+
+from core.domain import Transaction
+from core.store import TransactionStore
+
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 10_000
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_WS = " \t\r\n"
+_decoder = json.JSONDecoder()
+_NUMBER_START = "-0123456789"
+# characters a number may still continue with; matched up to the buffer end
+_NUMBER_TAIL = re.compile(r"[0-9eE.+\-]*\Z")
+
+
+class _JsonStream:
+    """Incremental reader over a JSON text file.
+
+    Keeps only the unconsumed tail of the current chunk in memory and
+    decodes one value at a time with ``JSONDecoder.raw_decode``.
+    """
+
+    def __init__(self, f: IO[str], chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._f.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WS:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        ch = self.peek()
+        if not ch or ch not in chars:
+            raise ValueError(f"Malformed JSON: expected one of {chars!r}, got {ch or 'EOF'!r}")
+        self._pos += 1
+        return ch
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # a value ending exactly at the buffer edge may be a truncated number,
+            # as may one followed only by number characters ("2." / "1e")
+            if (
+                end == len(self._buf)
+                or (self._buf[self._pos] in _NUMBER_START and _NUMBER_TAIL.match(self._buf, end))
+            ) and self._fill():
+                continue
+            self._pos = end
+            return obj
+
+    def array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def iter_sections(
+    f: IO[str], streamed: Iterable[str] = (), chunk_size: int = CHUNK_SIZE
+) -> Iterator[Tuple[str, Any]]:
+    """Yield ``(key, value)`` for each top-level key of a JSON object.
+
+    Keys listed in ``streamed`` must hold arrays; their value is yielded as
+    an iterator over the elements instead of a list. Whatever the caller
+    leaves unconsumed is skipped before moving on to the next key.
+    """
+    streamed = set(streamed)
+    stream = _JsonStream(f, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key in streamed:
+            items = stream.array()
+            yield key, items
+            for _ in items:
+                pass
+        else:
+            yield key, stream.value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def stream_transactions(
+    path: str, fmt: Optional[str] = None, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Transaction]:
+    """Yield transactions from a seed document or an NDJSON ledger.
+
+    ``fmt`` is ``"json"`` or ``"ndjson"``; by default it is picked from the
+    file suffix. Only one record is decoded at a time.
+    """
+    if fmt is None:
+        fmt = "ndjson" if path.endswith(NDJSON_SUFFIXES) else "json"
+
+    with open(path, "r", encoding="utf-8") as f:
+        if fmt == "ndjson":
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield Transaction(**json.loads(line))
+            return
+
+        for key, value in iter_sections(f, streamed=("transactions",), chunk_size=chunk_size):
+            if key == "transactions":
+                for t in value:
+                    yield Transaction(**t)
+
+
+def iter_batches(
+    path: str, batch_size: int = BATCH_SIZE, fmt: Optional[str] = None
+) -> Iterator[list[Transaction]]:
+    it = stream_transactions(path, fmt)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def load_store(
+    path: str, batch_size: int = BATCH_SIZE, fmt: Optional[str] = None
+) -> TransactionStore:
+    return TransactionStore.from_batches(iter_batches(path, batch_size, fmt))
@@ -0,0 +1,247 @@
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Hashable, Optional
+
+from core.async_reports import iter_balance_forecast, iter_expenses_by_month
+from core.memo import ledger_fingerprint
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+FINISHED = frozenset({DONE, FAILED, CANCELLED, TIMED_OUT})
+
+# name -> async generator function yielding (rows_done, partial_result)
+REPORTS: dict[str, Callable[..., AsyncIterator[tuple[int, Any]]]] = {
+    "expenses_by_month": lambda trans, months: iter_expenses_by_month(trans, months),
+    "balance_forecast": lambda accounts, trans: iter_balance_forecast(accounts, trans),
+}
+
+
+class Job:
+    """State of one submitted report, safe to read from any thread."""
+
+    def __init__(self, job_id: str, name: str, key: Hashable, total: int, deadline: Optional[float]):
+        self.id = job_id
+        self.name = name
+        self.key = key
+        self.total = total
+        self.deadline = deadline
+        self.status = PENDING
+        self.processed = 0
+        self.partial: Any = None
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.seq = 0
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._cancel_requested = False
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def progress(self) -> float:
+        if self.status == DONE:
+            return 1.0
+        return min(self.processed / self.total, 1.0) if self.total else 0.0
+
+    def _update(self, **fields) -> None:
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+            self.seq += 1
+            waiters, self._waiters = self._waiters, []
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_wake, fut)
+
+    def __repr__(self) -> str:
+        return f"Job({self.id[:8]} {self.name} {self.status} {self.processed}/{self.total})"
+
+
+def _wake(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _dedupe_part(arg: Any) -> Hashable:
+    fp = ledger_fingerprint(arg)
+    if fp is not None:
+        return ("ledger",) + fp
+    if isinstance(arg, (list, tuple)):
+        return tuple(map(_dedupe_part, arg))
+    hash(arg)
+    return arg
+
+
+class JobManager:
+    """Runs report jobs on a private event loop in a background thread.
+
+    ``submit`` returns immediately with a ``Job`` whose progress
+    (``processed``/``total``), latest partial result and final result can be
+    polled from any thread or consumed with ``stream``. Identical requests
+    that are still in flight share one job. Jobs are cancelled
+    cooperatively between chunks, and a ``deadline`` (seconds) marks a job
+    ``timed_out``. Only the newest ``keep`` finished jobs are retained.
+    """
+
+    def __init__(self, keep: int = 100):
+        self.keep = keep
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._inflight: dict[Hashable, Job] = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def submit(
+        self,
+        report: str,
+        *args,
+        deadline: Optional[float] = None,
+        key: Optional[Hashable] = None,
+    ) -> Job:
+        try:
+            factory = REPORTS[report]
+        except KeyError:
+            raise ValueError(f"Unknown report: {report}") from None
+        if key is None:
+            try:
+                key = (report, _dedupe_part(args), deadline)
+            except TypeError:
+                key = uuid.uuid4().hex  # unhashable arguments: never shared
+        total = next((len(a) for a in args if ledger_fingerprint(a) is not None), None)
+        if total is None:
+            total = max((len(a) for a in args if hasattr(a, "__len__")), default=0)
+
+        with self._lock:
+            job = self._inflight.get(key)
+            if job is not None and not job.done:
+                return job
+            job = Job(uuid.uuid4().hex, report, key, total, deadline)
+            self._jobs[job.id] = job
+            self._inflight[key] = job
+            self._trim()
+        asyncio.run_coroutine_threadsafe(self._start(job, factory(*args)), self._loop)
+        return job
+
+    async def _start(self, job: Job, stream: AsyncIterator[tuple[int, Any]]) -> None:
+        with job._lock:
+            job._task = asyncio.current_task()
+            cancelled = job._cancel_requested
+        try:
+            if cancelled:  # cancelled before it got to run
+                raise asyncio.CancelledError
+            job._update(status=RUNNING)
+            if job.deadline is not None:
+                await asyncio.wait_for(self._consume(job, stream), job.deadline)
+            else:
+                await self._consume(job, stream)
+        except asyncio.CancelledError:
+            job._update(status=CANCELLED, finished_at=time.time())
+        except asyncio.TimeoutError:
+            job._update(status=TIMED_OUT, finished_at=time.time())
+        except Exception as e:
+            job._update(status=FAILED, error=f"{type(e).__name__}: {e}", finished_at=time.time())
+        else:
+            job._update(status=DONE, result=job.partial, processed=max(job.processed, job.total),
+                        finished_at=time.time())
+        finally:
+            with self._lock:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+
+    @staticmethod
+    async def _consume(job: Job, stream: AsyncIterator[tuple[int, Any]]) -> None:
+        async for processed, partial in stream:
+            job._update(processed=processed, partial=partial)
+
+    def _trim(self) -> None:
+        finished = [j.id for j in self._jobs.values() if j.done]
+        for job_id in finished[: max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation; returns False if the job already finished."""
+        job = self.get(job_id)
+        if job is None or job.done:
+            return False
+        with job._lock:
+            job._cancel_requested = True
+            task = job._task
+        if task is not None:
+            self._loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    async def stream(self, job_id: str) -> AsyncIterator[Any]:
+        """Yield each new partial result of a job, then its final result.
+
+        Works from any event loop; missed intermediate updates are skipped.
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        loop = asyncio.get_running_loop()
+        seen, last = -1, None
+        while True:
+            with job._lock:
+                seq, partial, finished = job.seq, job.partial, job.done
+                waiter = None
+                if seq == seen and not finished:
+                    waiter = loop.create_future()
+                    job._waiters.append((loop, waiter))
+            if waiter is not None:
+                await waiter
+                continue
+            seen = seq
+            if partial is not None and partial is not last:
+                last = partial
+                yield partial
+            if finished:
+                return
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Block the calling thread until the job finishes (or ``timeout``)."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        end = None if timeout is None else time.monotonic() + timeout
+        while not job.done and (end is None or time.monotonic() < end):
+            time.sleep(0.005)
+        return job
+
+    def shutdown(self) -> None:
+        for job in self.jobs():
+            self.cancel(job.id)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1)
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> JobManager:
+    """The process-wide manager, shared by every app session and rerun."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,254 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import IO, Iterable, Iterator, Optional, Sequence, Tuple
+
+from core.domain import Account, Budget, Category, Transaction
+from core.snapshot import Snapshot, open_snapshot, write_snapshot
+from core.store import TransactionStore
+
+MAGIC = b"FMJOURNL"
+VERSION = 1
+_FILE_HEADER = struct.Struct("<8sHQ")
+_RECORD_HEADER = struct.Struct("<II")  # payload length, crc32(payload)
+
+
+class JournalError(ValueError):
+    pass
+
+
+def encode_record(payload: bytes) -> bytes:
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_records(f: IO[bytes]) -> Iterator[Tuple[int, bytes]]:
+    """Yield ``(end_offset, payload)`` for each intact record after the header.
+
+    Stops silently at the first torn or corrupt record: everything after it
+    was never acknowledged as committed.
+    """
+    pos = f.tell()
+    while True:
+        head = f.read(_RECORD_HEADER.size)
+        if len(head) < _RECORD_HEADER.size:
+            return
+        length, crc = _RECORD_HEADER.unpack(head)
+        payload = f.read(length)
+        if len(payload) < length or zlib.crc32(payload) != crc:
+            return
+        pos += _RECORD_HEADER.size + length
+        yield pos, payload
+
+
+def _read_file_header(f: IO[bytes]) -> int:
+    head = f.read(_FILE_HEADER.size)
+    if len(head) < _FILE_HEADER.size:
+        raise JournalError("Journal header is truncated")
+    magic, version, generation = _FILE_HEADER.unpack(head)
+    if magic != MAGIC or version != VERSION:
+        raise JournalError("Not a transaction journal")
+    return generation
+
+
+def _encode_tx(t: Transaction) -> bytes:
+    return json.dumps(
+        [t.id, t.account_id, t.cat_id, t.amount, t.ts, t.note], separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _decode_tx(payload: bytes) -> Transaction:
+    return Transaction(*json.loads(payload))
+
+
+class AppendLog:
+    """Append-only file of length-prefixed, checksummed records with group commit.
+
+    Appends are buffered and made durable together with a single fsync,
+    either when ``group_size`` records are pending or at the latest
+    ``commit_interval`` seconds after the first pending one, so a crash
+    loses at most that window. ``commit_interval=0`` fsyncs every append.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        generation: int = 0,
+        commit_interval: float = 0.05,
+        group_size: int = 1024,
+    ):
+        self.path = path
+        self.commit_interval = commit_interval
+        self.group_size = group_size
+        self._lock = threading.Lock()
+        self._pending: list[bytes] = []
+        self._closed = False
+        self._f = open(path, "ab+")
+        self._f.seek(0)
+        if os.fstat(self._f.fileno()).st_size == 0:
+            self._reset(generation)
+        else:
+            self.generation = _read_file_header(self._f)
+            end = self._f.tell()
+            for end, _ in read_records(self._f):
+                pass
+            # drop a torn tail so new records follow the last good one
+            self._f.truncate(end)
+            self._f.seek(end)
+        self._size = self._f.tell()
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if commit_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+            self._flusher.start()
+
+    def _reset(self, generation: int) -> None:
+        self._f.truncate(0)
+        self._f.seek(0)
+        self._f.write(_FILE_HEADER.pack(MAGIC, VERSION, generation))
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.generation = generation
+        self._size = self._f.tell()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def append(self, payload: bytes) -> None:
+        self.append_many((payload,))
+
+    def append_many(self, payloads: Iterable[bytes]) -> None:
+        with self._lock:
+            if self._closed:
+                raise JournalError("Journal is closed")
+            was_idle = not self._pending
+            self._pending.extend(map(encode_record, payloads))
+            if len(self._pending) >= self.group_size or self.commit_interval <= 0:
+                self._commit_locked()
+            elif was_idle and self._pending:
+                self._wakeup.set()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self) -> None:
+        if not self._pending:
+            return
+        data = b"".join(self._pending)
+        self._pending.clear()
+        self._f.write(data)
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._size += len(data)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            time.sleep(self.commit_interval)
+            with self._lock:
+                if not self._closed:
+                    self._commit_locked()
+
+    def payloads(self) -> Iterator[bytes]:
+        """Committed payloads, oldest first."""
+        with open(self.path, "rb") as f:
+            _read_file_header(f)
+            for _, payload in read_records(f):
+                yield payload
+
+    def rotate(self, generation: int) -> None:
+        """Commit, then start an empty log for ``generation``."""
+        with self._lock:
+            self._commit_locked()
+            self._reset(generation)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._commit_locked()
+            self._closed = True
+            self._f.close()
+        self._wakeup.set()
+
+    def __enter__(self) -> "AppendLog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Journal(AppendLog):
+    """Transaction journal checkpointed into ledger snapshots.
+
+    Each checkpoint writes a snapshot tagged with the next generation and
+    then rotates the journal to that generation. On recovery a journal
+    whose generation is older than the snapshot is already contained in
+    it and is skipped, so a crash between the two steps is harmless.
+    """
+
+    def __init__(self, path: str, checkpoint_bytes: int = 64 << 20, **kwargs):
+        super().__init__(path, **kwargs)
+        self.checkpoint_bytes = checkpoint_bytes
+
+    def append_transaction(self, t: Transaction) -> None:
+        self.append(_encode_tx(t))
+
+    def append_transactions(self, trans: Iterable[Transaction]) -> None:
+        self.append_many(map(_encode_tx, trans))
+
+    def transactions(self) -> Iterator[Transaction]:
+        return map(_decode_tx, self.payloads())
+
+    def should_checkpoint(self) -> bool:
+        return self.size >= self.checkpoint_bytes
+
+    def checkpoint(
+        self,
+        snapshot_path: str,
+        accounts: Sequence[Account],
+        categories: Sequence[Category],
+        transactions: Sequence[Transaction],
+        budgets: Sequence[Budget],
+    ) -> None:
+        """Persist the full ledger (which must include every appended row)."""
+        self.commit()
+        generation = self.generation + 1
+        write_snapshot(
+            snapshot_path, accounts, categories, transactions, budgets,
+            meta={"journal_generation": generation},
+        )
+        self.rotate(generation)
+
+
+def recover(
+    journal_path: str,
+    snapshot_path: str,
+    base: Optional[Tuple[Sequence[Account], Sequence[Category], Sequence[Transaction], Sequence[Budget]]] = None,
+) -> Snapshot:
+    """Rebuild the ledger from the last checkpoint plus the journal tail.
+
+    ``base`` is used when no snapshot has been written yet.
+    """
+    if os.path.exists(snapshot_path):
+        snap = open_snapshot(snapshot_path)
+        generation = snap.meta.get("journal_generation", 0)
+    else:
+        accounts, categories, transactions, budgets = base or ((), (), (), ())
+        store = transactions if isinstance(transactions, TransactionStore) else TransactionStore(transactions)
+        snap = Snapshot(tuple(accounts), tuple(categories), store, tuple(budgets), {})
+        generation = 0
+
+    tail: list[Transaction] = []
+    if os.path.exists(journal_path) and os.path.getsize(journal_path) > 0:
+        with open(journal_path, "rb") as f:
+            if _read_file_header(f) >= generation:
+                tail = [_decode_tx(p) for _, p in read_records(f)]
+    if not tail:
+        return snap
+    return snap._replace(transactions=snap.transactions + tail)
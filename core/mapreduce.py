@@ -0,0 +1,274 @@
+import atexit
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import reduce
+from typing import Callable, Iterable, NamedTuple, Optional, Sequence
+
+from core.domain import Account, Budget, Transaction
+from core.memo import ledger_fingerprint
+from core.store import TransactionStore
+from core.tree import CategoryTree
+
+SHARD_ROWS = 250_000
+INLINE_BELOW = 200_000
+STORES_KEPT = 2
+
+
+class Shard(NamedTuple):
+    """A slice of a ledger's code columns.
+
+    Dictionaries stay in the parent: map steps key their partials by code
+    and the merged result is decoded once, so a shard pickles only its rows.
+    """
+
+    ts_codes: array
+    account_codes: array
+    category_codes: array
+    amounts: array
+
+
+def _column(col, typecode: str, start: int, stop: int) -> array:
+    if isinstance(col, array):
+        return col[start:stop]
+    # memoryview columns of an mmapped snapshot
+    out = array(typecode)
+    out.frombytes(memoryview(col)[start:stop].tobytes())
+    return out
+
+
+def shards(store: TransactionStore, rows: int = SHARD_ROWS) -> list[Shard]:
+    return [
+        Shard(
+            _column(store.ts_codes, "I", i, i + rows),
+            _column(store.account_codes, "I", i, i + rows),
+            _column(store.category_codes, "I", i, i + rows),
+            _column(store.amounts, "q", i, i + rows),
+        )
+        for i in range(0, len(store), rows)
+    ] or [Shard(array("I"), array("I"), array("I"), array("q"))]
+
+
+def decode_keys(partial: dict[int, int], values: list[str]) -> dict[str, int]:
+    return {values[code]: v for code, v in partial.items()}
+
+
+def ts_mask(store: TransactionStore, keep: Callable[[str], bool]) -> bytes:
+    """One byte per timestamp code: 1 where ``keep(ts)``."""
+    return bytes(1 if keep(ts) else 0 for ts in store.timestamps.values)
+
+
+def merge_sums(a: dict, b: dict) -> dict:
+    """Associative, commutative reducer for ``{key: number}`` partials."""
+    if len(a) < len(b):
+        a, b = b, a
+    for k, v in b.items():
+        a[k] = a.get(k, 0) + v
+    return a
+
+
+# --- map steps (module level so worker processes can unpickle them)
+
+def map_expenses_by_ts(shard: Shard) -> dict[int, int]:
+    """Positive expense totals per timestamp code."""
+    by_code: dict[int, int] = {}
+    for ts, amount in zip(shard.ts_codes, shard.amounts):
+        if amount < 0:
+            by_code[ts] = by_code.get(ts, 0) - amount
+    return by_code
+
+
+def map_account_totals(shard: Shard) -> dict[int, int]:
+    """Net amount per account code."""
+    by_code: dict[int, int] = {}
+    for acc, amount in zip(shard.account_codes, shard.amounts):
+        by_code[acc] = by_code.get(acc, 0) + amount
+    return by_code
+
+
+def map_category_expenses(
+    shard: Shard,
+    ts_ok: Optional[bytes] = None,
+    acc_code: Optional[int] = None,
+) -> dict[int, int]:
+    """Expense sums (negative) per directly assigned category code.
+
+    ``ts_ok`` is a ``ts_mask`` and ``acc_code`` an account code; None
+    means no filter.
+    """
+    by_code: dict[int, int] = {}
+    rows = zip(shard.category_codes, shard.amounts, shard.ts_codes, shard.account_codes)
+    for cat, amount, ts, acc in rows:
+        if amount < 0 and (ts_ok is None or ts_ok[ts]) and (acc_code is None or acc == acc_code):
+            by_code[cat] = by_code.get(cat, 0) + amount
+    return by_code
+
+
+def _call(job: tuple) -> dict:
+    func, shard, args = job
+    return func(shard, *args)
+
+
+class ReportEngine:
+    """Map-reduce reports over ledger shards in a persistent process pool.
+
+    The ledger is split into ``shard_rows`` column slices; each worker
+    aggregates one slice and the partial dicts are merged with
+    ``merge_sums``. Ledgers under ``inline_below`` rows are aggregated in
+    the calling process, where pickling shards would cost more than it
+    saves. The pool is created on first use and reused until ``shutdown``.
+    Versioned ledgers that are not stores (``PVector``) are converted once
+    per version; the newest ``STORES_KEPT`` conversions are reused.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        shard_rows: int = SHARD_ROWS,
+        inline_below: int = INLINE_BELOW,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_rows = shard_rows
+        self.inline_below = inline_below
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stores: OrderedDict[tuple[int, int], TransactionStore] = OrderedDict()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    def store(self, trans: Iterable[Transaction]) -> TransactionStore:
+        """``trans`` as a store, reusing the conversion of the same ledger version."""
+        if isinstance(trans, TransactionStore):
+            return trans
+        fp = ledger_fingerprint(trans)
+        if fp is None:
+            return TransactionStore(trans)
+        with self._lock:
+            store = self._stores.get(fp)
+            if store is not None:
+                self._stores.move_to_end(fp)
+                return store
+        store = TransactionStore(trans)
+        with self._lock:
+            self._stores[fp] = store
+            while len(self._stores) > STORES_KEPT:
+                self._stores.popitem(last=False)
+        return store
+
+    def run(self, func: Callable[..., dict], trans: Iterable[Transaction], *args) -> dict:
+        """Apply ``func(shard, *args)`` to every shard and merge the results.
+
+        Keys stay as the map step returns them (dictionary codes of
+        ``self.store(trans)`` for the built-in steps).
+        """
+        store = self.store(trans)
+        parts = shards(store, self.shard_rows)
+        if len(store) < self.inline_below or self.workers == 1 or len(parts) == 1:
+            return reduce(merge_sums, (func(p, *args) for p in parts), {})
+        jobs = [(func, p, args) for p in parts]
+        try:
+            results = self._executor().map(_call, jobs)
+            return reduce(merge_sums, results, {})
+        except BrokenProcessPool:
+            # a worker died; start a fresh pool next time and finish inline
+            self.shutdown()
+            return reduce(merge_sums, map(_call, jobs), {})
+
+    def expenses_by_month(self, trans: Iterable[Transaction], months: Sequence[str]) -> dict[str, int]:
+        """Same result as ``async_reports.expenses_by_month``."""
+        wanted = set(months)
+        lengths = sorted({len(m) for m in wanted})
+        totals = dict.fromkeys(wanted, 0)
+        store = self.store(trans)
+        by_ts = decode_keys(self.run(map_expenses_by_ts, store), store.timestamps.values)
+        for ts, spent in by_ts.items():
+            for n in lengths:
+                key = ts[:n]
+                if key in wanted:
+                    totals[key] += spent
+        return {m: totals[m] for m in months}
+
+    def balance_forecast(self, accounts: Iterable[Account], trans: Iterable[Transaction]) -> dict[str, int]:
+        """Same result as ``async_reports.balance_forecast``."""
+        store = self.store(trans)
+        sums = decode_keys(self.run(map_account_totals, store), store.accounts.values)
+        return {a.id: a.balance + sums.get(a.id, 0) for a in accounts}
+
+    def _category_expenses(
+        self,
+        trans: Iterable[Transaction],
+        start: Optional[str],
+        end: Optional[str],
+        account_id: Optional[str],
+        months: Optional[Iterable[str]] = None,
+    ) -> dict[str, int]:
+        store = self.store(trans)
+        mask = None
+        if months is not None:
+            wanted = set(months)
+            lengths = sorted({len(m) for m in wanted})
+            mask = ts_mask(store, lambda ts: any(ts[:n] in wanted for n in lengths))
+        if start is not None or end is not None:
+            in_range = ts_mask(store, lambda ts: (start is None or start <= ts) and (end is None or ts <= end))
+            mask = in_range if mask is None else bytes(a & b for a, b in zip(mask, in_range))
+        acc_code = None
+        if account_id is not None:
+            acc_code = store.accounts.code(account_id)
+            if acc_code is None:
+                return {}
+        spent = self.run(map_category_expenses, store, mask, acc_code)
+        return decode_keys(spent, store.categories.values)
+
+    def budget_totals(
+        self,
+        budgets: Iterable[Budget],
+        trans: Iterable[Transaction],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        months: Optional[Iterable[str]] = None,
+    ) -> dict[str, int]:
+        """Positive spend per budget id (exact ``cat_id``) within ``start..end``.
+
+        ``months`` further restricts to timestamps starting with one of its
+        prefixes, so non-adjacent months can be summed without the gaps.
+        """
+        spent = self._category_expenses(trans, start, end, None, months)
+        return {b.id: -spent.get(b.cat_id, 0) for b in budgets}
+
+    def category_rollup(
+        self,
+        tree: CategoryTree,
+        trans: Iterable[Transaction],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        account_id: Optional[str] = None,
+    ) -> dict[str, int]:
+        """Same result as ``CategoryTree.expense_rollup``."""
+        return tree.rollup(self._category_expenses(trans, start, end, account_id))
+
+
+_engine: Optional[ReportEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> ReportEngine:
+    """The process-wide engine, so its worker pool survives app reruns."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = ReportEngine()
+            atexit.register(_engine.shutdown)
+        return _engine
@@ -1,7 +1,178 @@
+import hashlib
+import inspect
+import itertools
+import os
+import pickle
+import sys
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from functools import lru_cache, wraps
+from typing import Any, Callable, Hashable, Iterable, NamedTuple, Optional, Union
+
 from core.domain import Transaction
-from functools import lru_cache
 
-@lru_cache(maxsize=None)
+_versions = itertools.count(1)
+
+
+def next_version() -> int:
+    """Process-wide, strictly increasing ledger version number."""
+    return next(_versions)
+
+
+def ledger_fingerprint(ledger: Any) -> Optional[tuple[int, int]]:
+    """``(lineage, version)`` of a versioned ledger, or None for plain tuples."""
+    return getattr(ledger, "fingerprint", None)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _HashedKey(list):
+    """Cache key that hashes its parts once (like ``functools._HashedSeq``)."""
+
+    __slots__ = ("hashvalue",)
+
+    def __init__(self, parts: tuple):
+        self[:] = parts
+        self.hashvalue = hash(parts)
+
+    def __hash__(self) -> int:
+        return self.hashvalue
+
+
+_MISSING = object()
+
+
+class _LedgerCache:
+    """LRU memo keyed on ``(ledger fingerprint, other args)``.
+
+    Versioned ledgers (PVector, TransactionStore) are never hashed or
+    compared, so a hit is O(1), and the cache holds no reference to them.
+    Only the newest ``versions`` versions of each lineage are retained;
+    entries for older ones are dropped as soon as a newer version is seen.
+    Other ledgers fall back to being part of the key themselves.
+    """
+
+    def __init__(self, func: Callable, ledger_arg: str, maxsize: int, versions: int):
+        self._func = func
+        self._sig = inspect.signature(func)
+        self._ledger_arg = ledger_arg
+        self._nparams = len(self._sig.parameters)
+        self._pos = list(self._sig.parameters).index(ledger_arg)
+        self.maxsize = maxsize
+        self.versions = versions
+        self._data: OrderedDict[_HashedKey, Any] = OrderedDict()
+        self._lineages: dict[int, list[int]] = {}
+        self._keys_by_fp: dict[tuple[int, int], set[_HashedKey]] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = 0
+
+    def _key(self, args: tuple, kwargs: dict) -> _HashedKey:
+        if not kwargs and len(args) == self._nparams:
+            pos = self._pos
+            ledger, rest = args[pos], args[:pos] + args[pos + 1:]
+        else:
+            bound = self._sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            ledger = bound.arguments[self._ledger_arg]
+            rest = tuple(v for k, v in bound.arguments.items() if k != self._ledger_arg)
+        fp = ledger_fingerprint(ledger)
+        return _HashedKey((fp, None if fp is not None else ledger, rest))
+
+    def _track(self, fp: tuple[int, int], key: _HashedKey) -> bool:
+        lineage, version = fp
+        seen = self._lineages.setdefault(lineage, [])
+        if version not in seen:
+            if len(seen) >= self.versions and version < seen[0]:
+                return False  # already superseded
+            insort(seen, version)
+            while len(seen) > self.versions:
+                self._drop((lineage, seen.pop(0)))
+        self._keys_by_fp.setdefault(fp, set()).add(key)
+        return True
+
+    def _drop(self, fp: tuple[int, int]) -> None:
+        for key in self._keys_by_fp.pop(fp, ()):
+            self._data.pop(key, None)
+
+    def _evict_lru(self) -> None:
+        key, _ = self._data.popitem(last=False)
+        fp = key[0]
+        if fp is None:
+            return
+        keys = self._keys_by_fp[fp]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_fp[fp]
+            lineage, version = fp
+            seen = self._lineages[lineage]
+            seen.remove(version)
+            if not seen:
+                del self._lineages[lineage]
+
+    def __call__(self, *args, **kwargs):
+        try:
+            key = self._key(args, kwargs)
+        except TypeError:
+            # unhashable ledger (e.g. a list): nothing sensible to key on
+            return self._func(*args, **kwargs)
+
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value
+            self._misses += 1
+
+        value = self._func(*args, **kwargs)
+
+        with self._lock:
+            fp = key[0]
+            if fp is None or self._track(fp, key):
+                self._data[key] = value
+                while len(self._data) > self.maxsize:
+                    self._evict_lru()
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._data))
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._lineages.clear()
+            self._keys_by_fp.clear()
+            self._hits = self._misses = 0
+
+
+def ledger_cache(ledger_arg: str, maxsize: int = 256, versions: int = 2):
+    """Memoize a function of a ledger by its version instead of its contents.
+
+    ``ledger_arg`` names the parameter holding the transactions.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = _LedgerCache(func, ledger_arg, maxsize, versions)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache(*args, **kwargs)
+
+        wrapper.cache_info = cache.cache_info
+        wrapper.cache_clear = cache.cache_clear
+        return wrapper
+
+    return decorator
+
+
+@ledger_cache("transactions")
 def forecast_expenses(category: str, transactions: tuple[Transaction, ...], months: int) -> float:
     values = [abs(t.amount) for t in transactions if t.cat_id == category]
     if not values:
@@ -10,3 +181,586 @@ def forecast_expenses(category: str, transactions: tuple[Transaction, ...], mont
     avg_per_month = sum(values) / len(values)
 
     return avg_per_month
+
+
+# --- General-purpose caches for report results
+
+_PROCESS_TOKEN = os.urandom(8).hex()
+
+
+def estimate_size(obj: Any, _seen: Optional[set[int]] = None) -> int:
+    """Approximate memory held by ``obj``, counting shared objects once."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += estimate_size(k, _seen) + estimate_size(v, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        for item in obj:
+            size += estimate_size(item, _seen)
+    else:
+        # slots first: a computed ``__dict__`` (``_Slotted``) is a throwaway
+        # whose id would be reused and wrongly marked as seen
+        slots, has_dict = _layout(type(obj))
+        for name in slots:
+            value = getattr(obj, name, _MISSING)
+            if value is not _MISSING:
+                size += estimate_size(value, _seen)
+        if has_dict:
+            size += estimate_size(vars(obj), _seen)
+    return size
+
+
+@lru_cache(maxsize=None)
+def _layout(cls: type) -> tuple[tuple[str, ...], bool]:
+    """Slot names of ``cls`` and whether its instances have a real ``__dict__``."""
+    names: list[str] = []
+    has_dict = False
+    for klass in cls.__mro__[:-1]:  # not ``object``
+        if "__slots__" not in klass.__dict__:
+            has_dict = True
+            continue
+        slots = klass.__dict__["__slots__"]
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name == "__dict__":
+                has_dict = True
+            elif name != "__weakref__" and name not in names:
+                names.append(name)
+    return tuple(names), has_dict
+
+
+class LatencyHistogram:
+    """Counts of observed latencies in fixed millisecond buckets."""
+
+    BOUNDS_MS = (0.1, 1.0, 10.0, 100.0, 1000.0)
+
+    def __init__(self, bounds_ms: Iterable[float] = BOUNDS_MS):
+        self.bounds_ms = tuple(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.total_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect_left(self.bounds_ms, ms)] += 1
+        self.total_ms += ms
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def buckets(self) -> list[tuple[str, int]]:
+        labels = [f"<= {b:g} ms" for b in self.bounds_ms]
+        labels.append(f"> {self.bounds_ms[-1]:g} ms")
+        return list(zip(labels, self.counts))
+
+
+class EvictionPolicy:
+    """Chooses which key a full cache gives up. Callers hold the cache lock."""
+
+    def admit(self, key: Hashable, now: float) -> None:
+        raise NotImplementedError
+
+    def touch(self, key: Hashable, now: float) -> None:
+        pass
+
+    def forget(self, key: Hashable) -> None:
+        raise NotImplementedError
+
+    def victim(self) -> Hashable:
+        raise NotImplementedError
+
+    def expired(self, key: Hashable, now: float) -> bool:
+        return False
+
+
+class LRUPolicy(EvictionPolicy):
+    def __init__(self):
+        self._order: OrderedDict[Hashable, None] = OrderedDict()
+
+    def admit(self, key, now):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def touch(self, key, now):
+        self._order.move_to_end(key)
+
+    def forget(self, key):
+        self._order.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._order))
+
+
+class LFUPolicy(EvictionPolicy):
+    """Least frequently used; ties go to the least recently used. O(1)."""
+
+    def __init__(self):
+        self._freq: dict[Hashable, int] = {}
+        self._buckets: dict[int, OrderedDict[Hashable, None]] = {}
+        self._min = 0
+
+    def _move(self, key: Hashable, freq: int) -> None:
+        self._freq[key] = freq
+        self._buckets.setdefault(freq, OrderedDict())[key] = None
+
+    def admit(self, key, now):
+        self.forget(key)
+        self._move(key, 1)
+        self._min = 1
+
+    def touch(self, key, now):
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min == freq:
+                self._min = freq + 1
+        self._move(key, freq + 1)
+
+    def forget(self, key):
+        freq = self._freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min == freq:
+                self._min = min(self._buckets, default=0)
+
+    def victim(self):
+        return next(iter(self._buckets[self._min]))
+
+
+class TTLPolicy(EvictionPolicy):
+    """Entries expire ``ttl`` seconds after being stored; the oldest go first."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._stored: OrderedDict[Hashable, float] = OrderedDict()
+
+    def admit(self, key, now):
+        self._stored.pop(key, None)
+        self._stored[key] = now
+
+    def forget(self, key):
+        self._stored.pop(key, None)
+
+    def victim(self):
+        return next(iter(self._stored))
+
+    def expired(self, key, now):
+        return now - self._stored[key] > self.ttl
+
+
+def make_policy(policy: str, ttl: Optional[float] = None) -> EvictionPolicy:
+    if policy == "lru":
+        return LRUPolicy()
+    if policy == "lfu":
+        return LFUPolicy()
+    if policy == "ttl":
+        if ttl is None:
+            raise ValueError("ttl policy needs a ttl")
+        return TTLPolicy(ttl)
+    raise ValueError(f"Unknown cache policy: {policy}")
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    disk_hits: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class _DiskTier:
+    """One pickle file per entry: a ``(key, tags, stored_at)`` header, then the value.
+
+    Files are replaced atomically; headers are indexed on open so tags can
+    be invalidated without unpickling values. Total file size is kept under
+    ``max_bytes`` by removing least recently used files; recency survives
+    restarts through file mtimes, which hits refresh.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        os.makedirs(path, exist_ok=True)
+        self._tags: dict[str, set[str]] = {}
+        self._sizes: OrderedDict[str, int] = OrderedDict()  # least recent first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        found = []
+        for name in os.listdir(path):
+            if name.endswith(".pkl"):
+                file = os.path.join(path, name)
+                header = self._header(file)
+                if header is None:
+                    continue
+                for tag in header[1]:
+                    self._tags.setdefault(tag, set()).add(name)
+                try:
+                    st = os.stat(file)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, name, st.st_size))
+        for _, name, size in sorted(found):
+            self._sizes[name] = size
+            self._bytes += size
+        self.evictions = 0
+        with self._lock:
+            self._evict_locked()
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def _forget_locked(self, name: str) -> None:
+        self._bytes -= self._sizes.pop(name, 0)
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and self._sizes:
+            name = next(iter(self._sizes))
+            self._forget_locked(name)
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            self.evictions += 1
+
+    @staticmethod
+    def _name(key: Hashable) -> str:
+        return hashlib.sha256(pickle.dumps(key, protocol=4)).hexdigest() + ".pkl"
+
+    @staticmethod
+    def _header(file: str) -> Optional[tuple]:
+        try:
+            with open(file, "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def load(self, key: Hashable) -> tuple[Any, tuple[str, ...], float]:
+        """``(value, tags, stored_at)``; value is ``_MISSING`` when absent."""
+        try:
+            name = self._name(key)
+            file = os.path.join(self.path, name)
+            with open(file, "rb") as f:
+                stored_key, tags, stored_at = pickle.load(f)
+                if stored_key == key:
+                    value = pickle.load(f)
+                else:
+                    return _MISSING, (), 0.0
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError):
+            return _MISSING, (), 0.0
+        with self._lock:
+            if name in self._sizes:
+                self._sizes.move_to_end(name)
+        try:
+            os.utime(file)
+        except OSError:
+            pass
+        return value, tags, stored_at
+
+    def store(self, key: Hashable, value: Any, tags: tuple[str, ...], now: float) -> bool:
+        try:
+            name = self._name(key)
+            data = pickle.dumps((key, tags, now), protocol=4) + pickle.dumps(value, protocol=4)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False
+        if len(data) > self.max_bytes:
+            return False
+        file = os.path.join(self.path, name)
+        with self._lock:
+            with open(file + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(file + ".tmp", file)
+            self._forget_locked(name)
+            self._sizes[name] = len(data)
+            self._bytes += len(data)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(name)
+            self._evict_locked()
+        return True
+
+    def remove(self, key: Hashable) -> None:
+        try:
+            name = self._name(key)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        with self._lock:
+            self._forget_locked(name)
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+    def remove_tag(self, tag: str) -> int:
+        removed = 0
+        with self._lock:
+            for name in self._tags.pop(tag, ()):
+                self._forget_locked(name)
+                try:
+                    os.remove(os.path.join(self.path, name))
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in os.listdir(self.path):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.path, name))
+            self._tags.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+
+class Cache:
+    """Byte-bounded in-memory cache with a pluggable eviction policy.
+
+    Entries may carry tags (``"account:acc1"``, ``"category:cat2"``) for
+    bulk invalidation. With ``disk_dir`` every stored value is also
+    pickled to disk (at most ``disk_max_bytes``, least recently used files
+    evicted first), and memory misses fall through to that tier, so
+    results survive restarts. ``stats()`` and ``latency`` expose counters
+    and a histogram of ``get_or_compute`` call times.
+    """
+
+    def __init__(
+        self,
+        name: str = "cache",
+        policy: Union[str, EvictionPolicy] = "lru",
+        max_bytes: int = 64 << 20,
+        ttl: Optional[float] = None,
+        disk_dir: Optional[str] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+        disk_max_bytes: int = 256 << 20,
+    ):
+        self.name = name
+        self.policy = make_policy(policy, ttl) if isinstance(policy, str) else policy
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.disk = _DiskTier(disk_dir, disk_max_bytes) if disk_dir else None
+        self.latency = LatencyHistogram()
+        self._entries: dict[Hashable, tuple[Any, int, tuple[str, ...]]] = {}
+        self._tags: dict[str, set[Hashable]] = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._hits = self._misses = self._disk_hits = 0
+        self._evictions = self._expirations = self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._lookup(key, count=False) is not _MISSING
+
+    def _remove(self, key: Hashable) -> None:
+        value, size, tags = self._entries.pop(key)
+        self._bytes -= size
+        self.policy.forget(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _lookup(self, key: Hashable, count: bool = True) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.policy.expired(key, now):
+                    self._remove(key)
+                    self._expirations += 1
+                else:
+                    if count:
+                        self.policy.touch(key, now)
+                        self._hits += 1
+                    return entry[0]
+        if self.disk is not None:
+            value, tags, stored_at = self.disk.load(key)
+            if value is not _MISSING:
+                if self.ttl is not None and time.time() - stored_at > self.ttl:
+                    self.disk.remove(key)
+                else:
+                    if count:
+                        with self._lock:
+                            self._hits += 1
+                            self._disk_hits += 1
+                        self._admit(key, value, tags, now)
+                    return value
+        if count:
+            with self._lock:
+                self._misses += 1
+        return _MISSING
+
+    def _admit(self, key: Hashable, value: Any, tags: tuple[str, ...], now: float) -> None:
+        size = self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                _, _, old_tags = self._entries[key]
+                tags = tuple(dict.fromkeys(old_tags + tags))
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            while self._entries and self._bytes + size > self.max_bytes:
+                self._remove(self.policy.victim())
+                self._evictions += 1
+            self._entries[key] = (value, size, tags)
+            self._bytes += size
+            self.policy.admit(key, now)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), persist: bool = True) -> None:
+        tags = tuple(tags)
+        self._admit(key, value, tags, time.monotonic())
+        if persist and self.disk is not None:
+            self.disk.store(key, value, tags, time.time())
+
+    def get_or_compute(
+        self,
+        key: Hashable,
+        compute: Callable[[], Any],
+        tags: Iterable[str] = (),
+        persist: bool = True,
+    ) -> Any:
+        start = time.perf_counter()
+        value = self._lookup(key)
+        if value is _MISSING:
+            value = compute()
+            self.set(key, value, tags, persist)
+        self.latency.observe(time.perf_counter() - start)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._invalidations += 1
+        if self.disk is not None:
+            self.disk.remove(key)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry carrying any of ``tags``; returns how many."""
+        removed = 0
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+            self._invalidations += removed
+        if self.disk is not None:
+            for tag in tags:
+                self.disk.remove_tag(tag)
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                self._hits, self._misses, self._disk_hits, self._evictions,
+                self._expirations, self._invalidations, len(self._entries),
+                self._bytes, self.max_bytes,
+            )
+
+
+_caches: dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, **options) -> Cache:
+    """The process-wide cache called ``name``, created with ``options`` on first use."""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = Cache(name, **options)
+        return cache
+
+
+def all_caches() -> dict[str, Cache]:
+    with _caches_lock:
+        return dict(_caches)
+
+
+def _freeze(arg: Any) -> tuple[Hashable, bool]:
+    """Cache-key form of an argument and whether it is stable across restarts."""
+    fp = ledger_fingerprint(arg)
+    if fp is not None:
+        # fingerprints are only meaningful within this process
+        return ("ledger", _PROCESS_TOKEN) + fp, False
+    return arg, True
+
+
+def cached(
+    cache: Cache,
+    tags: Union[Iterable[str], Callable[..., Iterable[str]]] = (),
+    key: Optional[Callable[..., Hashable]] = None,
+):
+    """Memoize a function in ``cache``.
+
+    The default key is the function's qualified name plus its arguments,
+    with versioned ledgers replaced by their fingerprints; such keys are
+    kept in memory only. ``key`` may supply a restart-stable key instead.
+    ``tags`` is a fixed iterable or a function of the call's arguments.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                k, persist = (name, key(*args, **kwargs)), True
+            else:
+                frozen = [_freeze(a) for a in args]
+                frozen_kw = [(n, _freeze(v)) for n, v in sorted(kwargs.items())]
+                persist = all(p for _, p in frozen) and all(p for _, (_, p) in frozen_kw)
+                k = (
+                    name,
+                    tuple(f for f, _ in frozen),
+                    tuple((n, f) for n, (f, _) in frozen_kw),
+                )
+            entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+            return cache.get_or_compute(k, lambda: func(*args, **kwargs), entry_tags, persist)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
@@ -0,0 +1,197 @@
+import threading
+import time
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+from core.memo import Cache, ledger_fingerprint
+
+DEFAULT_INTERVAL = 300.0
+POLL_EVERY = 1.0
+
+
+class Precomputed(NamedTuple):
+    """One refreshed value and when/what it was computed from."""
+
+    name: str
+    value: Any
+    version: Hashable
+    refreshed_at: float  # wall clock, for display
+    duration: float  # seconds spent computing
+    error: Optional[str] = None
+
+    @property
+    def age(self) -> float:
+        return max(0.0, time.time() - self.refreshed_at)
+
+
+class _Task(NamedTuple):
+    func: Callable[[Any], Any]
+    every: float
+
+
+def ledger_version(ledger: Any) -> Hashable:
+    """Version of a store/vector (fingerprint) or an ``SqliteLedger`` (revision)."""
+    fp = ledger_fingerprint(ledger)
+    if fp is not None:
+        return fp
+    revision = getattr(ledger, "revision", None)
+    return revision() if callable(revision) else None
+
+
+class Precomputer:
+    """Refreshes named aggregates of a ledger in a background thread.
+
+    Each registered ``func(data)`` is recomputed when its ``every`` seconds
+    have passed or when ``version(source)`` changes, where ``data`` is
+    ``load(source)`` taken once per refresh round. Results are stored as
+    ``Precomputed`` entries in ``cache`` (tag ``"precompute"``), so readers
+    get the latest value without computing it. ``poke`` asks the worker to
+    check the version now instead of at its next poll.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        load: Callable[[Any], Any] = lambda source: source,
+        version: Callable[[Any], Hashable] = ledger_version,
+        interval: float = DEFAULT_INTERVAL,
+        poll: float = POLL_EVERY,
+        cache: Optional[Cache] = None,
+    ):
+        self.source = source
+        self.load = load
+        self.version = version
+        self.interval = interval
+        self.poll = poll
+        self.cache = cache if cache is not None else Cache("precompute", max_bytes=64 << 20)
+        self._tasks: dict[str, _Task] = {}
+        self._due: dict[str, float] = {}  # name -> monotonic time of next refresh
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, func: Callable[[Any], Any], every: Optional[float] = None) -> None:
+        """Add or replace an aggregate; re-registering keeps its stored value."""
+        with self._lock:
+            self._tasks[name] = _Task(func, self.interval if every is None else every)
+            self._due.setdefault(name, 0.0)
+        self._wake.set()
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._tasks)
+
+    def get(self, name: str) -> Optional[Precomputed]:
+        return self.cache.get(name)
+
+    def value(self, name: str, default: Any = None) -> Any:
+        """Latest value, or ``default`` while the worker computes the first one.
+
+        Without a running worker every aggregate that has no value yet is
+        computed now, in one refresh round (one ``load``).
+        """
+        entry = self.get(name)
+        if entry is None:
+            with self._lock:
+                names = list(self._tasks)
+            if name in names:
+                if self.running:
+                    self.poke()
+                else:
+                    missing = [n for n in names if self.get(n) is None]
+                    entry = self.refresh(missing).get(name)
+        return default if entry is None or entry.error else entry.value
+
+    def stale(self, name: str) -> bool:
+        entry = self.get(name)
+        if entry is None:
+            return True
+        with self._lock:
+            task = self._tasks.get(name)
+        if task is not None and entry.age > task.every:
+            return True
+        return entry.version != self.version(self.source)
+
+    def refresh(self, names: Optional[list[str]] = None) -> dict[str, Precomputed]:
+        """Recompute ``names`` (default: all) now, in the calling thread."""
+        with self._refresh_lock:
+            with self._lock:
+                tasks = {n: self._tasks[n] for n in (self._tasks if names is None else names)}
+            if not tasks:
+                return {}
+            version = self.version(self.source)
+            data = self.load(self.source)
+            out = {}
+            for name, task in tasks.items():
+                start = time.perf_counter()
+                try:
+                    value, error = task.func(data), None
+                except Exception as e:  # keep the previous value visible
+                    old = self.get(name)
+                    value, error = (old.value if old else None), f"{type(e).__name__}: {e}"
+                entry = Precomputed(name, value, version, time.time(), time.perf_counter() - start, error)
+                self.cache.set(name, entry, tags=("precompute", f"precompute:{name}"), persist=False)
+                with self._lock:
+                    self._due[name] = time.monotonic() + task.every
+                out[name] = entry
+            return out
+
+    def _pending(self) -> list[str]:
+        now = time.monotonic()
+        version = self.version(self.source)
+        with self._lock:
+            names = list(self._tasks)
+            due = dict(self._due)
+        pending = []
+        for name in names:
+            entry = self.get(name)
+            if entry is None or entry.version != version or due.get(name, 0.0) <= now:
+                pending.append(name)
+        return pending
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                pending = self._pending()
+                if pending:
+                    self.refresh(pending)
+            except Exception:
+                pass  # a broken source must not kill the worker; retry next poll
+            self._wake.wait(self.poll)
+            self._wake.clear()
+
+    def poke(self) -> None:
+        self._wake.set()
+
+    def start(self) -> "Precomputer":
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="precompute", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 1.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+_precomputers: dict[str, Precomputer] = {}
+_precomputers_lock = threading.Lock()
+
+
+def get_precomputer(name: str, source: Any, **options) -> Precomputer:
+    """The process-wide, started precomputer ``name``, created on first use."""
+    with _precomputers_lock:
+        pre = _precomputers.get(name)
+        if pre is None:
+            pre = _precomputers[name] = Precomputer(source, **options)
+        return pre.start()
@@ -0,0 +1,219 @@
+from collections.abc import Sequence
+from itertools import islice
+from typing import Any, Iterable, Iterator, Optional
+
+from core.memo import next_version
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+# CPython's tuple hash (xxHash-based, 64-bit), kept as running state so
+# that appending one item updates the hash in O(1).
+_P1 = 11400714785074694791
+_P2 = 14029467366897019727
+_P5 = 2870177450012600261
+_U64 = (1 << 64) - 1
+
+
+def _hash_step(acc: int, item: Any) -> int:
+    acc = (acc + (hash(item) & _U64) * _P2) & _U64
+    acc = ((acc << 31) | (acc >> 33)) & _U64
+    return (acc * _P1) & _U64
+
+
+def _hash_finish(acc: int, length: int) -> int:
+    acc = (acc + (length ^ (_P5 ^ 3527539))) & _U64
+    if acc == _U64:
+        return 1546275796
+    return acc - (1 << 64) if acc >= 1 << 63 else acc
+
+
+def _new_path(level: int, node: tuple) -> tuple:
+    while level > 0:
+        node = (node,)
+        level -= _BITS
+    return node
+
+
+class PVector(Sequence):
+    """Persistent vector: an immutable sequence with cheap appends.
+
+    A 32-way trie of tuples plus a tail buffer (as in Clojure's
+    PersistentVector). ``append`` copies at most one root-to-leaf path, so
+    it is O(log32 n) and every older version stays valid and shares its
+    structure with newer ones. The vector behaves like a tuple: equality
+    with tuples, ``+``, slicing, and ``hash(v) == hash(tuple(v))``, with
+    the hash maintained incrementally so it is O(1).
+
+    Every vector carries a unique ``version``; vectors derived by
+    ``append``/``extend``/``+`` share the ``lineage`` of their source, so
+    ``fingerprint`` identifies the contents without hashing them.
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail", "_hash_acc", "_version", "_lineage")
+
+    def __init__(self, items: Iterable[Any] = ()):
+        items = list(items)
+        n = len(items)
+        tailoff = 0 if n <= _WIDTH else ((n - 1) >> _BITS) << _BITS
+        nodes = [tuple(items[i:i + _WIDTH]) for i in range(0, tailoff, _WIDTH)]
+        shift = _BITS
+        while len(nodes) > _WIDTH:
+            nodes = [tuple(nodes[i:i + _WIDTH]) for i in range(0, len(nodes), _WIDTH)]
+            shift += _BITS
+        self._count = n
+        self._shift = shift
+        self._root = tuple(nodes)
+        self._tail = tuple(items[tailoff:])
+        self._hash_acc: Optional[int] = _P5 if n == 0 else None
+        self._version = self._lineage = next_version()
+
+    @classmethod
+    def _make(cls, count, shift, root, tail, hash_acc, lineage) -> "PVector":
+        v = cls.__new__(cls)
+        v._count = count
+        v._shift = shift
+        v._root = root
+        v._tail = tail
+        v._hash_acc = hash_acc
+        v._version = next_version()
+        v._lineage = lineage
+        return v
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def lineage(self) -> int:
+        return self._lineage
+
+    @property
+    def fingerprint(self) -> tuple[int, int]:
+        return (self._lineage, self._version)
+
+    def _tailoff(self) -> int:
+        if self._count < _WIDTH:
+            return 0
+        return ((self._count - 1) >> _BITS) << _BITS
+
+    def _push_tail(self, level: int, parent: tuple, tail_node: tuple) -> tuple:
+        subidx = ((self._count - 1) >> level) & _MASK
+        if level == _BITS:
+            insert = tail_node
+        elif subidx < len(parent):
+            insert = self._push_tail(level - _BITS, parent[subidx], tail_node)
+        else:
+            insert = _new_path(level - _BITS, tail_node)
+        if subidx < len(parent):
+            return parent[:subidx] + (insert,) + parent[subidx + 1:]
+        return parent + (insert,)
+
+    def append(self, item: Any) -> "PVector":
+        hash_acc = self._hash_acc
+        if hash_acc is not None:
+            try:
+                hash_acc = _hash_step(hash_acc, item)
+            except TypeError:
+                hash_acc = None
+
+        if self._count - self._tailoff() < _WIDTH:
+            return self._make(
+                self._count + 1, self._shift, self._root, self._tail + (item,), hash_acc, self._lineage
+            )
+
+        shift = self._shift
+        if (self._count >> _BITS) > (1 << shift):
+            root = (self._root, _new_path(shift, self._tail))
+            shift += _BITS
+        else:
+            root = self._push_tail(shift, self._root, self._tail)
+        return self._make(self._count + 1, shift, root, (item,), hash_acc, self._lineage)
+
+    def extend(self, items: Iterable[Any]) -> "PVector":
+        v = self
+        for item in items:
+            v = v.append(item)
+        return v
+
+    def _leaf_for(self, i: int) -> tuple:
+        if i >= self._tailoff():
+            return self._tail
+        node = self._root
+        level = self._shift
+        while level > 0:
+            node = node[(i >> level) & _MASK]
+            level -= _BITS
+        return node
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(self._count)
+            if step == 1:
+                return PVector(islice(self, start, max(start, stop)))
+            return PVector(self[j] for j in range(start, stop, step))
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("PVector index out of range")
+        return self._leaf_for(i)[i & _MASK]
+
+    def _leaves(self, node: tuple, level: int) -> Iterator[tuple]:
+        if level == 0:
+            yield node
+            return
+        for child in node:
+            yield from self._leaves(child, level - _BITS)
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._root:
+            for leaf in self._leaves(self._root, self._shift):
+                yield from leaf
+        yield from self._tail
+
+    def __add__(self, other: Iterable[Any]) -> "PVector":
+        if not isinstance(other, (tuple, list, PVector)):
+            return NotImplemented
+        return self.extend(other)
+
+    def __radd__(self, other: Iterable[Any]) -> "PVector":
+        if not isinstance(other, (tuple, list)):
+            return NotImplemented
+        return PVector(other).extend(self)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, PVector):
+            if self._count != other._count:
+                return False
+            if self._hash_acc is not None and other._hash_acc is not None and self._hash_acc != other._hash_acc:
+                return False
+        elif not isinstance(other, tuple):
+            return NotImplemented
+        return self._count == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __ne__(self, other: object) -> bool:
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __hash__(self) -> int:
+        if self._hash_acc is None:
+            acc = _P5
+            for item in self:
+                acc = _hash_step(acc, item)
+            self._hash_acc = acc
+        return _hash_finish(self._hash_acc, self._count)
+
+    def __reduce__(self):
+        return (PVector, (tuple(self),))
+
+    def __repr__(self) -> str:
+        if self._count > 6:
+            head = ", ".join(map(repr, islice(self, 3)))
+            return f"PVector([{head}, ... <{self._count} items>])"
+        return f"PVector({list(self)!r})"
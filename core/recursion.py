@@ -1,9 +1,11 @@
-from functools import lru_cache
 from collections import defaultdict
 from core.domain import Category, Transaction
+from core.memo import ledger_cache
+from core.store import TransactionStore
+from core.tree import CategoryTree
 
 
-@lru_cache
+@ledger_cache("trans")
 def forecast_expenses(cat_id: str, trans: tuple[Transaction, ...], period: int) -> int:
     monthly = defaultdict(int)
 
@@ -42,33 +44,70 @@ def by_amount_range(min: int, max: int):
     return _filter
 
 
-def flatten_categories(cats: tuple[Category, ...], root: str) -> tuple[Category, ...]:
-    children = tuple(c for c in cats if c.parent_id == root)
-    result = children
-    for child in children:
-        result += flatten_categories(cats, child.id)
-    return result
+def _children_map(cats: tuple[Category, ...]) -> dict[str, list[Category]]:
+    children: dict[str, list[Category]] = {}
+    for c in cats:
+        children.setdefault(c.parent_id, []).append(c)
+    return children
 
 
-def sum_expenses_recursive(
-    cats: tuple[Category, ...], 
-    trans: tuple[Transaction, ...], 
-    root_id: str, 
-    visited: set[str] | None = None
-) -> int:
-    if visited is None:
-        visited = set()
-    if root_id in visited:
-        return 0
-    visited.add(root_id)
+def flatten_categories(
+    cats: tuple[Category, ...] | CategoryTree, root: str
+) -> tuple[Category, ...]:
+    if isinstance(cats, CategoryTree):
+        # the tree already indexes children; only the subtree is visited
+        by_id, child_ids = cats.categories, cats.children
+
+        def kids_of(parent_id: str) -> list[Category]:
+            return [by_id[cid] for cid in child_ids.get(parent_id, ())]
+    else:
+        kids_of = _children_map(cats).get
 
-    children = [c for c in cats if c.parent_id == root_id]
+    result: list[Category] = []
 
-    total = sum(t.amount for t in trans if t.cat_id == root_id and t.amount < 0)
+    def walk(parent_id: str) -> None:
+        kids = kids_of(parent_id) or ()
+        result.extend(kids)
+        for child in kids:
+            walk(child.id)
 
-    for child in children:
-        total += sum_expenses_recursive(cats, trans, child.id, visited)
+    walk(root)
+    return tuple(result)
 
-    return total
 
+def _subtree_ids(
+    children: dict[str, list[Category]], root_id: str, visited: set[str]
+) -> list[str]:
+    if root_id in visited:
+        return []
+    visited.add(root_id)
+
+    ids = [root_id]
+    for child in children.get(root_id, ()):
+        ids += _subtree_ids(children, child.id, visited)
+    return ids
 
+
+def sum_expenses_recursive(
+    cats: tuple[Category, ...] | CategoryTree,
+    trans: tuple[Transaction, ...], 
+    root_id: str, 
+    visited: set[str] | None = None
+) -> int:
+    if isinstance(cats, CategoryTree) and not visited:
+        # cycles were already rejected when the tree was built
+        ids = cats.subtree_ids(root_id)
+        if visited is not None:
+            visited.update(ids)
+    else:
+        if visited is None:
+            visited = set()
+        if isinstance(cats, CategoryTree):
+            cats = tuple(cats.categories.values())
+        ids = _subtree_ids(_children_map(cats), root_id, visited)
+
+    if isinstance(trans, TransactionStore):
+        return trans.expense_total(ids)
+
+    wanted = set(ids)
+    return sum(t.amount for t in trans if t.amount < 0 and t.cat_id in wanted)
@@ -0,0 +1,240 @@
+import json
+import mmap
+import os
+import struct
+import zlib
+from array import array
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from core.domain import Account, Budget, Category, Transaction
+from core.store import Dictionary, TransactionStore
+
+MAGIC = b"FMLEDGER"
+VERSION = 1
+SNAPSHOT_SUFFIX = ".snap"
+
+# meta (JSON), amounts, ts codes, account codes, category codes,
+# id offsets, id blob, note offsets, note blob
+_SECTIONS = 9
+_HEADER = struct.Struct("<8sHHQ" + "QQ" * _SECTIONS + "II")
+_ALIGN = 8
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class Snapshot(NamedTuple):
+    accounts: Tuple[Account, ...]
+    categories: Tuple[Category, ...]
+    transactions: TransactionStore
+    budgets: Tuple[Budget, ...]
+    meta: dict
+
+
+class _StringTable(Sequence):
+    """Read-only string column decoded lazily from an offsets + blob pair."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview, tagged: bool = False):
+        self._offsets = offsets
+        self._blob = blob
+        self._tagged = tagged
+
+    def __len__(self) -> int:
+        return max(0, len(self._offsets) - 1)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        raw = bytes(self._blob[self._offsets[i]:self._offsets[i + 1]])
+        return _decode_id(raw) if self._tagged else raw.decode("utf-8")
+
+    def __iter__(self) -> Iterator:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _encode_id(value) -> bytes:
+    if isinstance(value, int):
+        return b"i" + str(value).encode("ascii")
+    return b"s" + value.encode("utf-8")
+
+
+def _decode_id(raw: bytes):
+    if raw[:1] == b"i":
+        return int(raw[1:])
+    return raw[1:].decode("utf-8")
+
+
+def snapshot_path_for(source_path: str) -> str:
+    return os.path.splitext(source_path)[0] + SNAPSHOT_SUFFIX
+
+
+def source_info(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def write_snapshot(
+    path: str,
+    accounts: Sequence[Account],
+    categories: Sequence[Category],
+    transactions: Sequence[Transaction],
+    budgets: Sequence[Budget],
+    source: Optional[dict] = None,
+    meta: Optional[dict] = None,
+) -> None:
+    """Write the ledger to ``path`` atomically (temp file + rename)."""
+    store = transactions if isinstance(transactions, TransactionStore) else TransactionStore(transactions)
+    meta_bytes = json.dumps({
+        "accounts": [a.__dict__ for a in accounts],
+        "categories": [c.__dict__ for c in categories],
+        "budgets": [b.__dict__ for b in budgets],
+        "timestamps": store.timestamps.values,
+        "account_ids": store.accounts.values,
+        "category_ids": store.categories.values,
+        "source": source,
+        "extra": meta or {},
+    }).encode("utf-8")
+
+    tmp = f"{path}.tmp"
+    sections: list[Tuple[int, int]] = []
+    body_crc = 0
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * _HEADER.size)
+
+        def section(data: bytes, checksum: bool = True) -> None:
+            nonlocal body_crc
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            sections.append((f.tell(), len(data)))
+            f.write(data)
+            if checksum:
+                body_crc = zlib.crc32(data, body_crc)
+
+        def strings(values, encode) -> None:
+            offsets = array("Q", [0])
+            chunks = []
+            for v in values:
+                raw = encode(v)
+                chunks.append(raw)
+                offsets.append(offsets[-1] + len(raw))
+            section(offsets.tobytes())
+            section(b"".join(chunks))
+
+        section(meta_bytes, checksum=False)
+        for column, code in (
+            (store.amounts, "q"),
+            (store.ts_codes, "I"),
+            (store.account_codes, "I"),
+            (store.category_codes, "I"),
+        ):
+            section(column.tobytes() if isinstance(column, array) else array(code, column).tobytes())
+        strings(store.ids, _encode_id)
+        strings(store.notes, lambda s: s.encode("utf-8"))
+
+        fields = [MAGIC, VERSION, 0, len(store)]
+        for off, length in sections:
+            fields += [off, length]
+        header_crc = zlib.crc32(_HEADER.pack(*fields, 0, 0)[:-8] + meta_bytes)
+        f.seek(0)
+        f.write(_HEADER.pack(*fields, header_crc, body_crc))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _read_header(buf: bytes) -> Tuple[int, list[Tuple[int, int]], int, int]:
+    if len(buf) < _HEADER.size:
+        raise SnapshotError("Snapshot is truncated")
+    fields = _HEADER.unpack_from(buf)
+    magic, version, _flags, rows = fields[:4]
+    if magic != MAGIC:
+        raise SnapshotError("Not a ledger snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    raw = fields[4:-2]
+    sections = [(raw[i], raw[i + 1]) for i in range(0, len(raw), 2)]
+    return rows, sections, fields[-2], fields[-1]
+
+
+def _read_meta(header: bytes, meta_bytes: bytes, header_crc: int) -> dict:
+    if zlib.crc32(header[:_HEADER.size - 8] + meta_bytes) != header_crc:
+        raise SnapshotError("Snapshot header checksum mismatch")
+    return json.loads(meta_bytes)
+
+
+def open_snapshot(path: str, verify: bool = False) -> Snapshot:
+    """Map a snapshot into memory.
+
+    Column data is not copied: the returned store reads amounts and codes
+    straight from the mapping and decodes ids/notes on access. Only the
+    header and meta section are checksummed unless ``verify`` is set, so
+    opening costs the same regardless of ledger size.
+    """
+    with open(path, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            raise SnapshotError("Snapshot is empty") from e
+    view = memoryview(mm)
+    rows, sections, header_crc, body_crc = _read_header(view[:_HEADER.size])
+    if any(off + length > len(view) for off, length in sections):
+        raise SnapshotError("Snapshot is truncated")
+    parts = [view[off:off + length] for off, length in sections]
+    meta = _read_meta(bytes(view[:_HEADER.size]), bytes(parts[0]), header_crc)
+
+    if verify:
+        crc = 0
+        for part in parts[1:]:
+            crc = zlib.crc32(part, crc)
+        if crc != body_crc:
+            raise SnapshotError("Snapshot body checksum mismatch")
+
+    amounts = parts[1].cast("q")
+    ts_codes, acc_codes, cat_codes = (p.cast("I") for p in parts[2:5])
+    ids = _StringTable(parts[5].cast("Q"), parts[6], tagged=True)
+    notes = _StringTable(parts[7].cast("Q"), parts[8])
+    if not len(amounts) == len(ts_codes) == len(acc_codes) == len(cat_codes) == len(ids) == len(notes) == rows:
+        raise SnapshotError("Snapshot column lengths disagree")
+
+    store = TransactionStore.from_columns(
+        ids, notes, amounts, ts_codes, acc_codes, cat_codes,
+        Dictionary(meta["timestamps"]),
+        Dictionary(meta["account_ids"]),
+        Dictionary(meta["category_ids"]),
+    )
+    return Snapshot(
+        accounts=tuple(Account(**a) for a in meta["accounts"]),
+        categories=tuple(Category(**c) for c in meta["categories"]),
+        transactions=store,
+        budgets=tuple(Budget(**b) for b in meta["budgets"]),
+        meta=meta["extra"],
+    )
+
+
+def read_snapshot_meta(path: str) -> dict:
+    """Return the full meta section (including ``source``) without mapping columns."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        _, sections, header_crc, _ = _read_header(header)
+        off, length = sections[0]
+        f.seek(off)
+        meta_bytes = f.read(length)
+    if len(meta_bytes) != length:
+        raise SnapshotError("Snapshot is truncated")
+    return _read_meta(header, meta_bytes, header_crc)
+
+
+def snapshot_is_fresh(snapshot_path: str, source_path: str) -> bool:
+    """True when ``snapshot_path`` was written from the current ``source_path``."""
+    try:
+        source = read_snapshot_meta(snapshot_path).get("source") or {}
+        current = source_info(source_path)
+    except (OSError, SnapshotError, ValueError):
+        return False
+    return source.get("size") == current["size"] and source.get("mtime_ns") == current["mtime_ns"]
+
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import threading
+from typing import Iterable, Iterator, Tuple
+
+from core.domain import Budget, Transaction
+from core.functional import Either, check_budget_spent
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY,
+    id NOT NULL UNIQUE,
+    account_id TEXT NOT NULL,
+    cat_id TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    ts TEXT NOT NULL,
+    note TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ix_tx_account_ts ON transactions (account_id, ts, amount);
+CREATE INDEX IF NOT EXISTS ix_tx_cat_ts ON transactions (cat_id, ts, amount);
+CREATE INDEX IF NOT EXISTS ix_tx_ts ON transactions (ts);
+"""
+
+_COLUMNS = "id, account_id, cat_id, amount, ts, note"
+
+_pool: dict[str, Tuple[sqlite3.Connection, threading.RLock]] = {}
+_pool_pid = os.getpid()
+_pool_lock = threading.Lock()
+
+
+def _connect(path: str, synchronous: str) -> Tuple[sqlite3.Connection, threading.RLock]:
+    """Return this process's shared connection for ``path``, opening it once."""
+    global _pool_pid
+    key = os.path.abspath(path)
+    with _pool_lock:
+        if _pool_pid != os.getpid():
+            # connections must not cross a fork
+            _pool.clear()
+            _pool_pid = os.getpid()
+        entry = _pool.get(key)
+        if entry is None:
+            conn = sqlite3.connect(key, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"PRAGMA synchronous={synchronous}")
+            conn.executescript(_SCHEMA)
+            entry = _pool[key] = (conn, threading.RLock())
+        return entry
+
+
+def close_all() -> None:
+    with _pool_lock:
+        for conn, lock in _pool.values():
+            with lock:
+                conn.close()
+        _pool.clear()
+
+
+def _id_to_sql(tx_id):
+    # compact 128-bit ids do not fit an SQLite integer
+    return tx_id.to_bytes(16, "big") if isinstance(tx_id, int) else tx_id
+
+
+def _row_to_tx(row: tuple) -> Transaction:
+    tx_id, account_id, cat_id, amount, ts, note = row
+    if isinstance(tx_id, bytes):
+        tx_id = int.from_bytes(tx_id, "big")
+    return Transaction(tx_id, account_id, cat_id, amount, ts, note)
+
+
+def _tx_to_row(t: Transaction) -> tuple:
+    return (_id_to_sql(t.id), t.account_id, t.cat_id, t.amount, t.ts, t.note)
+
+
+class SqliteLedger:
+    """Durable transaction ledger backed by SQLite in WAL mode.
+
+    Mirrors the transforms/recursion API, but answers each query with an
+    indexed SQL aggregate instead of scanning transactions in Python.
+    """
+
+    def __init__(self, path: str, synchronous: str = "FULL"):
+        self.path = path
+        self._conn, self._lock = _connect(path, synchronous)
+
+    def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def add_transaction(self, t: Transaction) -> None:
+        self.add_transactions((t,))
+
+    def add_transactions(self, trans: Iterable[Transaction]) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cur = self._conn.executemany(
+                    f"INSERT INTO transactions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?)",
+                    map(_tx_to_row, trans),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return cur.rowcount
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM transactions")[0][0]
+
+    def revision(self) -> int:
+        """Sequence number of the newest row; changes whenever rows are added."""
+        return self._query("SELECT COALESCE(MAX(seq), 0) FROM transactions")[0][0]
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return iter(self._select("1 ORDER BY seq"))
+
+    def _select(self, where: str, params: tuple = ()) -> Tuple[Transaction, ...]:
+        rows = self._query(f"SELECT {_COLUMNS} FROM transactions WHERE {where}", params)
+        return tuple(map(_row_to_tx, rows))
+
+    def account_balance(self, acc_id: str) -> int:
+        return self._query(
+            "SELECT COALESCE(SUM(amount), 0) FROM transactions WHERE account_id = ?",
+            (acc_id,),
+        )[0][0]
+
+    def by_date_range(self, start: str, end: str) -> Tuple[Transaction, ...]:
+        return self._select("ts >= ? AND ts <= ? ORDER BY ts, seq", (start, end))
+
+    def by_category(self, cat_id: str) -> Tuple[Transaction, ...]:
+        return self._select("cat_id = ? ORDER BY ts, seq", (cat_id,))
+
+    def category_expenses(self, cat_id: str, start: str = "", end: str = "\uffff") -> int:
+        """Absolute sum of expenses in ``cat_id`` with ``start <= ts <= end``."""
+        return self._query(
+            "SELECT COALESCE(-SUM(amount), 0) FROM transactions "
+            "WHERE cat_id = ? AND ts >= ? AND ts <= ? AND amount < 0",
+            (cat_id, start, end),
+        )[0][0]
+
+    def check_budget(self, b: Budget) -> Either[dict, Budget]:
+        return check_budget_spent(b, self.category_expenses(b.cat_id))
+
+    def forecast_expenses(self, cat_id: str, period: int) -> int:
+        rows = self._query(
+            "SELECT SUM(amount) FROM transactions "
+            "WHERE cat_id = ? AND amount < 0 "
+            "GROUP BY substr(ts, 1, 7) ORDER BY substr(ts, 1, 7) DESC LIMIT ?",
+            (cat_id, period if period > 0 else -1),
+        )
+        if not rows:
+            return 0
+        return sum(r[0] for r in rows) // len(rows)
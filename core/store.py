@@ -0,0 +1,371 @@
+import operator
+import sys
+from array import array
+from itertools import compress
+from typing import Iterable, Iterator, Optional, Sequence, Union, overload
+
+from core.domain import Transaction
+from core.memo import next_version
+
+
+class Dictionary:
+    """Append-only dictionary encoding for a repeated string column.
+
+    Codes are never reassigned, so one Dictionary can be shared by every
+    store derived from the same ledger.
+    """
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        for v in values:
+            self.encode(v)
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def code(self, value: str) -> Optional[int]:
+        return self._codes.get(value)
+
+    def decode(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._codes
+
+
+class TransactionStore:
+    """Columnar, array-backed sequence of transactions.
+
+    Amounts live in a packed int64 array; timestamps, account ids and
+    category ids are dictionary encoded into uint32 code arrays. The store
+    still behaves like ``tuple[Transaction, ...]`` (len, indexing, slicing,
+    iteration, ``+``, equality, hashing), materialising ``Transaction``
+    objects on demand, and exposes its columns for hot aggregations.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self._ids: list[str] = []
+        self._notes: list[str] = []
+        self._amounts = array("q")
+        self._ts = array("I")
+        self._account_codes = array("I")
+        self._cat_codes = array("I")
+        self._ts_dict = Dictionary()
+        self._account_dict = Dictionary()
+        self._cat_dict = Dictionary()
+        self._hash: Optional[int] = None
+        self._stamp()
+        self._extend(transactions)
+
+    @classmethod
+    def from_batches(cls, batches: Iterable[Iterable[Transaction]]) -> "TransactionStore":
+        store = cls()
+        for batch in batches:
+            store._extend(batch)
+        return store
+
+    @classmethod
+    def from_columns(
+        cls,
+        ids: Sequence,
+        notes: Sequence[str],
+        amounts: Sequence[int],
+        ts_codes: Sequence[int],
+        account_codes: Sequence[int],
+        category_codes: Sequence[int],
+        timestamps: Dictionary,
+        accounts: Dictionary,
+        categories: Dictionary,
+    ) -> "TransactionStore":
+        """Wrap existing columns (e.g. memoryviews over a snapshot) without copying."""
+        store = cls.__new__(cls)
+        store._ids = ids
+        store._notes = notes
+        store._amounts = amounts
+        store._ts = ts_codes
+        store._account_codes = account_codes
+        store._cat_codes = category_codes
+        store._ts_dict = timestamps
+        store._account_dict = accounts
+        store._cat_dict = categories
+        store._hash = None
+        store._stamp()
+        return store
+
+    @classmethod
+    def _empty_like(cls, other: "TransactionStore") -> "TransactionStore":
+        store = cls.__new__(cls)
+        store._ids = []
+        store._notes = []
+        store._amounts = array("q")
+        store._ts = array("I")
+        store._account_codes = array("I")
+        store._cat_codes = array("I")
+        store._ts_dict = other._ts_dict
+        store._account_dict = other._account_dict
+        store._cat_dict = other._cat_dict
+        store._hash = None
+        store._stamp()
+        return store
+
+    def _stamp(self) -> None:
+        self._version = self._lineage = next_version()
+
+    def _extend(self, transactions: Iterable[Transaction]) -> None:
+        ids, notes = self._ids, self._notes
+        amounts, ts, accs, cats = self._amounts, self._ts, self._account_codes, self._cat_codes
+        enc_ts, enc_acc, enc_cat = self._ts_dict.encode, self._account_dict.encode, self._cat_dict.encode
+        for t in transactions:
+            ids.append(t.id)
+            notes.append(t.note)
+            amounts.append(t.amount)
+            ts.append(enc_ts(t.ts))
+            accs.append(enc_acc(t.account_id))
+            cats.append(enc_cat(t.cat_id))
+
+    def _take(self, rows: Iterable[int]) -> "TransactionStore":
+        out = TransactionStore._empty_like(self)
+        for i in rows:
+            out._ids.append(self._ids[i])
+            out._notes.append(self._notes[i])
+            out._amounts.append(self._amounts[i])
+            out._ts.append(self._ts[i])
+            out._account_codes.append(self._account_codes[i])
+            out._cat_codes.append(self._cat_codes[i])
+        return out
+
+    # --- column access
+
+    @property
+    def amounts(self) -> Sequence[int]:
+        return self._amounts
+
+    @property
+    def ts_codes(self) -> Sequence[int]:
+        return self._ts
+
+    @property
+    def account_codes(self) -> Sequence[int]:
+        return self._account_codes
+
+    @property
+    def category_codes(self) -> Sequence[int]:
+        return self._cat_codes
+
+    @property
+    def ids(self) -> Sequence:
+        return self._ids
+
+    @property
+    def notes(self) -> Sequence[str]:
+        return self._notes
+
+    @property
+    def timestamps(self) -> Dictionary:
+        return self._ts_dict
+
+    @property
+    def accounts(self) -> Dictionary:
+        return self._account_dict
+
+    @property
+    def categories(self) -> Dictionary:
+        return self._cat_dict
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def lineage(self) -> int:
+        return self._lineage
+
+    @property
+    def fingerprint(self) -> tuple[int, int]:
+        """``(lineage, version)``; stores derived with ``+`` keep the lineage."""
+        return (self._lineage, self._version)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the store, counting shared strings once."""
+        return (
+            sys.getsizeof(self)
+            + sum(sys.getsizeof(col) for col in (
+                self._amounts, self._ts, self._account_codes, self._cat_codes,
+                self._ids, self._notes,
+            ))
+            + _unique_sizeof(self._ids, self._notes)
+            + sum(
+                sys.getsizeof(d.values) + sys.getsizeof(d._codes) + _unique_sizeof(d.values)
+                for d in (self._ts_dict, self._account_dict, self._cat_dict)
+            )
+        )
+
+    # --- hot aggregations
+
+    def select(self, mask: Iterable[bool]) -> "TransactionStore":
+        return self._take(compress(range(len(self)), mask))
+
+    def account_total(self, acc_id: str) -> int:
+        code = self._account_dict.code(acc_id)
+        if code is None:
+            return 0
+        return sum(compress(self._amounts, map(code.__eq__, self._account_codes)))
+
+    def income(self) -> "TransactionStore":
+        return self.select(map((0).__lt__, self._amounts))
+
+    def expenses(self) -> "TransactionStore":
+        return self.select(map((0).__gt__, self._amounts))
+
+    def expense_total(self, cat_ids: Iterable[str]) -> int:
+        codes = {c for c in map(self._cat_dict.code, cat_ids) if c is not None}
+        if not codes:
+            return 0
+        return sum(
+            a for c, a in zip(self._cat_codes, self._amounts) if a < 0 and c in codes
+        )
+
+    # --- tuple protocol
+
+    def _row(self, i: int) -> Transaction:
+        return Transaction(
+            id=self._ids[i],
+            account_id=self._account_dict.values[self._account_codes[i]],
+            cat_id=self._cat_dict.values[self._cat_codes[i]],
+            amount=self._amounts[i],
+            ts=self._ts_dict.values[self._ts[i]],
+            note=self._notes[i],
+        )
+
+    def __len__(self) -> int:
+        return len(self._amounts)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        for i in range(len(self._amounts)):
+            yield self._row(i)
+
+    @overload
+    def __getitem__(self, i: int) -> Transaction: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> "TransactionStore": ...
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return self._take(range(*i.indices(len(self))))
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("TransactionStore index out of range")
+        return self._row(i)
+
+    def __add__(self, other: Iterable[Transaction]) -> "TransactionStore":
+        out = self._take(range(len(self)))
+        out._extend(other)
+        out._lineage = self._lineage
+        return out
+
+    def __radd__(self, other: Iterable[Transaction]) -> "TransactionStore":
+        out = TransactionStore._empty_like(self)
+        out._extend(other)
+        out._extend(self)
+        return out
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if isinstance(other, TransactionStore):
+            if len(self) != len(other):
+                return False
+            if (
+                self._ts_dict is other._ts_dict
+                and self._account_dict is other._account_dict
+                and self._cat_dict is other._cat_dict
+            ):
+                return all(
+                    _same_column(a, b)
+                    for a, b in (
+                        (self._amounts, other._amounts),
+                        (self._account_codes, other._account_codes),
+                        (self._cat_codes, other._cat_codes),
+                        (self._ts, other._ts),
+                        (self._ids, other._ids),
+                        (self._notes, other._notes),
+                    )
+                )
+            return tuple(self) == tuple(other)
+        if isinstance(other, tuple):
+            return len(self) == len(other) and tuple(self) == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            # a Transaction hashes like its field tuple and a tuple hash only
+            # sees element hashes, so this equals hash(tuple(self)) without
+            # building a Transaction per row
+            self._hash = hash(tuple(zip(
+                self._ids,
+                map(self._account_dict.values.__getitem__, self._account_codes),
+                map(self._cat_dict.values.__getitem__, self._cat_codes),
+                self._amounts,
+                map(self._ts_dict.values.__getitem__, self._ts),
+                self._notes,
+            )))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"TransactionStore(<{len(self)} transactions>)"
+
+
+def _same_column(a: Sequence, b: Sequence) -> bool:
+    if isinstance(a, array) and isinstance(b, array):
+        return a == b  # compared in C
+    return len(a) == len(b) and all(map(operator.eq, a, b))
+
+
+def _unique_sizeof(*columns: Iterable[object], seen: Optional[set[int]] = None) -> int:
+    if seen is None:
+        seen = set()
+    total = 0
+    for col in columns:
+        for obj in col:
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def bytes_per_transaction(trans: Iterable[Transaction]) -> float:
+    """Report the average memory footprint of one transaction in ``trans``.
+
+    Objects shared between rows (interned ids, repeated timestamps) are
+    counted once, so the figure reflects what the ledger really costs.
+    """
+    if isinstance(trans, TransactionStore):
+        return trans.nbytes / len(trans) if len(trans) else 0.0
+
+    seen: set[int] = set()
+    total = 0
+    count = 0
+    for t in trans:
+        count += 1
+        total += sys.getsizeof(t)
+        if not hasattr(type(t), "__slots__"):
+            total += sys.getsizeof(vars(t))
+        total += _unique_sizeof(
+            (t.id, t.account_id, t.cat_id, t.amount, t.ts, t.note), seen=seen
+        )
+    return total / count if count else 0.0
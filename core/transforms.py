@@ -1,25 +1,52 @@
-import json
 from functools import reduce
 from typing import Tuple
 from core.domain import Account, Category, Transaction, Budget
+from core.ingest import iter_sections
+from core.snapshot import (
+    open_snapshot,
+    snapshot_is_fresh,
+    snapshot_path_for,
+    source_info,
+    write_snapshot,
+)
+from core.store import TransactionStore
 
 
 def load_seed(
     path: str,
+    use_snapshot: bool = True,
+    save_snapshot: bool = False,
 ) -> Tuple[
     Tuple[Account, ...],
     Tuple[Category, ...],
-    Tuple[Transaction, ...],
+    TransactionStore,
     Tuple[Budget, ...],
 ]:
+    snap_path = snapshot_path_for(path)
+    if use_snapshot and snapshot_is_fresh(snap_path, path):
+        snap = open_snapshot(snap_path)
+        return snap.accounts, snap.categories, snap.transactions, snap.budgets
+
+    source = source_info(path)
+    data = {}
     with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+        for key, value in iter_sections(f, streamed=("transactions",)):
+            if key == "transactions":
+                data[key] = TransactionStore(Transaction(**t) for t in value)
+            else:
+                data[key] = value
 
     accounts = tuple(Account(**a) for a in data["accounts"])
     categories = tuple(Category(**c) for c in data["categories"])
-    transactions = tuple(Transaction(**t) for t in data["transactions"])
+    transactions = data["transactions"]
     budgets = tuple(Budget(**b) for b in data["budgets"])
 
+    if save_snapshot:
+        try:
+            write_snapshot(snap_path, accounts, categories, transactions, budgets, source=source)
+        except OSError:
+            pass
+
     return accounts, categories, transactions, budgets
 
 
@@ -44,18 +71,26 @@ def update_budget(
 
 
 def account_balance(trans: Tuple[Transaction, ...], acc_id: str) -> int:
+    if isinstance(trans, TransactionStore):
+        return trans.account_total(acc_id)
     return reduce(
         lambda acc, t: acc + t.amount if t.account_id == acc_id else acc, trans, 0
     )
 
 
 def income_transactions(trans: Tuple[Transaction, ...]) -> Tuple[Transaction, ...]:
+    if isinstance(trans, TransactionStore):
+        return trans.income()
     return tuple(filter(lambda t: t.amount > 0, trans))
 
 
 def expense_transactions(trans: Tuple[Transaction, ...]) -> Tuple[Transaction, ...]:
+    if isinstance(trans, TransactionStore):
+        return trans.expenses()
     return tuple(filter(lambda t: t.amount < 0, trans))
 
 
 def transaction_amounts(trans: Tuple[Transaction, ...]) -> Tuple[int, ...]:
+    if isinstance(trans, TransactionStore):
+        return tuple(trans.amounts)
     return tuple(map(lambda t: t.amount, trans))
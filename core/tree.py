@@ -0,0 +1,169 @@
+from typing import Iterable, Mapping, Optional
+
+from core.domain import Category, Transaction
+from core.store import TransactionStore
+
+
+class CategoryCycleError(ValueError):
+    pass
+
+
+def _leaf_expenses(
+    trans: Iterable[Transaction],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    account_id: Optional[str] = None,
+) -> dict[str, int]:
+    """Expense totals per directly assigned ``cat_id`` in one pass."""
+    totals: dict[str, int] = {}
+    if isinstance(trans, TransactionStore):
+        ts_ok = None
+        if start is not None or end is not None:
+            ts_ok = {
+                code for code, ts in enumerate(trans.timestamps.values)
+                if (start is None or start <= ts) and (end is None or ts <= end)
+            }
+        acc_code = None
+        if account_id is not None:
+            acc_code = trans.accounts.code(account_id)
+            if acc_code is None:
+                return totals
+        by_code: dict[int, int] = {}
+        rows = zip(trans.category_codes, trans.amounts, trans.ts_codes, trans.account_codes)
+        for cat, amount, ts, acc in rows:
+            if amount < 0 and (ts_ok is None or ts in ts_ok) and (acc_code is None or acc == acc_code):
+                by_code[cat] = by_code.get(cat, 0) + amount
+        for code, total in by_code.items():
+            totals[trans.categories.decode(code)] = total
+        return totals
+
+    for t in trans:
+        if t.amount >= 0:
+            continue
+        if start is not None and t.ts < start or end is not None and t.ts > end:
+            continue
+        if account_id is not None and t.account_id != account_id:
+            continue
+        totals[t.cat_id] = totals.get(t.cat_id, 0) + t.amount
+    return totals
+
+
+class CategoryTree:
+    """Category hierarchy indexed once for constant-time subtree queries.
+
+    Builds the children adjacency, depth, ancestor path and an Euler tour
+    (preorder ``enter``/``exit`` positions) of every category. ``x`` is in
+    the subtree of ``a`` exactly when ``enter[a] <= enter[x] <= exit[a]``,
+    and a subtree is the contiguous slice ``order[enter[a]:exit[a] + 1]``.
+    Categories whose parent is missing are treated as roots, but stay listed
+    in ``children`` under the parent id they declare, so that id still
+    finds them (as the tuple-based recursion helpers do). Cycles are
+    rejected at build time.
+    """
+
+    def __init__(self, cats: Iterable[Category]):
+        self.categories: dict[str, Category] = {}
+        self.children: dict[str, list[str]] = {}
+        self.roots: list[str] = []
+        for c in cats:
+            self.categories[c.id] = c
+            self.children.setdefault(c.id, [])
+        for c in self.categories.values():
+            if c.parent_id is not None and c.parent_id in self.categories:
+                self.children[c.parent_id].append(c.id)
+            else:
+                self.roots.append(c.id)
+                if c.parent_id is not None:
+                    self.children.setdefault(c.parent_id, []).append(c.id)
+
+        self.order: list[str] = []
+        self.enter: dict[str, int] = {}
+        self.exit: dict[str, int] = {}
+        self.depth: dict[str, int] = {}
+        self._path: dict[str, tuple[str, ...]] = {}
+        for root in self.roots:
+            self._tour(root)
+
+        if len(self.order) != len(self.categories):
+            stuck = sorted(set(self.categories) - set(self.enter))
+            raise CategoryCycleError(f"Category cycle involving {', '.join(stuck)}")
+
+    def _tour(self, root: str) -> None:
+        self.depth[root] = 0
+        self._path[root] = ()
+        stack = [(root, False)]
+        while stack:
+            cid, done = stack.pop()
+            if done:
+                self.exit[cid] = len(self.order) - 1
+                continue
+            self.enter[cid] = len(self.order)
+            self.order.append(cid)
+            stack.append((cid, True))
+            path = self._path[cid] + (cid,)
+            for child in reversed(self.children[cid]):
+                self.depth[child] = self.depth[cid] + 1
+                self._path[child] = path
+                stack.append((child, False))
+
+    def __contains__(self, cat_id: object) -> bool:
+        return cat_id in self.categories
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def parent(self, cat_id: str) -> Optional[str]:
+        path = self._path[cat_id]
+        return path[-1] if path else None
+
+    def ancestors(self, cat_id: str) -> tuple[str, ...]:
+        """Ids from the root down to the parent of ``cat_id``."""
+        return self._path[cat_id]
+
+    def in_subtree(self, cat_id: str, root_id: str) -> bool:
+        if cat_id not in self.enter or root_id not in self.enter:
+            return False
+        return self.enter[root_id] <= self.enter[cat_id] <= self.exit[root_id]
+
+    def is_descendant(self, cat_id: str, ancestor_id: str) -> bool:
+        return cat_id != ancestor_id and self.in_subtree(cat_id, ancestor_id)
+
+    def subtree_ids(self, root_id: str) -> list[str]:
+        """``root_id`` followed by all of its descendants in preorder."""
+        if root_id not in self.enter:
+            ids = [root_id]
+            for orphan in self.children.get(root_id, ()):
+                ids += self.order[self.enter[orphan]:self.exit[orphan] + 1]
+            return ids
+        return self.order[self.enter[root_id]:self.exit[root_id] + 1]
+
+    def descendants(self, root_id: str) -> list[Category]:
+        return [self.categories[c] for c in self.subtree_ids(root_id)[1:]]
+
+    def expense_rollup(
+        self,
+        trans: Iterable[Transaction],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        account_id: Optional[str] = None,
+    ) -> dict[str, int]:
+        """``{cat_id: subtree expense total}`` for every category at once.
+
+        One pass over ``trans`` collects direct totals, then reverse preorder
+        adds each category into its parent, so every entry equals
+        ``sum_expenses_recursive`` for that id. ``start``/``end`` are
+        inclusive ``ts`` bounds as in ``by_date_range``. Transactions whose
+        category is not in the tree are reported under their own id.
+        """
+        return self.rollup(_leaf_expenses(trans, start, end, account_id))
+
+    def rollup(self, direct: Mapping[str, int]) -> dict[str, int]:
+        """Fold per-category ``direct`` totals into subtree totals."""
+        totals = dict.fromkeys(self.order, 0)
+        for cat_id, amount in direct.items():
+            totals[cat_id] = totals.get(cat_id, 0) + amount
+        for cat_id in reversed(self.order):
+            path = self._path[cat_id]
+            if path:
+                totals[path[-1]] += totals[cat_id]
+        return totals
@@ -0,0 +1,61 @@
+import pickle
+from uuid import uuid4
+
+from core.domain import Account, Budget, Category, Transaction, compact_id, compact_transaction
+from core.store import TransactionStore, bytes_per_transaction
+
+
+def fresh(s: str) -> str:
+    # simulate a string coming out of a parser rather than a literal
+    return (s + ".")[:-1]
+
+
+def test_models_are_slotted_but_keep_dict_access():
+    t = Transaction("t1", "a1", "c1", -100, "2025-01-01", "lunch")
+    assert not hasattr(t, "__weakref__")
+    assert t.__dict__ == {
+        "id": "t1", "account_id": "a1", "cat_id": "c1",
+        "amount": -100, "ts": "2025-01-01", "note": "lunch",
+    }
+    assert vars(t) == t.__dict__
+
+
+def test_equality_hash_and_pickle():
+    t1 = Transaction("t1", "a1", "c1", -100, "2025-01-01")
+    t2 = Transaction("t1", fresh("a1"), fresh("c1"), -100, fresh("2025-01-01"))
+    assert t1 == t2
+    assert hash(t1) == hash(t2)
+    assert pickle.loads(pickle.dumps(t1)) == t1
+    assert pickle.loads(pickle.dumps(Budget("b1", "c1", 100, "month"))).limit == 100
+
+
+def test_ids_are_interned():
+    t1 = Transaction("t1", fresh("acc-shared"), fresh("cat-shared"), -1, "2025-01-01")
+    t2 = Transaction("t2", fresh("acc-shared"), fresh("cat-shared"), -1, "2025-01-01")
+    assert t1.account_id is t2.account_id
+    assert t1.cat_id is t2.cat_id
+    c1 = Category(fresh("cat-x"), "X", fresh("cat-root"), "expense")
+    c2 = Category(fresh("cat-y"), "Y", fresh("cat-root"), "expense")
+    assert c1.parent_id is c2.parent_id
+    assert Account(fresh("acc-z"), "Z", 0, "KZT").id is Account(fresh("acc-z"), "Z", 0, "KZT").id
+
+
+def test_compact_transaction_ids():
+    tx_id = str(uuid4())
+    t = compact_transaction(Transaction(tx_id, "a1", "c1", -1, "2025-01-01"))
+    assert isinstance(t.id, int)
+    assert t.id.bit_length() <= 128
+    assert compact_id("t1") == "t1"
+    plain = Transaction("t1", "a1", "c1", -1, "2025-01-01")
+    assert compact_transaction(plain) is plain
+
+
+def test_bytes_per_transaction_reported():
+    trans = [
+        compact_transaction(Transaction(str(uuid4()), fresh("acc1"), fresh("cat1"), -i, fresh("2025-01-01")))
+        for i in range(1000)
+    ]
+    per_tx = bytes_per_transaction(trans)
+    assert 0 < per_tx < 200
+    assert bytes_per_transaction(TransactionStore(trans)) < per_tx
+    assert bytes_per_transaction([]) == 0.0
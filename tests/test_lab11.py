@@ -0,0 +1,96 @@
+import io
+import json
+import tracemalloc
+from itertools import islice
+
+from core.domain import Transaction
+from core.ingest import iter_batches, iter_sections, load_store, stream_transactions
+from core.store import TransactionStore
+from core.transforms import load_seed
+
+
+def tx_dict(i):
+    return {"id": f"t{i}", "account_id": "acc1", "cat_id": "cat2", "amount": -(i + 1), "ts": "2025-01-02", "note": "x"}
+
+
+def write_seed(path, n):
+    doc = {
+        "accounts": [{"id": "acc1", "name": "Kaspi", "balance": 0, "currency": "KZT"}],
+        "transactions": [tx_dict(i) for i in range(n)],
+        "budgets": [],
+    }
+    path.write_text(json.dumps(doc, indent=1), encoding="utf-8")
+
+
+def test_iter_sections_small_chunks():
+    text = json.dumps({"a": [1, 22, 333], "big": 1234567890, "nested": {"k": [1, {"x": "}"}]}, "s": []})
+    sections = {}
+    for key, value in iter_sections(io.StringIO(text), streamed=("a", "s"), chunk_size=3):
+        sections[key] = list(value) if key in ("a", "s") else value
+    assert sections == json.loads(text)
+
+
+def test_numbers_split_at_any_chunk_boundary():
+    text = '{"n": [1, 2.5e3, -0.125, 7E-2, 10, 3.0e+1], "x": -12.5}'
+    for chunk_size in range(1, 9):
+        sections = {}
+        for key, value in iter_sections(io.StringIO(text), streamed=("n",), chunk_size=chunk_size):
+            sections[key] = list(value) if key == "n" else value
+        assert sections == json.loads(text), chunk_size
+
+
+def test_iter_sections_skips_unconsumed_stream():
+    text = json.dumps({"transactions": [tx_dict(i) for i in range(5)], "tail": "ok"})
+    keys = []
+    for key, value in iter_sections(io.StringIO(text), streamed=("transactions",), chunk_size=7):
+        keys.append(key)
+        if key == "transactions":
+            next(value)
+        else:
+            assert value == "ok"
+    assert keys == ["transactions", "tail"]
+
+
+def test_stream_transactions_json(tmp_path):
+    path = tmp_path / "seed.json"
+    write_seed(path, 50)
+    trans = list(stream_transactions(str(path), chunk_size=16))
+    assert len(trans) == 50
+    assert trans[0] == Transaction(**tx_dict(0))
+    assert trans[-1].amount == -50
+
+
+def test_stream_transactions_ndjson(tmp_path):
+    path = tmp_path / "ledger.ndjson"
+    path.write_text("\n".join(json.dumps(tx_dict(i)) for i in range(10)) + "\n\n", encoding="utf-8")
+    trans = list(stream_transactions(str(path)))
+    assert [t.id for t in trans] == [f"t{i}" for i in range(10)]
+
+
+def test_batches_and_store(tmp_path):
+    path = tmp_path / "seed.json"
+    write_seed(path, 25)
+    assert [len(b) for b in iter_batches(str(path), batch_size=10)] == [10, 10, 5]
+    store = load_store(str(path), batch_size=10)
+    assert isinstance(store, TransactionStore)
+    assert store == tuple(stream_transactions(str(path)))
+
+
+def test_first_row_does_not_read_whole_file(tmp_path):
+    path = tmp_path / "big.json"
+    write_seed(path, 20000)
+    tracemalloc.start()
+    first = list(islice(stream_transactions(str(path)), 1))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert first[0].id == "t0"
+    assert peak < path.stat().st_size // 4
+
+
+def test_load_seed_matches_json_load():
+    accounts, categories, transactions, budgets = load_seed("data/seed.json")
+    with open("data/seed.json", encoding="utf-8") as f:
+        data = json.load(f)
+    assert tuple(transactions) == tuple(Transaction(**t) for t in data["transactions"])
+    assert [a.id for a in accounts] == [a["id"] for a in data["accounts"]]
+    assert len(budgets) == len(data["budgets"])
@@ -0,0 +1,108 @@
+import os
+import shutil
+
+import pytest
+
+from core.domain import Transaction
+from core.snapshot import (
+    SnapshotError,
+    open_snapshot,
+    snapshot_is_fresh,
+    snapshot_path_for,
+    source_info,
+    write_snapshot,
+)
+from core.store import TransactionStore
+from core.transforms import account_balance, load_seed
+
+
+@pytest.fixture
+def seed_copy(tmp_path):
+    path = tmp_path / "seed.json"
+    shutil.copy("data/seed.json", path)
+    return str(path)
+
+
+def test_snapshot_round_trip(tmp_path):
+    accounts, categories, transactions, budgets = load_seed("data/seed.json", use_snapshot=False)
+    path = str(tmp_path / "ledger.snap")
+    write_snapshot(path, accounts, categories, transactions, budgets, meta={"generation": 3})
+
+    snap = open_snapshot(path, verify=True)
+    assert snap.accounts == accounts
+    assert snap.categories == categories
+    assert snap.budgets == budgets
+    assert snap.transactions == transactions
+    assert snap.meta == {"generation": 3}
+    assert isinstance(snap.transactions.amounts, memoryview)
+    assert account_balance(snap.transactions, "acc1") == account_balance(transactions, "acc1")
+
+
+def test_snapshot_keeps_int_ids_and_empty_ledger(tmp_path):
+    path = str(tmp_path / "ledger.snap")
+    trans = (
+        Transaction(2**127 + 5, "a1", "c1", -1, "2025-01-01", "ünïcode"),
+        Transaction("t2", "a1", "c1", -2, "2025-01-02"),
+    )
+    write_snapshot(path, (), (), trans, ())
+    assert tuple(open_snapshot(path).transactions) == trans
+
+    write_snapshot(path, (), (), (), ())
+    assert len(open_snapshot(path).transactions) == 0
+
+
+def test_stores_sharing_dictionaries_compare_by_columns():
+    store = TransactionStore(
+        Transaction(str(i), f"a{i % 2}", "c1", i - 2, f"2025-01-0{i + 1}") for i in range(4)
+    )
+    first = store.select([True, True, False, True])
+    assert first == store.select([True, True, False, True])
+    assert first != store.select([True, False, True, True])
+    assert first == tuple(first)
+
+
+def test_snapshot_rejects_corruption(tmp_path):
+    path = str(tmp_path / "ledger.snap")
+    write_snapshot(path, (), (), (Transaction("t1", "a1", "c1", -1, "2025-01-01"),), ())
+
+    data = bytearray(open(path, "rb").read())
+    data[-1] ^= 0xFF
+    open(path, "wb").write(bytes(data))
+    open_snapshot(path)
+    with pytest.raises(SnapshotError):
+        open_snapshot(path, verify=True)
+
+    data[:8] = b"NOTASNAP"
+    open(path, "wb").write(bytes(data))
+    with pytest.raises(SnapshotError):
+        open_snapshot(path)
+
+
+def test_load_seed_prefers_fresh_snapshot(seed_copy):
+    snap_path = snapshot_path_for(seed_copy)
+    _, _, from_json, _ = load_seed(seed_copy, save_snapshot=True)
+    assert os.path.exists(snap_path)
+    assert snapshot_is_fresh(snap_path, seed_copy)
+
+    _, _, from_snap, _ = load_seed(seed_copy)
+    assert isinstance(from_snap.amounts, memoryview)
+    assert from_snap == from_json
+
+
+def test_load_seed_ignores_stale_snapshot(seed_copy):
+    snap_path = snapshot_path_for(seed_copy)
+    load_seed(seed_copy, save_snapshot=True)
+
+    with open(seed_copy, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert not snapshot_is_fresh(snap_path, seed_copy)
+
+    _, _, transactions, _ = load_seed(seed_copy)
+    assert isinstance(transactions, TransactionStore)
+    assert not isinstance(transactions.amounts, memoryview)
+
+
+def test_source_info_records_size_and_mtime(seed_copy):
+    info = source_info(seed_copy)
+    assert info["size"] == os.path.getsize(seed_copy)
+    assert info["mtime_ns"] == os.stat(seed_copy).st_mtime_ns
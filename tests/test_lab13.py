@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from core.domain import Budget, Transaction
+from core.functional import check_budget
+from core.recursion import by_category, by_date_range, forecast_expenses
+from core.sqlite_ledger import SqliteLedger, close_all
+from core.transforms import account_balance, load_seed
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    _, _, transactions, _ = load_seed("data/seed.json", use_snapshot=False)
+    db = SqliteLedger(str(tmp_path / "ledger.db"))
+    db.add_transactions(transactions)
+    yield db, tuple(transactions)
+    close_all()
+
+
+def test_ledger_round_trip(ledger):
+    db, trans = ledger
+    assert len(db) == len(trans)
+    assert tuple(db) == trans
+
+
+def test_ledger_queries_match_python(ledger):
+    db, trans = ledger
+    for acc_id in ("acc1", "acc2", "acc3", "missing"):
+        assert db.account_balance(acc_id) == account_balance(trans, acc_id)
+    assert set(db.by_date_range("2025-01-05", "2025-02-10")) == set(filter(by_date_range("2025-01-05", "2025-02-10"), trans))
+    assert set(db.by_category("cat2")) == set(filter(by_category("cat2"), trans))
+    for period in (1, 3, 12):
+        assert db.forecast_expenses("cat2", period) == forecast_expenses("cat2", trans, period)
+    assert db.forecast_expenses("nope", 3) == 0
+
+
+def test_ledger_check_budget_matches_functional(ledger):
+    db, trans = ledger
+    for limit in (1, 10**9):
+        b = Budget("b1", "cat2", limit, "month")
+        assert db.check_budget(b) == check_budget(b, trans)
+
+
+def test_ledger_writes_are_durable(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    t = Transaction(2**127 + 1, "acc1", "cat1", -10, "2025-03-01", "kept")
+    SqliteLedger(path).add_transaction(t)
+    close_all()
+
+    assert tuple(SqliteLedger(path)) == (t,)
+    close_all()
+
+
+def test_ledger_uses_wal_shared_connection_and_indexes(tmp_path):
+    path = str(tmp_path / "ledger.db")
+    a, b = SqliteLedger(path), SqliteLedger(path)
+    assert a._conn is b._conn
+    assert a._query("PRAGMA journal_mode")[0][0] == "wal"
+    plan = a._query("EXPLAIN QUERY PLAN SELECT SUM(amount) FROM transactions WHERE account_id = 'x'")
+    assert "COVERING INDEX ix_tx_account_ts" in plan[0][-1]
+    close_all()
+
+
+def test_failed_batch_is_rolled_back(tmp_path):
+    db = SqliteLedger(str(tmp_path / "ledger.db"))
+    t = Transaction("dup", "acc1", "cat1", -1, "2025-01-01")
+    with pytest.raises(sqlite3.IntegrityError):
+        db.add_transactions([t, t])
+    assert len(db) == 0
+    close_all()
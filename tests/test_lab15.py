@@ -0,0 +1,75 @@
+import pickle
+from functools import lru_cache
+
+from core.domain import Transaction
+from core.pvector import PVector
+from core.transforms import account_balance, add_transaction
+
+
+def make_tx(i):
+    return Transaction(f"t{i}", "a1" if i % 2 else "a2", "c1", -i, "2025-01-01", "")
+
+
+def test_pvector_matches_tuple_across_levels():
+    for n in (0, 1, 31, 32, 33, 1024, 1056, 1057, 40000):
+        items = tuple(range(n))
+        bulk = PVector(items)
+        appended = PVector()
+        for i in items:
+            appended = appended.append(i)
+        assert bulk == appended == items
+        assert tuple(appended) == items
+        assert all(bulk[i] == i for i in range(0, n, 97))
+        if n:
+            assert bulk[-1] == n - 1
+
+
+def test_pvector_old_versions_stay_valid():
+    base = PVector(range(100))
+    left = base.append("left")
+    right = base.append("right")
+    assert len(base) == 100
+    assert left[-1] == "left"
+    assert right[-1] == "right"
+    assert left[:100] == base
+
+
+def test_pvector_tuple_protocol():
+    v = PVector((1, 2, 3))
+    assert v + (4,) == (1, 2, 3, 4)
+    assert (0,) + v == (0, 1, 2, 3)
+    assert v[::2] == (1, 3)
+    assert 2 in v and 5 not in v
+    assert v.index(3) == 2
+    assert v.count(1) == 1
+    assert list(reversed(v)) == [3, 2, 1]
+    assert v != (1, 2)
+    assert pickle.loads(pickle.dumps(v)) == v
+
+
+def test_pvector_hash_is_incremental_and_tuple_compatible():
+    v = PVector()
+    for i in range(300):
+        v = v.append(make_tx(i))
+        assert hash(v) == hash(tuple(v))
+    bulk = PVector(tuple(v))
+    assert hash(bulk) == hash(v)
+    assert hash(bulk.append(make_tx(300))) == hash(v.append(make_tx(300)))
+    assert v != v.append(make_tx(0))
+
+
+def test_pvector_with_core_functions():
+    calls = []
+
+    @lru_cache
+    def total(trans):
+        calls.append(1)
+        return sum(t.amount for t in trans)
+
+    trans = PVector(make_tx(i) for i in range(50))
+    extended = add_transaction(trans, make_tx(50))
+    assert isinstance(extended, PVector)
+    assert len(extended) == 51 and len(trans) == 50
+    assert account_balance(extended, "a2") == account_balance(tuple(extended), "a2")
+    assert total(extended) == total(extended) == total(tuple(extended))
+    assert len(calls) == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from core.domain import Transaction
+from core.indexes import BalanceIndex
+from core.store import TransactionStore
+from core.transforms import account_balance, load_seed
+
+
+@pytest.fixture
+def seed_transactions():
+    _, _, transactions, _ = load_seed("data/seed.json", use_snapshot=False)
+    return transactions
+
+
+def test_balance_index_matches_account_balance(seed_transactions):
+    as_tuple = tuple(seed_transactions)
+    for source in (seed_transactions, as_tuple):
+        index = BalanceIndex.from_ledger(source, ("acc1", "acc2", "acc3", "acc9"))
+        for acc_id in ("acc1", "acc2", "acc3", "acc9"):
+            assert index.balance(acc_id) == account_balance(as_tuple, acc_id)
+        assert index.total() == sum(t.amount for t in as_tuple)
+    assert isinstance(seed_transactions, TransactionStore)
+
+
+def test_balance_index_apply_and_revert():
+    index = BalanceIndex(["a1"])
+    t1 = Transaction("t1", "a1", "c1", -300, "2025-01-01")
+    t2 = Transaction("t2", "a2", "c1", 500, "2025-01-01")
+
+    index.apply(t1)
+    index.apply(t2)
+    assert index.balance("a1") == -300
+    assert index.balance("a2") == 500
+    assert index.version == 2
+
+    index.revert(t1)
+    assert index.balance("a1") == 0
+    assert index.balance("missing") == 0
+
+
+def test_balance_index_snapshot_is_stable():
+    index = BalanceIndex(["a1"])
+    snap = index.snapshot()
+    index.apply(Transaction("t1", "a1", "c1", 100, "2025-01-01"))
+
+    assert snap == {"a1": 0}
+    assert index.snapshot() == {"a1": 100}
+    with pytest.raises(TypeError):
+        snap["a1"] = 5
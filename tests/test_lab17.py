@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from core.domain import Transaction
+from core.indexes import TimeIndex
+from core.recursion import by_date_range
+
+
+def make_random(n, seed=7):
+    rng = random.Random(seed)
+    return [
+        Transaction(f"t{i}", "a1", "c1", -i, f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        for i in range(n)
+    ]
+
+
+def test_between_matches_by_date_range():
+    trans = make_random(500)
+    index = TimeIndex(trans)
+    for start, end in [("2024-01-01", "2024-12-31"), ("2024-03-15", "2024-05-02"), ("2024-06-10", "2024-06-10"), ("2025-01-01", "2025-02-01"), ("2024-07", "2024-08")]:
+        expected = sorted(filter(by_date_range(start, end), trans), key=lambda t: t.ts)
+        assert list(index.between(start, end)) == expected
+
+
+def test_month_lookup_and_order():
+    trans = make_random(300)
+    index = TimeIndex(trans)
+    for month in index.months():
+        rows = index.month(month)
+        assert rows == tuple(sorted((t for t in trans if t.ts.startswith(month)), key=lambda t: t.ts))
+    assert index.month("1999-01") == ()
+    assert [t.ts for t in index] == sorted(t.ts for t in trans)
+    assert len(index) == 300
+
+
+def test_out_of_order_inserts_are_merged():
+    trans = make_random(200)
+    one_by_one = TimeIndex()
+    for t in trans:
+        one_by_one.add(t)
+    batched = TimeIndex(trans[:100])
+    batched.extend(trans[100:])
+    assert list(one_by_one) == list(batched) == list(TimeIndex(trans))
+
+
+def test_equal_timestamps_keep_insertion_order():
+    a = Transaction("a", "a1", "c1", -1, "2024-01-05")
+    b = Transaction("b", "a1", "c1", -2, "2024-01-05")
+    c = Transaction("c", "a1", "c1", -3, "2024-01-01")
+    index = TimeIndex([a])
+    index.add(c)
+    index.add(b)
+    assert [t.id for t in index.month("2024-01")] == ["c", "a", "b"]
+
+
+def test_remove():
+    trans = make_random(50)
+    index = TimeIndex(trans)
+    index.remove(trans[10])
+    assert len(index) == 49
+    assert trans[10] not in list(index)
+    with pytest.raises(ValueError):
+        index.remove(trans[10])
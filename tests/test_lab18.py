@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from core.domain import Category, Transaction
+from core.recursion import flatten_categories, sum_expenses_recursive
+from core.transforms import load_seed
+from core.tree import CategoryCycleError, CategoryTree
+
+
+def make_cats():
+    return (
+        Category("c1", "Food", None, "expense"),
+        Category("c2", "Groceries", "c1", "expense"),
+        Category("c3", "Fruits", "c2", "expense"),
+        Category("c4", "Restaurants", "c1", "expense"),
+        Category("c5", "Transport", None, "expense"),
+        Category("c6", "Orphan", "missing", "expense"),
+    )
+
+
+def test_tree_structure():
+    tree = CategoryTree(make_cats())
+    assert tree.children["c1"] == ["c2", "c4"]
+    assert tree.roots == ["c1", "c5", "c6"]
+    assert tree.depth["c3"] == 2
+    assert tree.ancestors("c3") == ("c1", "c2")
+    assert tree.ancestors("c1") == ()
+    assert tree.parent("c3") == "c2"
+
+
+def test_subtree_intervals():
+    tree = CategoryTree(make_cats())
+    assert tree.subtree_ids("c1") == ["c1", "c2", "c3", "c4"]
+    assert [c.id for c in tree.descendants("c1")] == ["c2", "c3", "c4"]
+    assert tree.in_subtree("c3", "c1")
+    assert tree.in_subtree("c1", "c1")
+    assert not tree.is_descendant("c1", "c1")
+    assert tree.is_descendant("c3", "c2")
+    assert not tree.is_descendant("c4", "c2")
+    assert not tree.in_subtree("c5", "c1")
+    assert tree.subtree_ids("unknown") == ["unknown"]
+
+
+def test_cycles_rejected_at_build():
+    cats = (
+        Category("a", "A", "b", "expense"),
+        Category("b", "B", "a", "expense"),
+        Category("r", "Root", None, "expense"),
+    )
+    with pytest.raises(CategoryCycleError):
+        CategoryTree(cats)
+    with pytest.raises(CategoryCycleError):
+        CategoryTree((Category("s", "Self", "s", "expense"),))
+
+
+def test_recursion_functions_accept_tree():
+    cats = make_cats()
+    tree = CategoryTree(cats)
+    trans = tuple(
+        Transaction(f"t{i}", "a1", random.Random(i).choice(["c1", "c2", "c3", "c4", "c5", "c6"]), -i, "2025-01-01")
+        for i in range(60)
+    )
+    for cat_id in [c.id for c in cats] + ["missing", "nowhere"]:
+        assert flatten_categories(tree, cat_id) == flatten_categories(cats, cat_id)
+        assert sum_expenses_recursive(tree, trans, cat_id) == sum_expenses_recursive(cats, trans, cat_id)
+    assert [c.id for c in flatten_categories(tree, "missing")] == ["c6"]
+
+
+def test_flatten_tree_visits_only_the_subtree():
+    tree = CategoryTree(make_cats())
+    seen = []
+
+    class Children(dict):
+        def get(self, key, default=None):
+            seen.append(key)
+            return super().get(key, default)
+
+    tree.children = Children(tree.children)
+    assert [c.id for c in flatten_categories(tree, "c2")] == ["c3"]
+    assert seen == ["c2", "c3"]
+
+
+def test_seed_tree_matches_recursion():
+    _, categories, transactions, _ = load_seed("data/seed.json", use_snapshot=False)
+    tree = CategoryTree(categories)
+    for c in categories:
+        assert set(flatten_categories(categories, c.id)) == set(tree.descendants(c.id))
+        assert sum_expenses_recursive(tree, transactions, c.id) == sum_expenses_recursive(categories, tuple(transactions), c.id)
+
+
+def test_deep_chain_is_linear():
+    n = 3000
+    cats = tuple(Category(f"c{i}", str(i), f"c{i - 1}" if i else None, "expense") for i in range(n))
+    tree = CategoryTree(cats)
+    assert tree.depth[f"c{n - 1}"] == n - 1
+    assert len(tree.subtree_ids("c0")) == n
@@ -0,0 +1,63 @@
+import random
+
+from core.domain import Category, Transaction
+from core.recursion import by_date_range, sum_expenses_recursive
+from core.store import TransactionStore
+from core.transforms import load_seed
+from core.tree import CategoryTree
+
+
+def make_cats():
+    return (
+        Category("c1", "Food", None, "expense"),
+        Category("c2", "Groceries", "c1", "expense"),
+        Category("c3", "Fruits", "c2", "expense"),
+        Category("c4", "Restaurants", "c1", "expense"),
+        Category("c5", "Transport", None, "expense"),
+    )
+
+
+def make_trans(n=300):
+    rnd = random.Random(7)
+    return tuple(
+        Transaction(
+            f"t{i}",
+            rnd.choice(["a1", "a2"]),
+            rnd.choice(["c1", "c2", "c3", "c4", "c5", "ghost"]),
+            rnd.randint(-500, 300),
+            f"2025-{rnd.randint(1, 6):02d}-{rnd.randint(1, 28):02d}",
+        )
+        for i in range(n)
+    )
+
+
+def test_rollup_matches_recursive_sum():
+    cats, trans = make_cats(), make_trans()
+    tree = CategoryTree(cats)
+    rollup = tree.expense_rollup(trans)
+    for c in cats:
+        assert rollup[c.id] == sum_expenses_recursive(cats, trans, c.id)
+    assert rollup["ghost"] == sum_expenses_recursive(cats, trans, "ghost")
+    assert rollup["c1"] == rollup["c2"] + rollup["c4"] + sum(t.amount for t in trans if t.cat_id == "c1" and t.amount < 0)
+
+
+def test_rollup_filters_and_store_path_agree():
+    cats, trans = make_cats(), make_trans()
+    tree = CategoryTree(cats)
+    store = TransactionStore(trans)
+    in_range = tuple(filter(by_date_range("2025-02-10", "2025-04-30"), trans))
+    acc = tuple(t for t in in_range if t.account_id == "a2")
+
+    expected = {c.id: sum_expenses_recursive(cats, acc, c.id) for c in cats}
+    for source in (trans, store):
+        got = tree.expense_rollup(source, "2025-02-10", "2025-04-30", "a2")
+        assert {c.id: got[c.id] for c in cats} == expected
+    assert tree.expense_rollup(store) == tree.expense_rollup(trans)
+    assert set(tree.expense_rollup(store, account_id="nope").values()) == {0}
+
+
+def test_rollup_on_seed():
+    _, categories, transactions, _ = load_seed("data/seed.json", use_snapshot=False)
+    rollup = CategoryTree(categories).expense_rollup(transactions)
+    for c in categories:
+        assert rollup[c.id] == sum_expenses_recursive(categories, transactions, c.id)
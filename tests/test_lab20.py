@@ -0,0 +1,64 @@
+import random
+
+from core.domain import Account, Category, Transaction
+from core.functional import (
+    ACCOUNT_NOT_FOUND, CATEGORY_NOT_FOUND, EXPENSE_POSITIVE, INCOME_NEGATIVE,
+    validate_transaction, validate_transactions,
+)
+from core.store import TransactionStore
+
+
+ACCOUNTS = (Account("a1", "Cash", 0, "KZT"), Account("a2", "Card", 0, "KZT"))
+CATEGORIES = (
+    Category("c1", "Food", None, "expense"),
+    Category("c2", "Salary", None, "income"),
+    Category("c3", "Misc", None, "other"),
+)
+
+
+def make_trans(n=500):
+    rnd = random.Random(3)
+    return tuple(
+        Transaction(
+            f"t{i}",
+            rnd.choice(["a1", "a2", "ax"]),
+            rnd.choice(["c1", "c2", "c3", "cx"]),
+            rnd.randint(-100, 100),
+            "2025-01-01",
+        )
+        for i in range(n)
+    )
+
+
+def test_batch_matches_single_item_validation():
+    trans = make_trans()
+    for source in (trans, TransactionStore(trans)):
+        report = validate_transactions(source, ACCOUNTS, CATEGORIES)
+        assert len(report) == len(trans)
+        for i, t in enumerate(trans):
+            expected = validate_transaction(t, ACCOUNTS, CATEGORIES)
+            assert report.result(i) == expected
+            assert report.valid[i] == expected.is_right()
+
+
+def test_error_rows_and_codes():
+    trans = (
+        Transaction("t0", "a1", "c1", -5, "2025-01-01"),
+        Transaction("t1", "zz", "c1", -5, "2025-01-01"),
+        Transaction("t2", "a1", "zz", -5, "2025-01-01"),
+        Transaction("t3", "a1", "c2", -5, "2025-01-01"),
+        Transaction("t4", "a1", "c1", 5, "2025-01-01"),
+    )
+    report = validate_transactions(iter(trans), ACCOUNTS, CATEGORIES)
+    assert not report.ok
+    assert list(report.error_rows) == [1, 2, 3, 4]
+    assert list(report.error_codes) == [ACCOUNT_NOT_FOUND, CATEGORY_NOT_FOUND, INCOME_NEGATIVE, EXPENSE_POSITIVE]
+    assert report.counts() == {"account_not_found": 1, "category_not_found": 1, "category_type_mismatch": 2}
+    assert [row for row, _ in report.errors()] == [1, 2, 3, 4]
+    assert dict(report.errors())[4].get_error()["message"] == "Expense category Food cannot have positive amount"
+
+
+def test_all_valid():
+    trans = (Transaction("t0", "a2", "c2", 10, "2025-01-01"),)
+    report = validate_transactions(trans, ACCOUNTS, CATEGORIES)
+    assert report.ok and report.valid == bytearray(b"\x01")
@@ -0,0 +1,68 @@
+import pytest
+
+from core.budgets import evaluate_budgets, period_key
+from core.domain import Budget, Transaction
+from core.functional import check_budget
+from core.store import TransactionStore
+from core.transforms import load_seed
+
+
+def tx(i, cat, amount, ts):
+    return Transaction(f"t{i}", "a1", cat, amount, ts)
+
+
+TRANS = (
+    tx(0, "food", -300, "2024-12-30"),
+    tx(1, "food", -500, "2025-01-01"),
+    tx(2, "food", -700, "2025-01-20"),
+    tx(3, "food", 100, "2025-01-21"),
+    tx(4, "fun", -50, "2025-02-03"),
+    tx(5, "food", -200, "2025-02-04"),
+)
+
+
+def test_period_keys():
+    assert period_key("2025-01-20", "monthly") == "2025-01"
+    assert period_key("2025-01-20", "month") == "2025-01"
+    assert period_key("2025-01-20", "yearly") == "2025"
+    # ISO weeks cross year boundaries
+    assert period_key("2024-12-30", "weekly") == "2025-W01"
+    assert period_key("2025-01-01", "weekly") == "2025-W01"
+    with pytest.raises(ValueError):
+        period_key("2025-01-01", "fortnightly")
+
+
+def test_statuses_per_period():
+    budgets = (
+        Budget("b1", "food", 1000, "monthly"),
+        Budget("b2", "food", 900, "weekly"),
+        Budget("b3", "food", 1500, "yearly"),
+        Budget("b4", "fun", 0, "month"),
+    )
+    for source in (TRANS, TransactionStore(TRANS)):
+        res = evaluate_budgets(budgets, source)
+        assert [(s.bucket, s.spent) for s in res["b1"]] == [("2024-12", 300), ("2025-01", 1200), ("2025-02", 200)]
+        jan = res["b1"][1]
+        assert (jan.remaining, jan.overage, jan.percent, jan.exceeded) == (0, 200, 120.0, True)
+        assert [(s.bucket, s.spent) for s in res["b2"]] == [("2025-W01", 800), ("2025-W04", 700), ("2025-W06", 200)]
+        assert [(s.bucket, s.spent, s.overage) for s in res["b3"]] == [("2024", 300, 0), ("2025", 1400, 0)]
+        assert res["b4"][0].percent == float("inf")
+
+
+def test_at_selects_one_period():
+    budgets = (Budget("b1", "food", 1000, "monthly"),)
+    assert evaluate_budgets(budgets, TRANS, at="2025-02-15")["b1"][0].spent == 200
+    empty = evaluate_budgets(budgets, TRANS, at="2025-03-01")["b1"][0]
+    assert (empty.bucket, empty.spent, empty.remaining, empty.percent) == ("2025-03", 0, 1000, 0.0)
+
+
+def test_yearly_matches_check_budget_on_seed():
+    _, _, transactions, budgets = load_seed("data/seed.json", use_snapshot=False)
+    yearly = tuple(Budget(b.id, b.cat_id, b.limit, "yearly") for b in budgets)
+    res = evaluate_budgets(yearly, transactions)
+    for b in yearly:
+        spent = sum(s.spent for s in res[b.id])
+        result = check_budget(b, tuple(transactions))
+        assert result.is_left() == (spent > b.limit)
+        if result.is_left():
+            assert result.get_error()["spent"] == spent
@@ -0,0 +1,90 @@
+import gc
+import weakref
+
+from core import memo
+from core.domain import Transaction
+from core.memo import ledger_cache
+from core.pvector import PVector
+from core.recursion import forecast_expenses
+from core.store import TransactionStore
+
+
+def tx(i, amount=-100, ts="2024-01-01"):
+    return Transaction(str(i), "a1", "food", amount, ts)
+
+
+def test_versions_and_lineage():
+    v1 = PVector([tx(0)])
+    v2 = v1.append(tx(1))
+    v3 = v2 + (tx(2),)
+    assert v1.version < v2.version < v3.version
+    assert v1.lineage == v2.lineage == v3.lineage
+    assert PVector(v3).lineage != v1.lineage
+
+    s1 = TransactionStore([tx(0)])
+    s2 = s1 + [tx(1)]
+    assert s2.lineage == s1.lineage and s2.version > s1.version
+    assert s1[0:1].lineage != s1.lineage
+
+
+def test_hit_does_not_touch_the_ledger():
+    calls = []
+
+    @ledger_cache("trans")
+    def count(trans, cat):
+        calls.append(cat)
+        return len(trans)
+
+    class Ledger(tuple):
+        fingerprint = (1, 1)
+
+        def __hash__(self):
+            raise AssertionError("ledger hashed")
+
+        def __eq__(self, other):
+            raise AssertionError("ledger compared")
+
+    ledger = Ledger((tx(0), tx(1)))
+    assert count(ledger, "food") == 2
+    assert count(ledger, "food") == 2
+    assert count(ledger, cat="food") == 2
+    assert calls == ["food"]
+    assert count.cache_info().hits == 2
+
+
+def test_old_versions_are_dropped_and_collectable():
+    @ledger_cache("trans", versions=1)
+    def total(trans):
+        return sum(t.amount for t in trans)
+
+    v1 = TransactionStore([tx(0)])
+    assert total(v1) == -100
+    ref = weakref.ref(v1)
+    v2 = v1 + [tx(1)]
+    assert total(v2) == -200
+    assert total.cache_info().currsize == 1
+    del v1
+    gc.collect()
+    assert ref() is None
+    # a superseded version is still computed correctly, just not stored
+    assert total(PVector([tx(0)])) == -100
+
+
+def test_bounded_size_and_tuple_fallback():
+    @ledger_cache("trans", maxsize=3)
+    def size(trans):
+        return len(trans)
+
+    for i in range(10):
+        assert size(tuple(tx(j) for j in range(i))) == i
+    assert size.cache_info().currsize == 3
+    assert size([tx(0)]) == 1  # unhashable ledgers are not cached
+
+
+def test_forecasts_follow_new_versions():
+    v = PVector([tx(0, -100, "2024-01-01")])
+    assert forecast_expenses("food", v, 3) == -100
+    v = v.append(tx(1, -300, "2024-02-01"))
+    assert forecast_expenses("food", v, 3) == -200
+    assert memo.forecast_expenses("food", v, 3) == 200
+    assert forecast_expenses("food", tuple(v), 3) == -200
@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+from core.domain import Transaction
+from core.memo import Cache, LatencyHistogram, LFUPolicy, cached, estimate_size, get_cache
+from core.pvector import PVector
+
+
+def sized(cache_bytes, policy="lru", **kw):
+    # every value costs exactly its length in bytes
+    return Cache("t", policy=policy, max_bytes=cache_bytes, sizeof=len, **kw)
+
+
+def test_lru_evicts_least_recently_used():
+    c = sized(30)
+    c.set("a", "x" * 10)
+    c.set("b", "x" * 10)
+    c.set("c", "x" * 10)
+    assert c.get("a")
+    c.set("d", "x" * 10)
+    assert "b" not in c and "a" in c
+    stats = c.stats()
+    assert (stats.evictions, stats.entries, stats.bytes) == (1, 3, 30)
+
+
+def test_lfu_evicts_least_frequently_used():
+    c = sized(30, policy="lfu")
+    for k in "abc":
+        c.set(k, "x" * 10)
+    for _ in range(3):
+        c.get("a")
+    c.get("c")
+    c.set("d", "x" * 10)
+    assert "b" not in c
+    c.set("e", "x" * 10)
+    assert "d" not in c and all(k in c for k in "ace")
+
+
+def test_lfu_policy_bookkeeping():
+    p = LFUPolicy()
+    p.admit("a", 0)
+    p.admit("b", 0)
+    p.touch("a", 0)
+    assert p.victim() == "b"
+    p.forget("b")
+    assert p.victim() == "a"
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    c = sized(100, policy="ttl", ttl=5)
+    c.set("a", "v")
+    now[0] += 4
+    assert c.get("a") == "v"
+    now[0] += 2
+    assert c.get("a") is None
+    assert c.stats().expirations == 1
+    with pytest.raises(ValueError):
+        Cache(policy="ttl")
+
+
+def test_oversized_values_are_not_kept():
+    c = sized(5)
+    c.set("big", "x" * 6)
+    assert "big" not in c and c.stats().bytes == 0
+
+
+def test_tag_invalidation_and_disk_tier(tmp_path):
+    c = sized(1000, disk_dir=str(tmp_path))
+    c.set("r1", "one", tags=["account:acc1"])
+    c.set("r2", "two", tags=["category:cat2"])
+    c.set("r3", "three", tags=["account:acc1", "category:cat2"])
+    assert c.invalidate_tags("account:acc1") == 2
+    assert c.get("r1") is None and c.get("r3") is None
+
+    # a fresh cache over the same directory (e.g. after a restart)
+    c2 = sized(1000, disk_dir=str(tmp_path))
+    assert c2.get("r2") == "two"
+    assert c2.stats().disk_hits == 1
+    assert c2.get("r1") is None
+    c2.invalidate_tags("category:cat2")
+    assert sized(1000, disk_dir=str(tmp_path)).get("r2") is None
+
+
+def test_cached_decorator_keys_ledgers_by_version(tmp_path):
+    cache = Cache("reports", disk_dir=str(tmp_path))
+    calls = []
+
+    @cached(cache, tags=lambda trans, cat: [f"category:{cat}"])
+    def spent(trans, cat):
+        calls.append(cat)
+        return sum(t.amount for t in trans if t.cat_id == cat)
+
+    v = PVector([Transaction("t1", "a1", "food", -5, "2025-01-01")])
+    assert spent(v, "food") == -5
+    assert spent(v, "food") == -5
+    assert calls == ["food"]
+    v2 = v.append(Transaction("t2", "a1", "food", -7, "2025-01-02"))
+    assert spent(v2, "food") == -12
+    assert calls == ["food", "food"]
+    # process-local ledger fingerprints are never written to disk
+    assert not list(tmp_path.glob("*.pkl"))
+
+    hist = cache.latency
+    assert hist.count == 3
+    assert sum(n for _, n in hist.buckets()) == 3
+
+
+def test_histogram_buckets():
+    h = LatencyHistogram((1, 10))
+    for s in (0.0005, 0.002, 0.5):
+        h.observe(s)
+    assert h.buckets() == [("<= 1 ms", 1), ("<= 10 ms", 1), ("> 10 ms", 1)]
+
+
+def test_registry_and_size_estimate():
+    assert get_cache("lab23", max_bytes=10) is get_cache("lab23")
+    assert estimate_size(["x" * 100]) > estimate_size(["x"])
+    shared = "y" * 1000
+    assert estimate_size([shared, shared]) < 2 * estimate_size(shared)
+
+
+def test_size_estimate_walks_slots_of_every_row():
+    import sys
+
+    rows = [Transaction(str(i), "a1", "c1", -i * 1000, "2025-01-01", f"note {i}") for i in range(1000)]
+    per_row = sys.getsizeof(rows[0]) + sys.getsizeof(rows[0].note)
+    assert estimate_size(rows) >= len(rows) * per_row
+
+
+def test_disk_tier_is_bounded_lru(tmp_path):
+    c = Cache("d", max_bytes=10_000, disk_dir=str(tmp_path), disk_max_bytes=1500)
+    for i in range(3):
+        c.set(f"r{i}", "x" * 400)
+    cold = Cache("d", max_bytes=10_000, disk_dir=str(tmp_path), disk_max_bytes=1500)
+    assert cold.get("r0") == "x" * 400  # disk hit refreshes r0
+    cold.set("r3", "x" * 400)  # over the limit: r1 is least recently used
+    assert len(list(tmp_path.glob("*.pkl"))) == 3
+    assert cold.disk.bytes <= 1500
+    fresh = Cache("d", disk_dir=str(tmp_path), disk_max_bytes=1500)
+    assert fresh.get("r1") is None
+    assert fresh.get("r0") == fresh.get("r2") == fresh.get("r3") == "x" * 400
+
+    # shrinking the limit on open trims old files straight away
+    Cache("d", disk_dir=str(tmp_path), disk_max_bytes=500)
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
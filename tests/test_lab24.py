@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+from core.domain import Transaction
+from core.indexes import MonthlyAggregates
+from core.recursion import forecast_expenses
+from core.store import TransactionStore
+from core.transforms import load_seed
+
+
+def make_trans(n=400):
+    rnd = random.Random(11)
+    return [
+        Transaction(
+            f"t{i}", "a1", rnd.choice(["food", "fun", "pay"]),
+            rnd.randint(-900, 400), f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        )
+        for i in range(n)
+    ]
+
+
+def test_forecast_matches_recursion_for_every_period():
+    trans = make_trans()
+    for source in (trans, TransactionStore(trans)):
+        agg = MonthlyAggregates(source)
+        for cat in ("food", "fun", "pay", "none"):
+            for period in (0, 1, 3, 6, 12, 24):
+                assert agg.forecast(cat, period) == forecast_expenses(cat, tuple(trans), period)
+
+
+def test_remove_and_edit_keep_cells_exact():
+    trans = make_trans()
+    agg = MonthlyAggregates(trans)
+    rnd = random.Random(5)
+    for _ in range(150):
+        i = rnd.randrange(len(trans))
+        old = trans[i]
+        new = Transaction(old.id, old.account_id, rnd.choice(["food", "fun"]), rnd.randint(-500, 500), old.ts)
+        agg.edit(old, new)
+        trans[i] = new
+    for t in trans[:100]:
+        agg.remove(t)
+    rest = tuple(trans[100:])
+    fresh = MonthlyAggregates(rest)
+    for cat in ("food", "fun", "pay"):
+        assert agg.category_months(cat) == fresh.category_months(cat)
+        assert agg.expense_months(cat) == fresh.expense_months(cat)
+        assert agg.forecast(cat, 4) == forecast_expenses(cat, rest, 4)
+    for m in range(1, 13):
+        month = f"2024-{m:02d}"
+        assert agg.month_totals(month) == fresh.month_totals(month)
+
+
+def test_month_totals_and_category_months():
+    trans = [
+        Transaction("1", "a1", "food", -100, "2025-01-03"),
+        Transaction("2", "a1", "pay", 500, "2025-01-10"),
+        Transaction("3", "a1", "food", 30, "2025-03-01"),
+    ]
+    agg = MonthlyAggregates(trans)
+    assert agg.month_totals("2025-01") == (500, 100)
+    assert agg.month_totals("2025-02") == (0, 0)
+    assert agg.category_months("food") == [("2025-01", -100), ("2025-03", 30)]
+    assert agg.expenses("food", "2025-01") == -100
+    agg.remove(trans[0])
+    assert agg.category_months("food") == [("2025-03", 30)]
+    assert agg.expense_months("food") == []
+    with pytest.raises(ValueError):
+        agg.remove(trans[0])
+    with pytest.raises(ValueError):  # "food" in 2025-03 has no expense rows
+        agg.remove(Transaction("4", "a1", "food", -5, "2025-03-09"))
+
+
+def test_removing_unknown_income_leaves_counts_intact():
+    agg = MonthlyAggregates([Transaction("1", "a1", "fun", -20, "2025-02-01")])
+    with pytest.raises(ValueError):  # the cell holds only an expense row
+        agg.remove(Transaction("2", "a1", "fun", 40, "2025-02-03"))
+    assert agg.category_months("fun") == [("2025-02", -20)]
+    assert agg.month_totals("2025-02") == (0, 20)
+    agg.remove(Transaction("1", "a1", "fun", -20, "2025-02-01"))
+    assert agg.months() == [] and agg.categories() == []
+
+
+def test_seed_aggregates():
+    _, categories, transactions, _ = load_seed("data/seed.json", use_snapshot=False)
+    agg = MonthlyAggregates(transactions)
+    for c in categories:
+        assert agg.forecast(c.id, 3) == forecast_expenses(c.id, tuple(transactions), 3)
@@ -0,0 +1,81 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.domain import Transaction
+from core.forecast import expense_matrix, forecast_all, month_range
+from core.indexes import MonthlyAggregates
+from core.store import TransactionStore
+
+
+def make_matrix(rows, months=None):
+    from core.forecast import ExpenseMatrix
+    values = np.array(rows, dtype=float)
+    months = months or tuple(month_range("2024-01", "2030-12")[: values.shape[1]])
+    return ExpenseMatrix(tuple(f"c{i}" for i in range(len(values))), tuple(months), values)
+
+
+def test_matrix_from_transactions_and_aggregates_agree():
+    trans = [
+        Transaction("1", "a", "food", -100, "2024-11-05"),
+        Transaction("2", "a", "food", -50, "2025-01-02"),
+        Transaction("3", "a", "fun", -30, "2025-01-09"),
+        Transaction("4", "a", "pay", 900, "2025-01-10"),
+    ]
+    m = expense_matrix(trans)
+    assert m.categories == ("food", "fun")
+    assert m.months == ("2024-11", "2024-12", "2025-01")
+    assert m.values.tolist() == [[100, 0, 50], [0, 0, 30]]
+    for source in (TransactionStore(trans), MonthlyAggregates(trans)):
+        other = expense_matrix(source, categories=m.categories)
+        assert other.months == m.months and np.array_equal(other.values, m.values)
+    # income-only categories ("pay") get no row, income-only months no column
+    late_pay = trans + [Transaction("5", "a", "pay", 900, "2025-03-01")]
+    for source in (late_pay, MonthlyAggregates(reversed(late_pay))):
+        other = expense_matrix(source)
+        assert (other.categories, other.months) == (m.categories, m.months)
+
+
+def test_trailing_mean_and_intervals():
+    m = make_matrix([[10, 20, 30, 40], [5, 5, 5, 5]])
+    fc = forecast_all(m, "mean", horizon=2, window=2)
+    assert fc.point.tolist() == [[35, 35], [5, 5]]
+    assert fc.months == ("2024-05", "2024-06")
+    assert fc.lower[1].tolist() == fc.upper[1].tolist() == [5, 5]
+    assert (fc.lower[0] < 35).all() and (fc.upper[0] > 35).all()
+    wide = forecast_all(m, "mean", window=2, level=0.95)
+    assert wide.upper[0, 0] > fc.upper[0, 0]
+
+
+def test_trend_recovers_a_line():
+    m = make_matrix([[10, 20, 30, 40, 50], [50, 40, 30, 20, 10]])
+    fc = forecast_all(m, "trend", horizon=2)
+    assert np.allclose(fc.point, [[60, 70], [0, 0]])
+    assert np.allclose(fc.upper[0], [60, 70])
+
+
+def test_ewma_weights_recent_months():
+    m = make_matrix([[0, 0, 0, 100]])
+    fc = forecast_all(m, "ewma", alpha=0.5)
+    assert fc.point[0, 0] == pytest.approx(100 / (1 + 0.5 + 0.25 + 0.125))
+
+
+def test_seasonal_naive_repeats_last_season():
+    year = list(range(1, 13))
+    m = make_matrix([year + [y + 1 for y in year]])
+    fc = forecast_all(m, "seasonal", horizon=14)
+    assert fc.point[0, :12].tolist() == [y + 1 for y in year]
+    assert fc.point[0, 12:].tolist() == [2, 3]
+    with pytest.raises(ValueError):
+        forecast_all(make_matrix([[1, 2, 3]]), "seasonal")
+
+
+def test_many_categories_in_one_call():
+    rng = np.random.default_rng(0)
+    m = make_matrix(rng.integers(0, 1000, size=(5000, 24)).tolist())
+    for model in ("mean", "ewma", "trend", "seasonal"):
+        fc = forecast_all(m, model, horizon=3)
+        assert fc.point.shape == fc.lower.shape == fc.upper.shape == (5000, 3)
+        assert (fc.lower <= fc.point).all() and (fc.point <= fc.upper).all()
+    with pytest.raises(ValueError):
+        forecast_all(m, "prophet")
@@ -0,0 +1,54 @@
+import asyncio
+import random
+
+from core import async_reports
+from core.async_reports import balance_forecast, expenses_by_month
+from core.domain import Account, Transaction
+from core.store import TransactionStore
+
+
+def make_trans(n=2000):
+    rnd = random.Random(2)
+    return [
+        Transaction(str(i), rnd.choice(["a1", "a2", "a3"]), "c1", rnd.randint(-500, 500),
+                    f"2025-{rnd.randint(1, 6):02d}-{rnd.randint(1, 28):02d}")
+        for i in range(n)
+    ]
+
+
+def naive_expenses(trans, months):
+    return {m: sum(-t.amount for t in trans if t.ts.startswith(m) and t.amount < 0) for m in months}
+
+
+def test_expenses_by_month_matches_per_month_scan(monkeypatch):
+    monkeypatch.setattr(async_reports, "YIELD_EVERY", 7)
+    trans = make_trans()
+    months = ["2025-01", "2025-03", "2025-09", "2025", "2025-02-1"]
+    expected = naive_expenses(trans, months)
+    for source in (trans, TransactionStore(trans)):
+        res = asyncio.run(expenses_by_month(source, months))
+        assert res == expected
+        assert list(res) == months
+
+
+def test_balance_forecast_matches_per_account_scan(monkeypatch):
+    monkeypatch.setattr(async_reports, "YIELD_EVERY", 5)
+    trans = make_trans()
+    accounts = [Account("a1", "Kaspi", 1000, "KZT"), Account("a2", "Halyk", 0, "KZT"), Account("a9", "Empty", 7, "KZT")]
+    expected = {a.id: a.balance + sum(t.amount for t in trans if t.account_id == a.id) for a in accounts}
+    for source in (trans, TransactionStore(trans)):
+        assert asyncio.run(balance_forecast(accounts, source)) == expected
+
+
+def test_single_scan_regardless_of_months():
+    class CountingList(list):
+        scans = 0
+
+        def __iter__(self):
+            CountingList.scans += 1
+            return super().__iter__()
+
+    trans = CountingList(make_trans(100))
+    months = [f"2025-{m:02d}" for m in range(1, 13)]
+    asyncio.run(expenses_by_month(trans, months))
+    assert CountingList.scans == 1
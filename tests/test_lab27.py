@@ -0,0 +1,104 @@
+import asyncio
+import random
+from array import array
+
+import pytest
+
+from core.async_reports import balance_forecast, expenses_by_month
+from core.domain import Account, Budget, Category, Transaction
+from core.mapreduce import ReportEngine, get_engine, map_account_totals, merge_sums, shards
+from core.pvector import PVector
+from core.snapshot import open_snapshot, write_snapshot
+from core.store import TransactionStore
+from core.tree import CategoryTree
+
+CATS = (
+    Category("c1", "Food", None, "expense"),
+    Category("c2", "Groceries", "c1", "expense"),
+    Category("c3", "Fun", None, "expense"),
+)
+ACCOUNTS = [Account("a1", "Kaspi", 100, "KZT"), Account("a2", "Halyk", 0, "KZT")]
+
+
+def make_trans(n=3000):
+    rnd = random.Random(9)
+    return TransactionStore(
+        Transaction(str(i), rnd.choice(["a1", "a2"]), rnd.choice(["c1", "c2", "c3"]),
+                    rnd.randint(-400, 200), f"2025-{rnd.randint(1, 5):02d}-{rnd.randint(1, 28):02d}")
+        for i in range(n)
+    )
+
+
+@pytest.fixture(scope="module")
+def engine():
+    eng = ReportEngine(workers=2, shard_rows=500, inline_below=0)
+    yield eng
+    eng.shutdown()
+
+
+def test_merge_is_associative():
+    a, b, c = {"x": 1}, {"x": 2, "y": 3}, {"y": -3, "z": 4}
+    assert merge_sums(merge_sums(dict(a), dict(b)), dict(c)) == merge_sums(dict(a), merge_sums(dict(b), dict(c)))
+
+
+def test_shards_cover_the_ledger():
+    store = make_trans(1234)
+    parts = shards(store, 500)
+    assert [len(p.amounts) for p in parts] == [500, 500, 234]
+    merged = merge_sums(*map(map_account_totals, parts[:2]))
+    assert sum(merged.values()) == sum(store.amounts[:1000])
+    assert shards(TransactionStore(), 500)[0].amounts.tolist() == []
+
+
+def test_process_pool_matches_single_process_reports(engine):
+    trans = make_trans()
+    months = ["2025-01", "2025-02", "2025-04", "2025"]
+    assert engine.expenses_by_month(trans, months) == asyncio.run(expenses_by_month(trans, months))
+    assert engine.balance_forecast(ACCOUNTS, trans) == asyncio.run(balance_forecast(ACCOUNTS, trans))
+    assert engine._pool is not None
+
+    tree = CategoryTree(CATS)
+    assert engine.category_rollup(tree, trans) == tree.expense_rollup(trans)
+    assert engine.category_rollup(tree, list(trans), "2025-02-01", "2025-03-31", "a2") == \
+        tree.expense_rollup(trans, "2025-02-01", "2025-03-31", "a2")
+
+    budgets = [Budget("b1", "c1", 1000, "monthly"), Budget("b2", "c9", 10, "monthly")]
+    totals = engine.budget_totals(budgets, trans, "2025-03", "2025-03\uffff")
+    assert totals["b1"] == sum(-t.amount for t in trans if t.cat_id == "c1" and t.amount < 0 and t.ts.startswith("2025-03"))
+    assert totals["b2"] == 0
+    picked = engine.budget_totals(budgets, trans, months=["2025-01", "2025-03"])
+    assert picked["b1"] == sum(
+        -t.amount for t in trans if t.cat_id == "c1" and t.amount < 0 and t.ts[:7] in ("2025-01", "2025-03")
+    )
+
+
+def test_snapshot_backed_columns(engine, tmp_path):
+    trans = make_trans(1200)
+    path = str(tmp_path / "ledger.snap")
+    write_snapshot(path, (), CATS, trans, ())
+    snap = open_snapshot(path)
+    assert engine.balance_forecast(ACCOUNTS, snap.transactions) == engine.balance_forecast(ACCOUNTS, trans)
+
+
+def test_small_ledgers_run_inline():
+    eng = ReportEngine(workers=4)
+    trans = make_trans(100)
+    assert eng.balance_forecast(ACCOUNTS, trans) == asyncio.run(balance_forecast(ACCOUNTS, trans))
+    assert eng._pool is None
+    assert get_engine() is get_engine()
+
+
+def test_versioned_ledgers_are_converted_once_per_version():
+    eng = ReportEngine(workers=1)
+    ledger = PVector(make_trans(300))
+    store = eng.store(ledger)
+    assert eng.store(ledger) is store
+    assert eng.balance_forecast(ACCOUNTS, ledger) == asyncio.run(balance_forecast(ACCOUNTS, ledger))
+    grown = ledger.append(Transaction("x", "a1", "c1", -5, "2025-06-01"))
+    assert eng.store(grown) is not store and len(eng.store(grown)) == 301
+    assert eng.store(list(ledger)) is not eng.store(list(ledger))  # unversioned: never reused
+
+
+def test_shards_carry_only_code_columns():
+    (part,) = shards(make_trans(10), 500)
+    assert all(isinstance(col, array) for col in part)
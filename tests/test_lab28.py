@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from core import async_reports
+from core.domain import Account, Transaction
+from core.jobs import CANCELLED, DONE, REPORTS, TIMED_OUT, JobManager
+from core.pvector import PVector
+from core.store import TransactionStore
+
+
+def make_trans(n):
+    return [Transaction(str(i), "a1" if i % 2 else "a2", "c1", -1, f"2025-0{i % 3 + 1}-01") for i in range(n)]
+
+
+@pytest.fixture
+def manager():
+    m = JobManager()
+    yield m
+    m.shutdown()
+
+
+@pytest.fixture
+def slow_report(monkeypatch):
+    async def slow(n, delay):
+        for i in range(1, n + 1):
+            await asyncio.sleep(delay)
+            yield i, {"rows": i}
+
+    monkeypatch.setitem(REPORTS, "slow", slow)
+
+
+def test_job_runs_to_completion_with_progress(manager, monkeypatch):
+    monkeypatch.setattr(async_reports, "YIELD_EVERY", 100)
+    trans = PVector(make_trans(1000))
+    job = manager.submit("expenses_by_month", trans, ["2025-01", "2025-02"])
+    manager.wait(job.id, timeout=5)
+    assert job.status == DONE
+    assert (job.processed, job.total, job.progress) == (1000, 1000, 1.0)
+    assert job.result == asyncio.run(async_reports.expenses_by_month(trans, ["2025-01", "2025-02"]))
+
+    accounts = [Account("a1", "Kaspi", 10, "KZT")]
+    job = manager.submit("balance_forecast", accounts, TransactionStore(trans))
+    assert manager.wait(job.id, timeout=5).result == {"a1": 10 - 500}
+
+
+def test_identical_inflight_requests_are_deduplicated(manager, slow_report):
+    a = manager.submit("slow", 50, 0.01)
+    b = manager.submit("slow", 50, 0.01)
+    c = manager.submit("slow", 51, 0.01)
+    assert a is b and a is not c
+    manager.wait(a.id, timeout=5)
+    assert manager.submit("slow", 50, 0.01) is not a  # finished jobs are not reused
+
+
+def test_cancel_and_deadline(manager, slow_report):
+    job = manager.submit("slow", 1000, 0.01)
+    while job.processed < 2:
+        time.sleep(0.005)
+    assert manager.cancel(job.id)
+    manager.wait(job.id, timeout=5)
+    assert job.status == CANCELLED and job.processed < 1000
+    assert not manager.cancel(job.id)
+
+    late = manager.submit("slow", 1000, 0.01, deadline=0.05)
+    manager.wait(late.id, timeout=5)
+    assert late.status == TIMED_OUT and late.partial is not None
+
+
+def test_stream_partials_from_another_loop(manager, slow_report):
+    job = manager.submit("slow", 5, 0.02)
+
+    async def collect():
+        return [p["rows"] async for p in manager.stream(job.id)]
+
+    rows = asyncio.run(collect())
+    assert rows == sorted(rows) and rows[-1] == 5
+    assert job.status == DONE
+
+
+def test_unknown_report(manager):
+    with pytest.raises(ValueError):
+        manager.submit("nope")
@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from core.domain import Transaction
+from core.memo import Cache
+from core.precompute import Precomputer, ledger_version
+from core.sqlite_ledger import SqliteLedger
+from core.store import TransactionStore
+
+
+def wait_until(pred, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not pred():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.01)
+
+
+class Ledger:
+    """Minimal versioned source: a list of amounts plus a revision."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, amount):
+        self.rows.append(amount)
+
+    def revision(self):
+        return len(self.rows)
+
+
+@pytest.fixture
+def ledger():
+    return Ledger()
+
+
+@pytest.fixture
+def pre(ledger):
+    p = Precomputer(ledger, load=lambda src: list(src.rows), poll=0.02, cache=Cache("test"))
+    yield p
+    p.stop()
+
+
+def test_value_is_computed_on_demand_before_worker_runs(ledger, pre):
+    ledger.add(5)
+    pre.register("total", sum)
+    assert pre.value("total") == 5
+    entry = pre.get("total")
+    assert (entry.name, entry.version, entry.error) == ("total", 1, None)
+    assert entry.age < 5
+    assert not pre.stale("total")
+
+
+def test_cold_values_are_computed_in_one_round(ledger):
+    loads = []
+    pre = Precomputer(ledger, load=lambda src: loads.append(1) or list(src.rows), cache=Cache("test"))
+    pre.register("total", sum)
+    pre.register("count", len)
+    ledger.add(3)
+    assert (pre.value("total"), pre.value("count")) == (3, 1)
+    assert len(loads) == 1
+
+
+def test_value_does_not_wait_for_a_running_worker(ledger, pre):
+    release = threading.Event()
+    pre.register("slow", lambda rows: release.wait(5) and "done")
+    pre.start()
+    start = time.perf_counter()
+    assert pre.value("slow", "pending") == "pending"
+    assert time.perf_counter() - start < 1
+    release.set()
+    wait_until(lambda: pre.value("slow") == "done")
+
+
+def test_worker_refreshes_when_version_changes(ledger, pre):
+    calls = []
+
+    def total(rows):
+        calls.append(len(rows))
+        return sum(rows)
+
+    pre.register("total", total)
+    pre.start()
+    wait_until(lambda: pre.get("total") is not None)
+    assert pre.get("total").value == 0
+
+    ledger.add(7)
+    assert pre.stale("total")
+    pre.poke()
+    wait_until(lambda: pre.get("total").value == 7)
+    assert not pre.stale("total")
+    n = len(calls)
+    time.sleep(0.1)
+    assert len(calls) == n  # unchanged ledger, interval not elapsed
+
+
+def test_worker_refreshes_on_schedule(ledger, pre):
+    ticks = []
+    pre.register("tick", lambda rows: ticks.append(1) or len(ticks), every=0.05)
+    pre.start()
+    wait_until(lambda: len(ticks) >= 3)
+    assert pre.get("tick").value >= 3
+
+
+def test_failure_keeps_previous_value(ledger, pre):
+    ledger.add(1)
+    pre.register("total", sum)
+    pre.refresh()
+
+    def broken(rows):
+        raise RuntimeError("boom")
+
+    pre.register("total", broken)
+    entry = pre.refresh(["total"])["total"]
+    assert entry.value == 1
+    assert entry.error == "RuntimeError: boom"
+    assert pre.value("total", "fallback") == "fallback"
+
+
+def test_reregister_keeps_stored_value(ledger, pre):
+    pre.register("total", sum)
+    pre.refresh()
+    first = pre.get("total")
+    pre.register("total", sum)
+    assert pre.get("total") is first
+    assert pre.names() == ["total"]
+
+
+def test_one_load_per_refresh_round(ledger):
+    loads = []
+    pre = Precomputer(ledger, load=lambda src: loads.append(1) or src.rows, cache=Cache("test"))
+    pre.register("a", len)
+    pre.register("b", sum)
+    pre.refresh()
+    assert len(loads) == 1
+
+
+def test_ledger_version_of_stores_and_sqlite(tmp_path):
+    store = TransactionStore([Transaction("1", "a1", "c1", -5, "2025-01-01")])
+    assert ledger_version(store) == store.fingerprint
+    assert ledger_version(store + [Transaction("2", "a1", "c1", -5, "2025-01-02")]) != store.fingerprint
+
+    db = SqliteLedger(str(tmp_path / "l.db"))
+    before = ledger_version(db)
+    db.add_transaction(Transaction("1", "a1", "c1", -5, "2025-01-01"))
+    assert ledger_version(db) != before
+    assert ledger_version(object()) is None
@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+from core.events import TRANSACTION_ADDED, EventBus, check_budget_handler, update_balance_handler
+
+
+def test_publish_async_keeps_subscription_order_and_runs_concurrently():
+    bus = EventBus()
+
+    async def slow_async(event, payload):
+        await asyncio.sleep(0.2)
+        return {"from": "async"}
+
+    def slow_sync(event, payload):
+        time.sleep(0.2)
+        return {"from": "sync"}
+
+    bus.subscribe(TRANSACTION_ADDED, slow_async)
+    bus.subscribe(TRANSACTION_ADDED, slow_sync)
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+
+    start = time.perf_counter()
+    results = asyncio.run(bus.publish_async(TRANSACTION_ADDED, {"amount": -5}))
+    elapsed = time.perf_counter() - start
+
+    assert results == [{"from": "async"}, {"from": "sync"}, {"balance_delta": -5}]
+    assert elapsed < 0.35  # not 0.4: the two slow handlers overlapped
+
+
+def test_sync_handlers_do_not_run_on_the_loop_thread():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(TRANSACTION_ADDED, lambda e, p: seen.append(threading.current_thread()) or {})
+    asyncio.run(bus.publish_async(TRANSACTION_ADDED, {}))
+    assert seen and seen[0] is not threading.main_thread()
+
+
+def test_failures_and_timeouts_are_isolated():
+    bus = EventBus()
+
+    def broken(event, payload):
+        raise RuntimeError("boom")
+
+    async def hangs(event, payload):
+        await asyncio.sleep(10)
+
+    bus.subscribe(TRANSACTION_ADDED, broken)
+    bus.subscribe(TRANSACTION_ADDED, hangs, timeout=0.05)
+    bus.subscribe(TRANSACTION_ADDED, check_budget_handler)
+
+    payload = {"amount": -50, "category_id": "c1", "budget_limit": 100, "current_spent": 70}
+    start = time.perf_counter()
+    results = asyncio.run(bus.publish_async(TRANSACTION_ADDED, payload))
+    assert time.perf_counter() - start < 1
+
+    assert results[0] == {"error": "RuntimeError: boom", "handler": "test_failures_and_timeouts_are_isolated.<locals>.broken", "timed_out": False}
+    assert results[1]["timed_out"] is True
+    assert results[2]["spent"] == 120 and "alert" in results[2]
+
+
+def test_coroutine_handler_with_bad_signature_is_one_failure():
+    bus = EventBus()
+
+    async def no_args():
+        return {}
+
+    bus.subscribe(TRANSACTION_ADDED, no_args)
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+    [bad, good] = asyncio.run(bus.publish_async(TRANSACTION_ADDED, {"amount": 1}))
+    assert bad["error"].startswith("TypeError") and not bad["timed_out"]
+    assert good == {"balance_delta": 1}
+
+
+def test_publish_timeout_is_default_for_handlers_without_one():
+    bus = EventBus()
+
+    def slow(event, payload):
+        time.sleep(0.3)
+        return {"ok": True}
+
+    def patient(event, payload):
+        return slow(event, payload)
+
+    bus.subscribe(TRANSACTION_ADDED, slow)
+    bus.subscribe(TRANSACTION_ADDED, patient, timeout=1)
+    results = asyncio.run(bus.publish_async(TRANSACTION_ADDED, {}, timeout=0.05))
+    assert results[0]["timed_out"] is True
+    assert results[1] == {"ok": True}
+
+
+def test_hung_sync_handler_does_not_starve_later_publishes():
+    bus = EventBus(max_workers=1)
+    release = threading.Event()
+
+    def hangs(event, payload):
+        release.wait(5)
+        return {}
+
+    bus.subscribe(TRANSACTION_ADDED, hangs)
+    [hung] = asyncio.run(bus.publish_async(TRANSACTION_ADDED, {}, timeout=0.05))
+    assert hung["timed_out"] is True
+
+    bus.unsubscribe(TRANSACTION_ADDED, hangs)
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+    assert asyncio.run(bus.publish_async(TRANSACTION_ADDED, {"amount": 2}, timeout=1)) == [{"balance_delta": 2}]
+    release.set()
+
+
+def test_fire_and_forget_outlives_the_callers_loop():
+    bus = EventBus()
+    done = threading.Event()
+
+    async def handler(event, payload):
+        await asyncio.sleep(0.05)
+        done.set()
+        return {}
+
+    bus.subscribe(TRANSACTION_ADDED, handler)
+    assert asyncio.run(bus.publish_async(TRANSACTION_ADDED, {}, wait=False)) == []
+    assert done.wait(2)
+
+
+def test_fire_and_forget():
+    bus = EventBus()
+    done = threading.Event()
+
+    async def handler(event, payload):
+        await asyncio.sleep(0.05)
+        done.set()
+        return {"n": payload["n"]}
+
+    bus.subscribe(TRANSACTION_ADDED, handler)
+
+    async def caller():
+        results = await bus.publish_async(TRANSACTION_ADDED, {"n": 1}, wait=False)
+        assert results == [] and not done.is_set()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(caller())
+    assert done.is_set()
+
+    done.clear()
+    future = bus.publish_nowait(TRANSACTION_ADDED, {"n": 2})
+    assert future.result(timeout=2) == [{"n": 2}]
+    assert done.is_set()
+
+
+def test_publish_async_without_subscribers_and_sync_publish_unchanged():
+    bus = EventBus()
+    assert asyncio.run(bus.publish_async("NOTHING", {})) == []
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+    assert bus.publish(TRANSACTION_ADDED, {"amount": 3}) == [{"balance_delta": 3}]
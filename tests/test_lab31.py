@@ -0,0 +1,101 @@
+import time
+
+from core.events import (
+    TRANSACTION_ADDED,
+    EventBus,
+    batch_handler,
+    check_budget_handler,
+    update_balance_handler,
+)
+
+
+def payload(amount, cat="c1", acc="a1", limit=100, spent=0):
+    return {
+        "amount": amount,
+        "account_id": acc,
+        "category_id": cat,
+        "budget_limit": limit,
+        "current_spent": spent,
+    }
+
+
+def test_legacy_handlers_are_called_per_item_with_shared_timestamp():
+    bus = EventBus()
+    seen = []
+
+    def legacy(event, p):
+        seen.append(event)
+        return {"amount": p["amount"]}
+
+    bus.subscribe(TRANSACTION_ADDED, legacy)
+    results = bus.publish_many(TRANSACTION_ADDED, (payload(a) for a in (-1, -2, 3)))
+    assert results == [[{"amount": -1}, {"amount": -2}, {"amount": 3}]]
+    assert [e.payload["amount"] for e in seen] == [-1, -2, 3]
+    assert len({e.ts for e in seen}) == 1
+    assert all(e.name == TRANSACTION_ADDED for e in seen)
+
+
+def test_batch_handlers_are_called_once():
+    bus = EventBus()
+    calls = []
+
+    def count_batch(event, payloads):
+        calls.append(event.payload["count"])
+        return {"count": len(payloads)}
+
+    @batch_handler(count_batch)
+    def count(event, p):
+        raise AssertionError("per-item path must not be used")
+
+    bus.subscribe(TRANSACTION_ADDED, count)
+    bus.subscribe(TRANSACTION_ADDED, lambda e, p: p["amount"])
+    assert bus.publish_many(TRANSACTION_ADDED, [payload(-1), payload(-2)]) == [{"count": 2}, [-1, -2]]
+    assert calls == [2]
+    assert bus.publish_many("OTHER", [payload(-1)]) == []
+
+
+def test_budget_batch_aggregates_per_category():
+    bus = EventBus()
+    bus.subscribe(TRANSACTION_ADDED, check_budget_handler)
+    [result] = bus.publish_many(TRANSACTION_ADDED, [
+        payload(-40, "c1", spent=30),
+        payload(-50, "c1", spent=999),  # only the first current_spent counts
+        payload(500, "c1"),  # income is ignored
+        payload(-10, "c2", limit=0),
+    ])
+    assert result["spent_deltas"] == {"c1": 90, "c2": 10}
+    assert result["spent"] == {"c1": 120, "c2": 10}
+    assert result["alerts"] == [{
+        "alert": "Budget exceeded for category c1: 120 / 100 KZT",
+        "category_id": "c1", "spent": 120, "limit": 100,
+    }]
+
+
+def test_batch_matches_sequential_per_item_results():
+    payloads = [payload(-7 * (i % 5 + 1), f"c{i % 3}", f"a{i % 2}", limit=60) for i in range(30)]
+    running = {}
+    for p in payloads:
+        p = dict(p, current_spent=running.get(p["category_id"], 0))
+        running[p["category_id"]] = check_budget_handler(None, p)["spent"]
+
+    bus = EventBus()
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+    bus.subscribe(TRANSACTION_ADDED, check_budget_handler)
+    balances, budgets = bus.publish_many(TRANSACTION_ADDED, payloads)
+    assert budgets["spent"] == running
+    assert {a["category_id"] for a in budgets["alerts"]} == {c for c, s in running.items() if s > 60}
+    assert balances["balance_delta"] == sum(p["amount"] for p in payloads)
+    assert sum(balances["balance_deltas"].values()) == balances["balance_delta"]
+    # the single-event path still uses the per-item handlers
+    assert bus.publish(TRANSACTION_ADDED, payload(-5))[1] == {"spent": 5}
+
+
+def test_bulk_throughput():
+    bus = EventBus()
+    bus.subscribe(TRANSACTION_ADDED, update_balance_handler)
+    bus.subscribe(TRANSACTION_ADDED, check_budget_handler)
+    payloads = [payload(-(i % 100 + 1), f"c{i % 20}", f"a{i % 4}", limit=10_000) for i in range(100_000)]
+    start = time.perf_counter()
+    bus.publish_many(TRANSACTION_ADDED, payloads)
+    elapsed = time.perf_counter() - start
+    assert len(payloads) / elapsed > 100_000
@@ -0,0 +1,131 @@
+import asyncio
+import os
+
+import pytest
+
+from core import eventlog
+from core.eventlog import EventLog, EventState, read_state, rebuild, replay, segments
+from core.events import BALANCE_ALERT, BUDGET_ALERT, TRANSACTION_ADDED, Event, EventBus
+
+
+def tx(amount, acc="a1", cat="c1"):
+    return {"amount": amount, "account_id": acc, "category_id": cat}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "events.log"), str(tmp_path / "events.snap")
+
+
+def open_log(paths, **kwargs):
+    return EventLog(paths[0], paths[1], commit_interval=0, **kwargs)
+
+
+def test_state_folds_events_like_the_handlers():
+    state = EventState()
+    state.apply(1, Event(TRANSACTION_ADDED, "t1", tx(-60)))
+    state.apply(2, Event(TRANSACTION_ADDED, "t2", tx(-60)))
+    state.apply(3, Event(TRANSACTION_ADDED, "t3", tx(500, acc="a2")))
+    state.apply(4, Event(BUDGET_ALERT, "t4", {"alert": "b1 at 120%"}))
+    state.apply(5, Event(BALANCE_ALERT, "t5", {"balance": 10, "threshold": 100}))
+    state.apply(5, Event(TRANSACTION_ADDED, "dup", tx(-1)))  # already applied seq
+
+    assert state.seq == 5
+    assert state.balances == {"a1": -120, "a2": 500}
+    assert [a["type"] for a in state.alerts] == ["Budget", "Balance"]
+    assert state.alerts[0]["message"] == "b1 at 120%"
+    assert [h["payload"] for h in state.history] == [tx(-60), tx(-60), tx(500, acc="a2")]
+
+
+def test_older_snapshots_with_budget_spend_still_load():
+    data = EventState().to_dict()
+    assert "budget_spent" not in data
+    assert EventState.from_dict(dict(data, budget_spent={"c1": 5})) == EventState()
+
+
+def test_bus_persists_every_publish_path(paths):
+    log = open_log(paths)
+    bus = EventBus()
+    bus.attach_log(log)
+    bus.publish(TRANSACTION_ADDED, tx(-10))  # no subscribers: still logged
+    bus.publish_many(TRANSACTION_ADDED, [tx(-20), tx(-30, cat="c2")])
+    asyncio.run(bus.publish_async(BALANCE_ALERT, {"balance": 5, "threshold": 10}))
+    log.close()
+
+    assert [(seq, e.name) for seq, e in eventlog.iter_events(paths[0])] == [
+        (1, TRANSACTION_ADDED), (2, TRANSACTION_ADDED), (3, TRANSACTION_ADDED), (4, BALANCE_ALERT),
+    ]
+    state = replay(paths[0])
+    assert state.balances == {"a1": -60}
+    assert state == log.state
+
+
+def test_snapshots_rotate_and_restart_replays_tail(paths):
+    log = open_log(paths, snapshot_every=10)
+    for i in range(25):
+        log.record(Event(TRANSACTION_ADDED, f"t{i}", tx(-1, cat=f"c{i % 3}")))
+    log.close()
+
+    state, generation = read_state(paths[1])
+    assert (state.seq, generation) == (20, 2)
+    assert segments(paths[0]) == [paths[0] + ".0", paths[0] + ".1", paths[0]]
+
+    reopened = open_log(paths, snapshot_every=10)
+    assert reopened.state.seq == 25
+    assert reopened.state == replay(*paths) == rebuild(paths[0])
+    reopened.record(Event(TRANSACTION_ADDED, "t25", tx(-1)))
+    assert reopened.state.seq == 26
+    reopened.close()
+
+
+def test_crash_between_snapshot_and_rotation_is_harmless(paths, monkeypatch):
+    log = open_log(paths, snapshot_every=1000)
+    for i in range(5):
+        log.record(Event(TRANSACTION_ADDED, f"t{i}", tx(-1)))
+
+    def crash(generation):
+        raise OSError("crash")
+
+    monkeypatch.setattr(log, "_archive", crash)
+    with pytest.raises(OSError):
+        log.snapshot()
+    log.close()
+    monkeypatch.undo()
+
+    # the snapshot (generation 1) already holds the generation 0 log
+    reopened = open_log(paths)
+    assert reopened.state.seq == 5 and reopened.state.balances == {"a1": -5}
+    assert reopened.generation == 1
+    reopened.close()
+    assert rebuild(paths[0]).balances == {"a1": -5}
+
+
+def test_torn_tail_is_dropped(paths):
+    log = open_log(paths)
+    log.record(Event(TRANSACTION_ADDED, "t0", tx(-1)))
+    log.record(Event(TRANSACTION_ADDED, "t1", tx(-2)))
+    log.close()
+    with open(paths[0], "r+b") as f:
+        f.truncate(os.path.getsize(paths[0]) - 3)
+    assert replay(paths[0]).balances == {"a1": -1}
+
+
+def test_offline_rebuild_tool(paths, capsys):
+    log = open_log(paths, snapshot_every=4)
+    for i in range(10):
+        log.record(Event(TRANSACTION_ADDED, f"t{i}", tx(-3, acc=f"a{i % 2}")))
+    log.close()
+    out_snap = paths[1] + ".rebuilt"
+    assert eventlog.main([paths[0], "--snapshot", out_snap]) == 0
+    assert "10 events from 3 segment(s)" in capsys.readouterr().out
+
+    state, generation = read_state(out_snap)
+    assert state == rebuild(paths[0])
+    assert state.balances == {"a0": -15, "a1": -15}
+
+    # starting from the rebuilt snapshot archives (not drops) the live log
+    os.replace(out_snap, paths[1])
+    reopened = open_log(paths)
+    assert reopened.state == state
+    reopened.close()
+    assert rebuild(paths[0]) == state
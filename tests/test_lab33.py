@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+from core import budgets as budgets_mod
+from core.budgets import BudgetTracker, evaluate_budgets, get_budget_tracker
+from core.domain import Budget, Transaction
+from core.eventlog import EventLog
+from core.events import BUDGET_ALERT, TRANSACTION_ADDED, EventBus
+from core.store import TransactionStore
+
+BUDGETS = (
+    Budget("b1", "c1", 100, "monthly"),
+    Budget("b2", "c1", 1000, "yearly"),
+    Budget("b3", "c2", 50, "weekly"),
+)
+
+
+def history():
+    return [
+        Transaction("1", "a1", "c1", -30, "2025-01-05"),
+        Transaction("2", "a1", "c1", -40, "2025-02-01"),
+        Transaction("3", "a1", "c1", -50, "2025-02-20"),
+        Transaction("4", "a1", "c1", 500, "2025-02-21"),  # income never counts
+        Transaction("5", "a1", "c2", -20, "2025-02-19"),
+        Transaction("6", "a1", "c3", -99, "2025-02-19"),  # no budget
+    ]
+
+
+def tx(amount, cat="c1", ts="2025-02-25"):
+    return {"amount": amount, "account_id": "a1", "category_id": cat, "ts": ts}
+
+
+@pytest.mark.parametrize("make", [list, TransactionStore])
+def test_initialized_from_ledger_matches_evaluate_budgets(make):
+    trans = make(history())
+    tracker = BudgetTracker(BUDGETS, trans)
+    for at in ("2025-01-31", "2025-02-20", "2025-03-01"):
+        expected = evaluate_budgets(BUDGETS, trans, at=at)
+        assert tracker.statuses(at) == {bid: statuses[0] for bid, statuses in expected.items()}
+    assert tracker.spent("b1", "2025-02-10") == 90
+    assert tracker.spent("b2", "2025-12-31") == 120
+
+
+def test_alerts_only_on_threshold_crossings():
+    tracker = BudgetTracker(BUDGETS, history())  # b1 February: 90 of 100, past 80%
+    assert tracker.add("c1", -5, "2025-02-25") == []  # 95%: no new threshold
+    [alert] = tracker.add("c1", -10, "2025-02-25")  # 105%
+    assert (alert["budget_id"], alert["threshold"], alert["spent"], alert["period"]) == ("b1", 1.0, 105, "2025-02")
+    assert tracker.add("c1", -1, "2025-02-25") == []
+    assert [a["threshold"] for a in tracker.add("c1", -200, "2025-03-01")] == [0.8, 1.0, 1.2]
+    assert tracker.add("c1", 1000, "2025-03-01") == []
+    assert tracker.add("unknown", -1000, "2025-03-01") == []
+
+
+def test_thresholds_change_without_rescanning():
+    trans = history()
+    tracker = BudgetTracker(BUDGETS, trans, thresholds=(1.0,))
+    trans.clear()  # the tracker must not look at transactions again
+    tracker.set_thresholds((0.95, 0.5))
+    assert tracker.thresholds == (0.5, 0.95)
+    assert [a["threshold"] for a in tracker.add("c1", -6, "2025-02-25")] == [0.95]
+    with pytest.raises(ValueError):
+        tracker.set_thresholds((0,))
+
+
+def test_unknown_period_is_rejected():
+    with pytest.raises(ValueError):
+        BudgetTracker([Budget("b", "c1", 10, "daily")])
+
+
+def test_tracker_on_bus_publishes_alert_events(tmp_path):
+    bus = EventBus()
+    log = EventLog(str(tmp_path / "events.log"), commit_interval=0)
+    bus.attach_log(log)
+    seen = []
+    bus.subscribe(BUDGET_ALERT, lambda e, p: seen.append(p) or {})
+    tracker = BudgetTracker(BUDGETS, history()).attach(bus)
+    tracker.attach(bus)  # idempotent
+
+    [result] = bus.publish(TRANSACTION_ADDED, tx(-5))
+    assert result == {"budgets": {"b1": 95, "b2": 125}, "alerts": []}
+    assert seen == []
+
+    [result] = asyncio.run(bus.publish_async(TRANSACTION_ADDED, tx(-20)))
+    assert [a["budget_id"] for a in result["alerts"]] == ["b1"]
+    assert seen == result["alerts"]
+
+    # alerts survive restarts through the event log
+    assert [a["message"] for a in log.state.alerts] == [seen[0]["alert"]]
+    log.close()
+
+
+def test_event_time_is_used_when_payload_has_no_ts():
+    bus = EventBus()
+    tracker = BudgetTracker(BUDGETS).attach(bus)
+    [result] = bus.publish(TRANSACTION_ADDED, {"amount": -10, "category_id": "c2"})
+    assert result["budgets"] == {"b3": 10}
+    assert tracker.spent("b3") == 10
+
+
+def test_shared_tracker_follows_the_budget_set(monkeypatch):
+    monkeypatch.setattr(budgets_mod, "_tracker", None)
+    bus = EventBus()
+    first = get_budget_tracker(BUDGETS, history()).attach(bus)
+    assert get_budget_tracker(list(reversed(BUDGETS)), []) is first
+
+    changed = BUDGETS[:2] + (Budget("b3", "c2", 10, "weekly"),)
+    second = get_budget_tracker(changed, history()).attach(bus)
+    assert second is not first and first.bus is None
+    assert second.spent("b3", "2025-02-19") == 20  # folded from the ledger again
+    [result] = bus.publish(TRANSACTION_ADDED, tx(-1, cat="c2", ts="2025-02-19"))
+    assert result["budgets"] == {"b3": 21}
+
+
+def test_publish_many_sums_per_budget_period_before_alerting():
+    bus = EventBus()
+    batched = BudgetTracker(BUDGETS, history()).attach(bus)
+    single = BudgetTracker(BUDGETS, history())
+    rows = [tx(-4), tx(-4), tx(-4, ts="2025-03-02"), tx(-31, cat="c2", ts="2025-02-19"), tx(50), tx(-1, cat="zz")]
+
+    [result] = bus.publish_many(TRANSACTION_ADDED, rows)
+    one_by_one = [a for p in rows for a in single.add(p["category_id"], p["amount"], p["ts"])]
+    assert result["budgets"] == {
+        "b1": {"2025-02": 98, "2025-03": 4},
+        "b2": {"2025": 132},
+        "b3": {"2025-W08": 51},
+    }
+    crossed = [("b3", 0.8), ("b3", 1.0)]
+    assert [(a["budget_id"], a["threshold"]) for a in result["alerts"]] == crossed
+    assert [(a["budget_id"], a["threshold"]) for a in one_by_one] == crossed
+    assert batched.statuses("2025-02-25") == single.statuses("2025-02-25")
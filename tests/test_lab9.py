@@ -0,0 +1,102 @@
+from core.domain import Category, Transaction
+from core.recursion import sum_expenses_recursive
+from core.store import TransactionStore
+from core.transforms import (
+    account_balance,
+    add_transaction,
+    expense_transactions,
+    income_transactions,
+    load_seed,
+    transaction_amounts,
+)
+
+
+def make_sample():
+    return (
+        Transaction("t1", "a1", "c1", -1000, "2024-05-01", "restaurant"),
+        Transaction("t2", "a1", "c2", -2000, "2024-05-02", "groceries"),
+        Transaction("t3", "a2", "c3", 5000, "2024-05-03", "salary"),
+        Transaction("t4", "a2", "c1", -300, "2024-05-03", "cafe"),
+    )
+
+
+def test_store_iterates_as_transactions():
+    trans = make_sample()
+    store = TransactionStore(trans)
+
+    assert len(store) == 4
+    assert tuple(store) == trans
+    assert store[0] == trans[0]
+    assert store[-1] == trans[-1]
+    assert tuple(store[1:3]) == trans[1:3]
+
+
+def test_store_dictionary_encodes_ids():
+    store = TransactionStore(make_sample())
+
+    assert len(store.accounts) == 2
+    assert len(store.categories) == 3
+    assert len(store.timestamps) == 3
+    assert list(store.amounts) == [-1000, -2000, 5000, -300]
+
+
+def test_store_equality_and_hash_match_tuple():
+    trans = make_sample()
+    store = TransactionStore(trans)
+
+    assert store == trans
+    assert store == TransactionStore(trans)
+    assert hash(store) == hash(trans)
+    assert store != TransactionStore(trans[:2])
+
+
+def test_store_hash_does_not_build_rows(monkeypatch):
+    trans = make_sample() + (Transaction(7, "acc1", "c1", -1, "2025-02-01", "note"),)
+    store = TransactionStore(trans)
+    expenses = store.expenses()
+    monkeypatch.setattr(TransactionStore, "_row", None)  # any row materialization fails
+    assert hash(store) == hash(trans)
+    assert hash(expenses) == hash(tuple(t for t in trans if t.amount < 0))
+
+
+def test_store_column_aggregations_match_tuple():
+    trans = make_sample()
+    store = TransactionStore(trans)
+
+    assert account_balance(store, "a1") == account_balance(trans, "a1") == -3000
+    assert account_balance(store, "missing") == 0
+    assert tuple(expense_transactions(store)) == expense_transactions(trans)
+    assert tuple(income_transactions(store)) == income_transactions(trans)
+    assert transaction_amounts(store) == transaction_amounts(trans)
+
+
+def test_store_sum_expenses_recursive():
+    cats = (
+        Category("c1", "Food", None, "expense"),
+        Category("c2", "Groceries", "c1", "expense"),
+        Category("c3", "Salary", None, "income"),
+    )
+    trans = make_sample()
+    store = TransactionStore(trans)
+
+    assert sum_expenses_recursive(cats, store, "c1") == -3300
+    assert sum_expenses_recursive(cats, store, "c2") == sum_expenses_recursive(cats, trans, "c2")
+    assert sum_expenses_recursive(cats, store, "c3") == 0
+
+
+def test_store_add_transaction_keeps_original():
+    store = TransactionStore(make_sample())
+    t = Transaction("t5", "a3", "c9", -1, "2024-06-01", "")
+
+    extended = add_transaction(store, t)
+
+    assert isinstance(extended, TransactionStore)
+    assert len(extended) == 5
+    assert len(store) == 4
+    assert extended[-1] == t
+
+
+def test_load_seed_returns_store():
+    _, _, transactions, _ = load_seed("data/seed.json")
+    assert isinstance(transactions, TransactionStore)
+    assert all(isinstance(t, Transaction) for t in transactions)